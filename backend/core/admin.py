@@ -23,6 +23,9 @@ from .models import (
     ItemLista,
     Comentario,
     ProdutoIndicado,
+    RankingProduto,
+    CoocorrenciaProduto,
+    SkuLoja,
 )
 
 # Registre seus modelos aqui para que apareçam no painel de administração do Django.
@@ -38,6 +41,9 @@ admin.site.register(ListaCompra)
 admin.site.register(ItemLista)
 admin.site.register(Comentario)
 admin.site.register(ProdutoIndicado)
+admin.site.register(RankingProduto)
+admin.site.register(CoocorrenciaProduto)
+admin.site.register(SkuLoja)
 
 # Para um controle mais granular no Admin, você pode usar ModelAdmin
 # Exemplo:
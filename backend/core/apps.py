@@ -10,3 +10,7 @@ class CoreConfig(AppConfig):
     """
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        """Conecta os receptores de sinais usados na invalidação de caches."""
+        from . import signals  # noqa: F401
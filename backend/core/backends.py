@@ -0,0 +1,56 @@
+## @file core/backends.py
+#
+# @brief Backend de autenticação que aceita nome de usuário ou e-mail.
+#
+# Substitui o `ModelBackend` padrão em `settings.AUTHENTICATION_BACKENDS`.
+# O usuário é localizado com uma única consulta sobre colunas únicas (e, portanto,
+# indexadas) e a senha é verificada uma única vez, inclusive quando o login é feito
+# por e-mail.
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+
+## Obtém o modelo de usuário ativo do Django.
+Usuario = get_user_model()
+
+
+## @class EmailOuUsernameBackend
+#  @brief Autentica pelo `username` ou, se a entrada contiver '@', também pelo `email`.
+#
+#  Herda do `ModelBackend` as verificações de permissão e de usuário ativo.
+class EmailOuUsernameBackend(ModelBackend):
+    ## @brief Autentica o usuário com no máximo uma consulta e uma verificação de senha.
+    #
+    # Quando nenhum usuário é encontrado, a senha é processada mesmo assim pelo hasher,
+    # para que o tempo de resposta não revele quais contas existem.
+    #
+    # @param request O objeto HttpRequest do Django (pode ser None).
+    # @param username Nome de usuário ou e-mail informado no login.
+    # @param password Senha informada no login.
+    # @return O usuário autenticado ou None.
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(Usuario.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        filtro = Q(username=username)
+        if "@" in username:
+            filtro |= Q(email=username)
+
+        # Um nome de usuário pode coincidir com o e-mail de outra conta; o username tem prioridade
+        candidatos = list(Usuario._default_manager.filter(filtro)[:2])
+        usuario = next(
+            (u for u in candidatos if u.username == username),
+            candidatos[0] if candidatos else None,
+        )
+
+        if usuario is None:
+            # Executa o hasher padrão uma vez para igualar o tempo de um login existente
+            Usuario().set_password(password)
+            return None
+
+        if usuario.check_password(password) and self.user_can_authenticate(usuario):
+            return usuario
+        return None
@@ -0,0 +1,294 @@
+## @file core/benchmarks.py
+#
+# @brief Benchmarks de desempenho do aplicativo 'core'.
+#
+# Cada benchmark é uma função registrada com o decorador `benchmark`, que recebe os
+# dados sintéticos gerados por `preparar_dados` e devolve as medições de cada cenário
+# (latência p50/p95 em milissegundos e quantidade de consultas SQL). Os benchmarks são
+# executados pelo comando `python manage.py benchmark`, sempre sobre um banco de
+# testes criado só para a execução.
+#
+# @see core.management.commands.benchmark
+# @see core.seed
+
+import statistics
+import time
+from itertools import cycle
+
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .forms import LojaForm
+from .models import ItemLista, ListaCompra
+from .seed import gerar_catalogo
+from .utils import (
+    LOJAS_HTML_CACHE_KEY,
+    get_product_info,
+    merge_session_cart_to_db,
+    render_lojas_html,
+    search_products,
+    _get_base_html_context,
+)
+from .views import get_cart_data
+
+## Obtém o modelo de usuário ativo do Django.
+Usuario = get_user_model()
+
+## @brief Registro dos benchmarks disponíveis, indexados pelo nome.
+BENCHMARKS = {}
+
+## @brief Quantidade de produtos colocados no carrinho nos cenários de carrinho e compra.
+ITENS_CARRINHO = 10
+
+
+## @brief Decorador que registra uma função de benchmark em `BENCHMARKS`.
+#
+# @param nome Nome usado para selecionar o benchmark na linha de comando.
+# @return O decorador que registra a função sem alterá-la.
+def benchmark(nome):
+    def registrar(func):
+        BENCHMARKS[nome] = func
+        return func
+
+    return registrar
+
+
+## @brief Calcula um percentil por interpolação linear.
+#
+# @param valores Lista de valores já ordenada.
+# @param p Percentil desejado (0 a 100).
+# @return O valor do percentil.
+def _percentil(valores, p):
+    posicao = (len(valores) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores) - 1)
+    return valores[inferior] + (valores[superior] - valores[inferior]) * (
+        posicao - inferior
+    )
+
+
+## @brief Executa uma função repetidas vezes e resume o tempo e as consultas de cada execução.
+#
+# @param func Função sem argumentos a ser medida.
+# @param repeticoes Número de execuções.
+# @param preparar Função opcional chamada antes de cada execução, fora da medição.
+# @return Dicionário com média, p50, p95, mínimo e máximo em milissegundos e a
+#         mediana da quantidade de consultas SQL por execução.
+def medir(func, repeticoes, preparar=None):
+    tempos = []
+    consultas = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        with CaptureQueriesContext(connection) as ctx:
+            inicio = time.perf_counter()
+            func()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(len(ctx.captured_queries))
+
+    tempos.sort()
+    return {
+        "media_ms": round(statistics.fmean(tempos), 4),
+        "p50_ms": round(_percentil(tempos, 50), 4),
+        "p95_ms": round(_percentil(tempos, 95), 4),
+        "min_ms": round(tempos[0], 4),
+        "max_ms": round(tempos[-1], 4),
+        "consultas": statistics.median_low(consultas),
+    }
+
+
+## @brief Gera os dados sintéticos compartilhados por todos os benchmarks.
+#
+# @param produtos Quantidade de produtos.
+# @param lojas Quantidade de lojas.
+# @param ofertas Quantidade total aproximada de ofertas.
+# @param seed Semente do gerador, para que execuções em commits diferentes sejam comparáveis.
+# @return Dicionário com os IDs gerados e um usuário staff para as views.
+def preparar_dados(produtos, lojas, ofertas, seed=42):
+    dados = gerar_catalogo(produtos, lojas, ofertas, seed=seed)
+    dados["usuario"] = Usuario.objects.create_user(
+        username="benchmark",
+        email="benchmark@example.com",
+        password="benchmark",
+        is_staff=True,
+    )
+    # bulk_create não dispara post_save, então os caches derivados são descartados aqui
+    cache.clear()
+    return dados
+
+
+## @brief Cria uma requisição GET com sessão e suporte a mensagens.
+#
+# @param usuario Usuário associado à requisição (opcional).
+# @return Objeto HttpRequest pronto para as funções de renderização.
+def _criar_request(usuario=None):
+    request = RequestFactory().get("/")
+    request.session = {}
+    request._messages = FallbackStorage(request)
+    if usuario is not None:
+        request.user = usuario
+    return request
+
+
+## @brief Monta um carrinho de sessão com os primeiros produtos de uma amostra.
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @return Dicionário no formato de `request.session["cart"]`.
+def _carrinho(dados):
+    amostra = dados["rng"].sample(dados["produtos"], min(ITENS_CARRINHO, len(dados["produtos"])))
+    return {str(pid): {"quantity": 1} for pid in amostra}
+
+
+## @brief Cria um cliente de teste autenticado com o usuário staff dos benchmarks.
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @return Um `django.test.Client` logado.
+def _cliente(dados):
+    client = Client()
+    client.force_login(dados["usuario"])
+    return client
+
+
+## @brief Mede a renderização da lista de lojas e da página base de gerenciamento.
+#
+# Compara a renderização com o cache vazio (template completo) e com o fragmento
+# já em cache, além do custo de `_get_base_html_context` com um formulário.
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @param repeticoes Número de execuções de cada medição.
+# @return Dicionário com as medições de cada cenário.
+@benchmark("render_lojas")
+def bench_render_lojas(dados, repeticoes):
+    request = _criar_request()
+    form = LojaForm()
+
+    def limpar_cache():
+        cache.delete(LOJAS_HTML_CACHE_KEY)
+
+    return {
+        "lojas_sem_cache": medir(
+            lambda: render_lojas_html(request), repeticoes, preparar=limpar_cache
+        ),
+        "lojas_com_cache": medir(lambda: render_lojas_html(request), repeticoes),
+        "pagina_base": medir(
+            lambda: _get_base_html_context(
+                request,
+                "Gerenciar Lojas",
+                form_obj=form,
+                existing_items_html=render_lojas_html(request),
+            ),
+            repeticoes,
+        ),
+    }
+
+
+## @brief Mede `search_products` com um termo de busca e com o catálogo completo.
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @param repeticoes Número de execuções de cada medição.
+# @return Dicionário com as medições de cada cenário.
+@benchmark("search_products")
+def bench_search_products(dados, repeticoes):
+    return {
+        "busca_termo": medir(lambda: search_products("café"), repeticoes),
+        "catalogo_completo": medir(lambda: search_products(""), repeticoes),
+    }
+
+
+## @brief Mede `get_product_info` percorrendo produtos diferentes a cada execução.
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @param repeticoes Número de execuções.
+# @return Dicionário com as medições.
+@benchmark("get_product_info")
+def bench_get_product_info(dados, repeticoes):
+    ids = cycle(dados["rng"].sample(dados["produtos"], min(repeticoes, len(dados["produtos"]))))
+    return {"produto": medir(lambda: get_product_info(next(ids)), repeticoes)}
+
+
+## @brief Mede `get_cart_data` com um carrinho de `ITENS_CARRINHO` produtos.
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @param repeticoes Número de execuções.
+# @return Dicionário com as medições.
+@benchmark("carrinho")
+def bench_carrinho(dados, repeticoes):
+    request = _criar_request()
+    request.session["cart"] = _carrinho(dados)
+    return {"get_cart_data": medir(lambda: get_cart_data(request), repeticoes)}
+
+
+## @brief Mede `finalizar_compra_view` (requisição completa) com um carrinho na sessão.
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @param repeticoes Número de execuções.
+# @return Dicionário com as medições.
+@benchmark("finalizar_compra")
+def bench_finalizar_compra(dados, repeticoes):
+    client = _cliente(dados)
+    carrinho = _carrinho(dados)
+    url = reverse("core:finalizar_compra")
+
+    def encher_carrinho():
+        session = client.session
+        session["cart"] = dict(carrinho)
+        session.save()
+
+    return {
+        "finalizar_compra": medir(
+            lambda: client.post(url), repeticoes, preparar=encher_carrinho
+        )
+    }
+
+
+## @brief Mede `merge_session_cart_to_db` transferindo um carrinho de sessão para o banco.
+#
+# Antes de cada execução o carrinho do banco é esvaziado, para que todas as execuções
+# façam o mesmo trabalho.
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @param repeticoes Número de execuções.
+# @return Dicionário com as medições.
+@benchmark("merge_carrinho")
+def bench_merge_carrinho(dados, repeticoes):
+    usuario = dados["usuario"]
+    carrinho = _carrinho(dados)
+    request = _criar_request(usuario)
+
+    def preparar():
+        ItemLista.objects.filter(lista__usuario=usuario, lista__finalizada=False).delete()
+        ListaCompra.objects.filter(usuario=usuario, finalizada=False).delete()
+        request.session["cart"] = dict(carrinho)
+
+    return {
+        "merge_session_cart_to_db": medir(
+            lambda: merge_session_cart_to_db(request), repeticoes, preparar=preparar
+        )
+    }
+
+
+## @brief Mede as telas de gerenciamento (requisições GET completas de um usuário staff).
+#
+# @param dados Os dados gerados por `preparar_dados`.
+# @param repeticoes Número de execuções de cada tela.
+# @return Dicionário com as medições de cada tela.
+@benchmark("telas_gerenciamento")
+def bench_telas_gerenciamento(dados, repeticoes):
+    client = _cliente(dados)
+    telas = (
+        "manage_stores",
+        "manage_products",
+        "manage_offers",
+        "manage_categories",
+        "manage_brands",
+        "ver_aprovar_produtos",
+    )
+    return {
+        tela: medir(lambda url=reverse(f"core:{tela}"): client.get(url), repeticoes)
+        for tela in telas
+    }
@@ -0,0 +1,231 @@
+## @file core/busca_aproximada.py
+#
+# @brief Busca tolerante a erros de digitação sobre os nomes dos produtos.
+#
+# Usada por `utils.search_products` quando a busca exata encontra poucos resultados.
+# Cada palavra do termo aceita até `orcamento_edicao(palavra)` edições (inserções,
+# remoções ou trocas de letras), e os produtos são ordenados pela proximidade.
+#
+# No PostgreSQL a busca usa a extensão pg_trgm (operador `<%` sobre
+# `Produto.nome_normalizado`, com índice GIN criado pela migração 0019, e limiar
+# `LIMIAR_POSTGRES` ajustado na transação da consulta). Nos demais
+# bancos, cada processo mantém um `IndiceTrigramas` em memória: o vocabulário das
+# palavras dos nomes e, para cada trigrama, as palavras que o contêm. Uma palavra a `k`
+# edições do termo perde no máximo `3k` dos trigramas dele, então só as palavras que
+# compartilham trigramas suficientes têm a distância de edição calculada. O índice é
+# reconstruído na primeira busca depois de qualquer alteração de produto (versão
+# "nomes_produtos"). Os filtros da busca (nota, categoria) são aplicados antes do corte
+# em `limite`: no PostgreSQL na própria consulta, e em memória conferindo no banco os
+# candidatos, em lotes de `LOTE_FILTRO`, do mais próximo ao menos.
+
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+from . import cache as cache_versionado
+from .models import Produto
+from .texto import normalizar_nome
+
+## @brief Quantidade máxima de produtos retornados por `buscar_aproximado`.
+LIMITE = 20
+
+## @brief Similaridade mínima de palavra (pg_trgm) usada no PostgreSQL.
+#
+# Aplicada pelo operador `<%` através de `pg_trgm.word_similarity_threshold` (padrão
+# 0,6 na extensão), ajustado com `set_config` só na transação da consulta.
+LIMIAR_POSTGRES = 0.4
+
+## @brief Quantidade de candidatos do índice em memória conferidos por consulta aos filtros.
+LOTE_FILTRO = 500
+
+## @brief Nome da versão do cache invalidada quando nomes de produtos mudam.
+VERSAO = "nomes_produtos"
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+## @brief Quantidade de edições aceitas para uma palavra do termo buscado.
+#
+# @param palavra A palavra normalizada.
+# @return 0 para palavras de até 3 letras, 1 até 7 letras e 2 acima disso.
+def orcamento_edicao(palavra):
+    if len(palavra) <= 3:
+        return 0
+    return 1 if len(palavra) <= 7 else 2
+
+
+## @brief Calcula a distância de edição (Levenshtein) entre duas palavras, com limite.
+#
+# Só as diagonais a até `limite` posições da principal são calculadas, e o cálculo para
+# assim que toda a linha passa do limite.
+#
+# @param a Primeira palavra.
+# @param b Segunda palavra.
+# @param limite A maior distância de interesse.
+# @return A distância, ou `limite + 1` se ela for maior que o limite.
+def distancia_edicao(a, b, limite):
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    fora = limite + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i] + [fora] * len(b)
+        inicio, fim = max(1, i - limite), min(len(b), i + limite)
+        for j in range(inicio, fim + 1):
+            atual[j] = min(
+                anterior[j] + 1,
+                atual[j - 1] + 1,
+                anterior[j - 1] + (ca != b[j - 1]),
+            )
+        if min(atual[inicio - 1 : fim + 1]) > limite:
+            return fora
+        anterior = atual
+    return min(anterior[len(b)], fora)
+
+
+## @brief Separa um nome normalizado em palavras.
+def _palavras(texto):
+    return re.findall(r"\w+", texto)
+
+
+## @brief Trigramas de uma palavra, com dois espaços antes e um depois (como no pg_trgm).
+def trigramas(palavra):
+    texto = f"  {palavra} "
+    return {texto[i : i + 3] for i in range(len(texto) - 2)}
+
+
+## @brief Índice em memória de trigramas das palavras dos nomes de produtos.
+class IndiceTrigramas:
+    ## @brief Monta o índice.
+    #
+    # @param produtos Iterável de pares (id, nome normalizado).
+    def __init__(self, produtos):
+        ## Palavra -> IDs dos produtos que a contêm.
+        self.produtos = defaultdict(list)
+        ## Trigrama -> palavras do vocabulário que o contêm.
+        self.palavras = defaultdict(list)
+        for produto_id, nome in produtos:
+            for palavra in set(_palavras(nome)):
+                if palavra not in self.produtos:
+                    for trigrama in trigramas(palavra):
+                        self.palavras[trigrama].append(palavra)
+                self.produtos[palavra].append(produto_id)
+
+    ## @brief Encontra as palavras do vocabulário dentro do orçamento de edições.
+    #
+    # @param palavra A palavra normalizada do termo buscado.
+    # @return Lista de pares (palavra do vocabulário, distância).
+    def palavras_proximas(self, palavra):
+        limite = orcamento_edicao(palavra)
+        if limite == 0:
+            return [(palavra, 0)] if palavra in self.produtos else []
+        proprios = trigramas(palavra)
+        minimo = max(1, len(proprios) - 3 * limite)
+        comuns = Counter()
+        for trigrama in proprios:
+            comuns.update(self.palavras.get(trigrama, ()))
+        resultado = []
+        for candidata, total in comuns.items():
+            if total < minimo:
+                continue
+            distancia = distancia_edicao(palavra, candidata, limite)
+            if distancia <= limite:
+                resultado.append((candidata, distancia))
+        return resultado
+
+    ## @brief Busca os produtos cujos nomes se aproximam do termo.
+    #
+    # Cada palavra do termo contribui com `1 - distância / tamanho` da palavra mais
+    # próxima de cada produto; os produtos são ordenados pela soma.
+    #
+    # @param termo O termo normalizado.
+    # @param limite Quantidade máxima de produtos (None para todos).
+    # @return Lista de IDs de produtos, do mais próximo ao menos.
+    def buscar(self, termo, limite=LIMITE):
+        pontuacao = Counter()
+        for palavra in set(_palavras(termo)):
+            melhores = {}
+            for candidata, distancia in self.palavras_proximas(palavra):
+                nota = 1 - distancia / len(palavra)
+                for produto_id in self.produtos[candidata]:
+                    melhores[produto_id] = max(melhores.get(produto_id, 0), nota)
+            pontuacao.update(melhores)
+        ordenados = sorted(pontuacao.items(), key=lambda item: (-item[1], item[0]))
+        return [produto_id for produto_id, _ in ordenados[:limite]]
+
+
+## @brief Retorna o índice em memória, reconstruindo-o se os produtos mudaram.
+def obter_indice():
+    global _indice
+    versao = cache_versionado.obter_versao(VERSAO)
+    indice = _indice
+    if indice is not None and indice[0] == versao:
+        return indice[1]
+    with _indice_lock:
+        if _indice is None or _indice[0] != versao:
+            produtos = Produto.objects.values_list("id", "nome_normalizado").iterator(
+                chunk_size=2000
+            )
+            _indice = (versao, IndiceTrigramas(produtos))
+        return _indice[1]
+
+
+## @brief Busca produtos por aproximação do nome.
+#
+# @param termo O termo buscado (normalizado aqui).
+# @param limite Quantidade máxima de produtos.
+# @param produtos QuerySet de `Produto` com os filtros da busca (None para todos); só
+#        os produtos dele são retornados.
+# @return Lista de IDs de produtos, do mais próximo ao menos.
+def buscar_aproximado(termo, limite=LIMITE, produtos=None):
+    termo = normalizar_nome(termo)
+    if not termo:
+        return []
+    if connection.vendor == "postgresql":
+        return _buscar_postgres(
+            termo, limite, Produto.objects.all() if produtos is None else produtos
+        )
+    if produtos is None:
+        return obter_indice().buscar(termo, limite)
+
+    candidatos = obter_indice().buscar(termo, None)
+    resultado = []
+    for inicio in range(0, len(candidatos), LOTE_FILTRO):
+        lote = candidatos[inicio : inicio + LOTE_FILTRO]
+        validos = set(produtos.filter(id__in=lote).values_list("id", flat=True))
+        resultado.extend(produto_id for produto_id in lote if produto_id in validos)
+        if len(resultado) >= limite:
+            break
+    return resultado[:limite]
+
+
+## @brief Busca com pg_trgm: o operador `<%` usa o índice GIN de trigramas.
+def _buscar_postgres(termo, limite, produtos):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    tabela = Produto._meta.db_table
+    consulta = (
+        produtos.filter(
+            RawSQL(
+                f'%s <%% "{tabela}"."nome_normalizado"',
+                (termo,),
+                output_field=BooleanField(),
+            )
+        )
+        .annotate(similaridade=TrigramWordSimilarity(termo, "nome_normalizado"))
+        .order_by("-similaridade", "id")
+        .values_list("id", flat=True)[:limite]
+    )
+    # O limiar do `<%` é uma configuração da sessão; `set_config(..., true)` vale só
+    # até o fim da transação
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(LIMIAR_POSTGRES)],
+        )
+        return list(consulta)
@@ -0,0 +1,265 @@
+## @file core/cache.py
+#
+# @brief Cache versionado em dois níveis para dados pequenos e muito lidos.
+#
+# Cada conjunto de dados tem um número de versão guardado no cache compartilhado
+# (Redis em produção). O valor calculado fica no cache compartilhado sob uma chave
+# que inclui a versão e, também, numa cópia local do processo. Uma leitura custa
+# apenas a consulta da versão; invalidar é incrementar a versão, o que torna obsoletas
+# de uma vez as cópias de todos os workers.
+#
+# Também oferece um LRU local de tamanho limitado (`CacheLRU`) para valores por
+# objeto, validados pelas versões do cache compartilhado, e `obter_coalescido`, um
+# cache de resultados com tempo de vida curto em que apenas um worker recalcula cada
+# chave expirada enquanto os demais esperam ou recebem o valor anterior.
+#
+# @see core.signals
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+## @brief Tempo (em segundos) que um valor fica no cache compartilhado.
+#
+# Valores de versões antigas deixam de ser lidos após uma invalidação e expiram sozinhos.
+TIMEOUT_VALORES = 60 * 60 * 24
+
+## @brief Cópias locais do processo: nome do conjunto -> (versão, valor).
+_locais = {}
+
+## @brief Tempo máximo (em segundos) que a trava de recálculo de `obter_coalescido` dura.
+#
+# Se o worker que recalcula morrer, a trava expira sozinha e outro worker assume.
+TIMEOUT_TRAVA = 10
+
+## @brief Tempo máximo (em segundos) que uma requisição espera o recálculo de outro worker.
+ESPERA_COALESCIDA = 2.0
+
+## @brief Intervalo (em segundos) entre as leituras de quem espera o recálculo de outro worker.
+INTERVALO_ESPERA = 0.05
+
+## @brief Recálculos em andamento neste processo: chave -> `threading.Event`.
+_voos = {}
+_voos_lock = threading.Lock()
+
+## @brief Contadores de `obter_coalescido` neste processo.
+#
+# Chaves: "fresco" (valor dentro do prazo), "obsoleto" (valor vencido servido durante o
+# recálculo), "espera" (requisições que aguardaram o recálculo de outra) e "recalculo".
+estatisticas_coalescidas = Counter()
+
+
+## @brief Monta a chave da versão de um conjunto de dados.
+#
+# @param nome Nome do conjunto (ex: "categorias").
+# @return A chave usada no cache compartilhado.
+def _chave_versao(nome):
+    return f"core:versao:{nome}"
+
+
+## @brief Retorna a versão atual de um conjunto de dados, criando-a se necessário.
+#
+# As versões são instantes em nanossegundos (ver `invalidar`). A versão inicial é
+# derivada do relógio para que uma chave expulsa do cache compartilhado nunca volte
+# a um número já usado por alguma cópia local.
+#
+# @param nome Nome do conjunto de dados.
+# @return O número da versão atual.
+def obter_versao(nome):
+    chave = _chave_versao(nome)
+    versao = cache.get(chave)
+    if versao is None:
+        cache.add(chave, time.time_ns(), None)
+        versao = cache.get(chave)
+    return versao
+
+
+## @brief Retorna as versões atuais de vários conjuntos de dados com uma única leitura.
+#
+# Equivalente a chamar `obter_versao` para cada nome, mas consulta o cache compartilhado
+# de uma vez só (as versões inexistentes são criadas como em `obter_versao`).
+#
+# @param nomes Nomes dos conjuntos de dados.
+# @return Tupla com as versões, na ordem dos nomes.
+def obter_versoes(*nomes):
+    chaves = [_chave_versao(nome) for nome in nomes]
+    valores = cache.get_many(chaves)
+    faltantes = [chave for chave in chaves if chave not in valores]
+    if faltantes:
+        for chave in faltantes:
+            cache.add(chave, time.time_ns(), None)
+        valores.update(cache.get_many(faltantes))
+    return tuple(valores[chave] for chave in chaves)
+
+
+## @brief Invalida um conjunto de dados em todos os processos.
+#
+# A versão avança (atomicamente) até o instante atual, de modo que ela também indica
+# quando o conjunto mudou pela última vez (ver `versao_para_datetime`).
+#
+# @param nome Nome do conjunto de dados.
+def invalidar(nome):
+    chave = _chave_versao(nome)
+    atual = cache.get(chave)
+    if atual is None:
+        # A versão não existia (ou foi expulsa): uma nova será criada na próxima leitura
+        return
+    try:
+        cache.incr(chave, max(1, time.time_ns() - atual))
+    except ValueError:
+        pass
+
+
+## @brief Converte uma versão (instante em nanossegundos) em data e hora.
+#
+# Como toda invalidação avança a versão até o instante atual, o resultado nunca é
+# anterior à última alteração do conjunto, e pode ser usado como `Last-Modified`.
+#
+# @param versao A versão retornada por `obter_versao` ou `obter_versoes`.
+# @return Um `datetime` com fuso UTC.
+def versao_para_datetime(versao):
+    return datetime.fromtimestamp(versao / 1e9, tz=timezone.utc)
+
+
+## @brief Obtém um conjunto de dados do cache, calculando-o apenas quando obsoleto.
+#
+# Consulta primeiro a cópia local do processo e depois o cache compartilhado;
+# `carregar` só é chamada quando nenhum dos dois tem a versão atual.
+#
+# @param nome Nome do conjunto de dados.
+# @param carregar Função sem argumentos que calcula o valor a partir do banco.
+# @return O valor correspondente à versão atual.
+def obter_versionado(nome, carregar):
+    versao = obter_versao(nome)
+    local = _locais.get(nome)
+    if local is not None and local[0] == versao:
+        return local[1]
+
+    chave = f"core:{nome}:v{versao}"
+    valor = cache.get(chave)
+    if valor is None:
+        valor = carregar()
+        cache.set(chave, valor, TIMEOUT_VALORES)
+    _locais[nome] = (versao, valor)
+    return valor
+
+
+## @brief Obtém um resultado do cache compartilhado, recalculando-o uma única vez quando vence.
+#
+# O valor fica válido por `ttl` segundos e continua guardado por mais `janela_obsoleta`
+# segundos. Quando ele vence, só uma requisição o recalcula: dentro do processo as
+# threads se coordenam por um `threading.Event`, e entre workers pela trava
+# `<chave>:trava`, criada com `cache.add` (atômico no Redis e no locmem). As demais
+# recebem o valor vencido, se houver, ou esperam até `espera` segundos pelo novo; depois
+# disso calculam por conta própria, para que uma trava perdida nunca bloqueie a resposta.
+#
+# @param chave Chave do resultado no cache compartilhado.
+# @param calcular Função sem argumentos que calcula o resultado.
+# @param ttl Tempo (em segundos) em que o resultado é servido sem recálculo.
+# @param janela_obsoleta Tempo extra (em segundos) em que o valor vencido ainda pode ser servido.
+# @param espera Tempo máximo (em segundos) de espera pelo recálculo de outra requisição.
+# @return O resultado de `calcular` (que pode ser None).
+def obter_coalescido(
+    chave, calcular, ttl, janela_obsoleta=0, espera=ESPERA_COALESCIDA
+):
+    entrada = cache.get(chave)
+    if entrada is not None and entrada[0] > time.time():
+        estatisticas_coalescidas["fresco"] += 1
+        return entrada[1]
+
+    with _voos_lock:
+        evento = _voos.get(chave)
+        lider = evento is None
+        if lider:
+            evento = _voos[chave] = threading.Event()
+
+    if not lider:
+        # Outra thread deste processo já está recalculando a chave
+        if entrada is not None:
+            estatisticas_coalescidas["obsoleto"] += 1
+            return entrada[1]
+        estatisticas_coalescidas["espera"] += 1
+        evento.wait(espera)
+        entrada = cache.get(chave)
+        return entrada[1] if entrada is not None else calcular()
+
+    try:
+        return _recalcular(chave, calcular, ttl, janela_obsoleta, espera, entrada)
+    finally:
+        with _voos_lock:
+            _voos.pop(chave, None)
+        evento.set()
+
+
+## @brief Recalcula a chave de `obter_coalescido` sob a trava do cache compartilhado.
+#
+# @return O resultado recalculado, o valor vencido ou o valor gravado por outro worker.
+def _recalcular(chave, calcular, ttl, janela_obsoleta, espera, entrada):
+    trava = f"{chave}:trava"
+    if not cache.add(trava, 1, TIMEOUT_TRAVA):
+        # Outro worker está recalculando a chave
+        if entrada is not None:
+            estatisticas_coalescidas["obsoleto"] += 1
+            return entrada[1]
+        estatisticas_coalescidas["espera"] += 1
+        limite = time.monotonic() + espera
+        while time.monotonic() < limite:
+            time.sleep(INTERVALO_ESPERA)
+            entrada = cache.get(chave)
+            if entrada is not None:
+                return entrada[1]
+        return calcular()
+
+    try:
+        estatisticas_coalescidas["recalculo"] += 1
+        valor = calcular()
+        cache.set(chave, (time.time() + ttl, valor), ttl + janela_obsoleta)
+        return valor
+    finally:
+        cache.delete(trava)
+
+
+## @class CacheLRU
+#  @brief Cache local do processo, com tamanho máximo e descarte do item menos usado.
+#
+#  Seguro para uso entre threads. Os valores devem carregar a versão com que foram
+#  calculados, para que quem lê possa descartá-los quando a versão compartilhada mudar.
+class CacheLRU:
+    ## @brief Inicializa o cache.
+    # @param tamanho_maximo Quantidade máxima de itens mantidos.
+    def __init__(self, tamanho_maximo):
+        self.tamanho_maximo = tamanho_maximo
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    ## @brief Retorna o valor de uma chave (ou None), marcando-a como usada recentemente.
+    def get(self, chave):
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is not None:
+                self._itens.move_to_end(chave)
+            return valor
+
+    ## @brief Guarda um valor, descartando os itens menos usados além do tamanho máximo.
+    def set(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    ## @brief Remove uma chave, se existir.
+    def delete(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    ## @brief Remove todos os itens.
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
@@ -1,11 +1,16 @@
-from .models import Categoria
+from django.utils.functional import SimpleLazyObject
+
+from .utils import obter_categorias
 
 def categorias_disponiveis(request):
     """
     Processador de contexto que disponibiliza todas as categorias do banco
     para serem acessadas em qualquer template renderizado.
 
+    A lista é avaliada de forma preguiçosa: templates que não leem `categorias`
+    não consultam nem o cache nem o banco.
+
     @param request: objeto HttpRequest
     @return: dicionário com a lista de categorias
     """
-    return {'categorias': Categoria.objects.all()}
\ No newline at end of file
+    return {'categorias': SimpleLazyObject(obter_categorias)}
\ No newline at end of file
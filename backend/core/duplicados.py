@@ -0,0 +1,386 @@
+## @file core/duplicados.py
+#
+# @brief Detecção de produtos duplicados por similaridade de nome (MinHash + LSH).
+#
+# O nome normalizado de cada produto é reduzido a um conjunto de trigramas de
+# caracteres, e a similaridade entre dois nomes é o índice de Jaccard desses conjuntos.
+# Para não comparar um nome com o catálogo inteiro, cada produto guarda em
+# `BandaProduto` as chaves das `NUM_BANDAS` bandas da sua assinatura MinHash: nomes
+# parecidos compartilham alguma chave com alta probabilidade, e os candidatos saem de
+# uma consulta por igualdade no índice. Só os candidatos têm o Jaccard calculado.
+#
+# Com `NUM_BANDAS` = 10 e `LINHAS_POR_BANDA` = 3, um par com Jaccard 0,6 vira candidato
+# com probabilidade ~0,9; com Jaccard 0,2, ~0,08.
+#
+# @see core.management.commands.reconstruir_duplicados
+
+import hashlib
+import random
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from . import cache as cache_versionado
+from .models import (
+    BandaProduto,
+    Comentario,
+    CoocorrenciaProduto,
+    ItemComprado,
+    ItemLista,
+    Oferta,
+    Produto,
+    ProdutoIndicado,
+    SkuLoja,
+    VisualizacaoHora,
+)
+from .recomendacoes import MARCADOR as MARCADOR_COOCORRENCIAS
+from .similares import palavras
+
+## @brief Quantidade de bandas da assinatura MinHash.
+NUM_BANDAS = 10
+
+## @brief Quantidade de valores MinHash por banda.
+LINHAS_POR_BANDA = 3
+
+## @brief Similaridade de Jaccard mínima para considerar dois nomes duplicados.
+LIMIAR = 0.5
+
+## @brief Baldes (chaves) com mais produtos que isto são ignorados no relatório.
+MAX_BALDE = 50
+
+## @brief Campos de `Produto` que, alterados, exigem recalcular as chaves do produto.
+CAMPOS = ("nome", "rejeitado")
+
+_PRIMO = (1 << 61) - 1
+_gerador = random.Random(43)
+## @brief Coeficientes (a, b) das funções de hash `(a * x + b) mod p` da assinatura.
+_COEFICIENTES = [
+    (_gerador.randrange(1, _PRIMO), _gerador.randrange(0, _PRIMO))
+    for _ in range(NUM_BANDAS * LINHAS_POR_BANDA)
+]
+
+
+## @brief Hash estável de 63 bits (igual em todos os processos, ao contrário de `hash`).
+def _hash(texto):
+    return int.from_bytes(hashlib.blake2b(texto.encode(), digest_size=8).digest(), "big") >> 1
+
+
+## @brief Retorna os trigramas de caracteres do nome normalizado.
+#
+# @param nome O nome do produto.
+# @return Conjunto de trigramas (vazio se o nome não tiver palavras).
+def trigramas(nome):
+    texto = " ".join(palavras(nome))
+    if len(texto) < 3:
+        return {texto} if texto else set()
+    return {texto[i : i + 3] for i in range(len(texto) - 2)}
+
+
+## @brief Calcula o índice de Jaccard entre dois conjuntos.
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+## @brief Calcula as chaves LSH de um nome.
+#
+# @param nome O nome do produto.
+# @return Lista com `NUM_BANDAS` chaves (vazia se o nome não tiver palavras).
+def chaves_lsh(nome):
+    hashes = [_hash(trigrama) for trigrama in trigramas(nome)]
+    if not hashes:
+        return []
+    assinatura = [min((a * h + b) % _PRIMO for h in hashes) for a, b in _COEFICIENTES]
+    return [
+        _hash(f"{banda}:{assinatura[banda * LINHAS_POR_BANDA:(banda + 1) * LINHAS_POR_BANDA]}")
+        for banda in range(NUM_BANDAS)
+    ]
+
+
+## @brief Atualiza as chaves LSH de produtos (os rejeitados são removidos do índice).
+#
+# @param ids IDs dos produtos.
+def indexar_produtos(ids):
+    produtos = Produto.objects.filter(id__in=ids, rejeitado=False).only("id", "nome")
+    with transaction.atomic():
+        BandaProduto.objects.filter(produto_id__in=ids).delete()
+        BandaProduto.objects.bulk_create(
+            BandaProduto(produto_id=produto.id, chave=chave)
+            for produto in produtos
+            for chave in chaves_lsh(produto.nome)
+        )
+
+
+## @brief Recalcula as chaves LSH de todos os produtos não rejeitados.
+#
+# @param lote Quantidade de linhas por INSERT.
+# @return Quantidade de produtos indexados.
+def reconstruir_indice(lote=1000):
+    produtos = Produto.objects.filter(rejeitado=False).only("id", "nome")
+    total = 0
+    with transaction.atomic():
+        BandaProduto.objects.all().delete()
+        linhas = []
+        for produto in produtos.iterator():
+            total += 1
+            linhas.extend(
+                BandaProduto(produto_id=produto.id, chave=chave)
+                for chave in chaves_lsh(produto.nome)
+            )
+            if len(linhas) >= lote:
+                BandaProduto.objects.bulk_create(linhas)
+                linhas = []
+        BandaProduto.objects.bulk_create(linhas)
+    return total
+
+
+## @brief Encontra os produtos existentes com nome parecido.
+#
+# @param nome O nome a comparar.
+# @param excluir_id ID de um produto a ignorar (o próprio produto, por exemplo).
+# @param limite Quantidade máxima de resultados.
+# @return Lista de pares (produto, similaridade), do mais parecido ao menos.
+def encontrar_duplicatas(nome, excluir_id=None, limite=5):
+    chaves = chaves_lsh(nome)
+    if not chaves:
+        return []
+    candidatos = (
+        Produto.objects.filter(bandas_lsh__chave__in=chaves)
+        .exclude(id=excluir_id)
+        .distinct()
+        .only("id", "nome", "aprovado")
+    )
+    referencia = trigramas(nome)
+    resultados = [
+        (produto, similaridade)
+        for produto in candidatos
+        if (similaridade := jaccard(referencia, trigramas(produto.nome))) >= LIMIAR
+    ]
+    resultados.sort(key=lambda item: (-item[1], item[0].id))
+    return resultados[:limite]
+
+
+## @brief Agrupa os produtos do catálogo em grupos de prováveis duplicatas.
+#
+# Lê, numa única consulta, apenas as linhas de `BandaProduto` cuja chave aparece em mais
+# de um produto, confirma cada par pelo Jaccard dos nomes e une os pares confirmados
+# (union-find).
+#
+# @return Lista de grupos (listas de dicionários com id, nome, aprovado e ofertas),
+#         os maiores primeiro; em cada grupo, os produtos com mais ofertas primeiro.
+def agrupar_duplicatas():
+    repetidas = (
+        BandaProduto.objects.values("chave")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1, total__lte=MAX_BALDE)
+        .values("chave")
+    )
+    ofertas = (
+        Oferta.objects.filter(produto_id=OuterRef("produto_id"))
+        .order_by()
+        .values("produto_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    baldes = defaultdict(list)
+    detalhes = {}
+    for chave, produto_id, nome, aprovado, ofertas_total in (
+        BandaProduto.objects.filter(chave__in=repetidas)
+        .annotate(ofertas_total=Coalesce(Subquery(ofertas), 0))
+        .values_list(
+            "chave", "produto_id", "produto__nome", "produto__aprovado", "ofertas_total"
+        )
+    ):
+        baldes[chave].append(produto_id)
+        detalhes[produto_id] = {
+            "id": produto_id,
+            "nome": nome,
+            "aprovado": aprovado,
+            "ofertas_total": ofertas_total,
+        }
+
+    pais = {}
+
+    def raiz(pk):
+        while pais.setdefault(pk, pk) != pk:
+            pk = pais[pk]
+        return pk
+
+    conjuntos = {pk: trigramas(produto["nome"]) for pk, produto in detalhes.items()}
+    verificados = set()
+    for membros in baldes.values():
+        for i, a in enumerate(membros):
+            for b in membros[i + 1 :]:
+                par = (min(a, b), max(a, b))
+                if par in verificados:
+                    continue
+                verificados.add(par)
+                if jaccard(conjuntos[a], conjuntos[b]) >= LIMIAR:
+                    pais[raiz(a)] = raiz(b)
+
+    grupos = defaultdict(list)
+    for pk in detalhes:
+        grupos[raiz(pk)].append(detalhes[pk])
+    resultado = [
+        sorted(membros, key=lambda produto: (-produto["ofertas_total"], produto["id"]))
+        for membros in grupos.values()
+        if len(membros) > 1
+    ]
+    resultado.sort(key=lambda grupo: (-len(grupo), grupo[0]["id"]))
+    return resultado
+
+
+## @brief Move as linhas de um modelo para o produto mantido, descartando as que violariam
+#         a restrição de unicidade.
+#
+# @param modelo O modelo com FK `produto`.
+# @param campos Demais campos da restrição de unicidade com `produto`.
+# @param manter O produto mantido.
+# @param duplicados IDs dos produtos descartados.
+def _mover_unicos(modelo, campos, manter, duplicados):
+    existentes = set(modelo.objects.filter(produto=manter).values_list(*campos))
+    mover, descartar = [], []
+    for pk, *chave in modelo.objects.filter(produto_id__in=duplicados).values_list(
+        "id", *campos
+    ):
+        chave = tuple(chave)
+        (descartar if chave in existentes else mover).append(pk)
+        existentes.add(chave)
+    modelo.objects.filter(id__in=mover).update(produto=manter)
+    modelo.objects.filter(id__in=descartar).delete()
+
+
+## @brief Passa o código de barras de um duplicado para o produto mantido, se ele não tiver.
+#
+# O código é retirado do duplicado antes, por causa da unicidade de `Produto.ean`.
+#
+# @param manter O produto mantido.
+# @param duplicados IDs dos produtos descartados.
+def _mover_ean(manter, duplicados):
+    if Produto.objects.filter(id=manter.pk, ean__isnull=False).exists():
+        return
+    ean = (
+        Produto.objects.filter(id__in=duplicados, ean__isnull=False)
+        .order_by("id")
+        .values_list("ean", flat=True)
+        .first()
+    )
+    if ean is not None:
+        Produto.objects.filter(ean=ean).update(ean=None)
+        Produto.objects.filter(id=manter.pk).update(ean=ean)
+
+
+## @brief Soma as visualizações por hora dos duplicados às do produto mantido.
+#
+# As linhas que faltam são criadas com zero e depois incrementadas com `F()`, agrupadas
+# pelo incremento, como em `utils.gravar_visualizacoes`.
+#
+# @param manter O produto mantido.
+# @param duplicados IDs dos produtos descartados.
+def _somar_visualizacoes_por_hora(manter, duplicados):
+    somas = (
+        VisualizacaoHora.objects.filter(produto_id__in=duplicados)
+        .order_by()
+        .values("hora")
+        .annotate(total=Sum("quantidade"))
+        .values_list("hora", "total")
+    )
+    lotes = defaultdict(list)
+    for hora, total in somas:
+        lotes[total].append(hora)
+    if not lotes:
+        return
+    VisualizacaoHora.objects.bulk_create(
+        [VisualizacaoHora(produto=manter, hora=hora) for horas in lotes.values() for hora in horas],
+        ignore_conflicts=True,
+    )
+    for total, horas in lotes.items():
+        VisualizacaoHora.objects.filter(produto=manter, hora__in=horas).update(
+            quantidade=F("quantidade") + total
+        )
+
+
+## @brief Passa as coocorrências de compras dos duplicados para o produto mantido.
+#
+# Os pares com um duplicado passam a ser do mantido, com as contagens somadas às dos
+# pares que ele já tinha; pares entre o mantido e um duplicado são descartados. Uma
+# cesta que tinha o mantido e um duplicado conta duas vezes nos pares com os demais
+# produtos dela, o que é aceitável para a ordenação dos relacionados.
+#
+# @param manter O produto mantido.
+# @param duplicados IDs dos produtos descartados.
+# @return Quantidade de pares somados ao produto mantido.
+def _mover_coocorrencias(manter, duplicados):
+    descartados = set(duplicados)
+    pares = Counter()
+    for produto_id, relacionado_id, contagem in CoocorrenciaProduto.objects.filter(
+        Q(produto_id__in=descartados) | Q(relacionado_id__in=descartados)
+    ).values_list("produto_id", "relacionado_id", "contagem"):
+        a = manter.pk if produto_id in descartados else produto_id
+        b = manter.pk if relacionado_id in descartados else relacionado_id
+        if a != b:
+            pares[(a, b)] += contagem
+    if not pares:
+        return 0
+
+    CoocorrenciaProduto.objects.bulk_create(
+        [CoocorrenciaProduto(produto_id=a, relacionado_id=b) for a, b in pares],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+    for (a, b), contagem in pares.items():
+        CoocorrenciaProduto.objects.filter(produto_id=a, relacionado_id=b).update(
+            contagem=F("contagem") + contagem
+        )
+    return len(pares)
+
+
+## @brief Mescla produtos duplicados num único produto.
+#
+# Ofertas, itens de listas, SKUs de lojas, compras, comentários, indicações, contadores
+# de visualização (totais e por hora) e coocorrências de compras passam para o produto
+# mantido (ofertas e itens de lista repetidos são descartados), assim como o código de
+# barras, se o mantido não tiver um. Os agregados de nota são recalculados e os
+# duplicados são excluídos.
+#
+# @param manter O produto mantido.
+# @param duplicados IDs dos produtos a mesclar em `manter`.
+# @return Quantidade de produtos excluídos.
+def mesclar_produtos(manter, duplicados):
+    duplicados = [pk for pk in duplicados if pk != manter.pk]
+    with transaction.atomic():
+        _mover_unicos(Oferta, ("loja_id", "data_captura"), manter, duplicados)
+        _mover_unicos(ItemLista, ("lista_id",), manter, duplicados)
+        _mover_unicos(SkuLoja, ("loja_id", "sku"), manter, duplicados)
+        _mover_ean(manter, duplicados)
+        _somar_visualizacoes_por_hora(manter, duplicados)
+        coocorrencias = _mover_coocorrencias(manter, duplicados)
+        ItemComprado.objects.filter(produto_id__in=duplicados).update(produto=manter)
+        Comentario.objects.filter(produto_id__in=duplicados).update(produto=manter)
+        ProdutoIndicado.objects.filter(produto_existente_id__in=duplicados).update(
+            produto_existente=manter
+        )
+
+        contadores = Produto.objects.filter(id__in=duplicados).aggregate(
+            visualizacoes=Sum("visualizacoes"), cliques=Sum("cliques")
+        )
+        notas = Comentario.objects.filter(produto=manter, nota__isnull=False).aggregate(
+            soma=Sum("nota"), total=Count("id")
+        )
+        Produto.objects.filter(id=manter.pk).update(
+            visualizacoes=F("visualizacoes") + (contadores["visualizacoes"] or 0),
+            cliques=F("cliques") + (contadores["cliques"] or 0),
+            soma_notas=notas["soma"] or 0,
+            total_avaliacoes=notas["total"],
+            nota_media=(notas["soma"] / notas["total"]) if notas["total"] else None,
+        )
+        _, excluidos = Produto.objects.filter(id__in=duplicados).delete()
+    if coocorrencias:
+        cache_versionado.invalidar(MARCADOR_COOCORRENCIAS)
+    # Dispara os sinais que atualizam os caches e índices do produto mantido
+    manter.refresh_from_db()
+    manter.save()
+    return excluidos.get("core.Produto", 0)
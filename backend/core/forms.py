@@ -3,8 +3,8 @@
 
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from django.contrib.auth import authenticate
 from .models import Usuario, Produto, Loja, Oferta, Categoria, Marca, ItemLista, ListaCompra, Comentario
+from .importacao import normalizar_ean
 
 ## @class CustomUserCreationForm
 #  @brief Formulário customizado de registro de usuário.
@@ -27,6 +27,9 @@ class CustomUserCreationForm(UserCreationForm):
 
 ## @class CustomAuthenticationForm
 #  @brief Formulário de login que permite autenticação via username ou e-mail.
+#
+#  A validação padrão do `AuthenticationForm` chama `authenticate` uma única vez;
+#  a busca por username ou e-mail é feita por `core.backends.EmailOuUsernameBackend`.
 class CustomAuthenticationForm(AuthenticationForm):
     def __init__(self, request=None, *args, **kwargs):
         super().__init__(request=request, *args, **kwargs)
@@ -36,35 +39,6 @@ class CustomAuthenticationForm(AuthenticationForm):
         self.fields["username"].widget.attrs["class"] = "form-control"
         self.fields["password"].widget.attrs["class"] = "form-control"
 
-    ## @brief Valida as credenciais, permitindo login por e-mail.
-    def clean(self):
-        username = self.cleaned_data.get("username")
-        password = self.cleaned_data.get("password")
-
-        if username and password:
-            user = authenticate(self.request, username=username, password=password)
-            if user is None:
-                if "@" in username:
-                    try:
-                        user_by_email = Usuario.objects.get(email=username)
-                        user = authenticate(
-                            self.request,
-                            username=user_by_email.username,
-                            password=password,
-                        )
-                    except Usuario.DoesNotExist:
-                        pass
-
-            if user is None:
-                raise forms.ValidationError(
-                    self.error_messages["invalid_login"],
-                    code="invalid_login",
-                    params={"username": self.username_field.verbose_name},
-                )
-            else:
-                self.user_cache = user
-        return self.cleaned_data
-
 ## @class ProdutoForm
 #  @brief Formulário para criação ou edição de produtos.
 class ProdutoForm(forms.ModelForm):
@@ -79,6 +53,7 @@ class ProdutoForm(forms.ModelForm):
             "imagem_url",
             "categoria",
             "marca",
+            "ean",
             "product_id_hidden",
         ]
         labels = {
@@ -87,6 +62,7 @@ class ProdutoForm(forms.ModelForm):
             "imagem_url": "URL da Imagem",
             "categoria": "Categoria",
             "marca": "Marca",
+            "ean": "Código de Barras (EAN/GTIN)",
         }
         widgets = {
             "descricao": forms.Textarea(attrs={"rows": 4}),
@@ -106,6 +82,16 @@ class ProdutoForm(forms.ModelForm):
         if self.instance and self.instance.pk:
             self.fields["product_id_hidden"].initial = self.instance.pk
 
+    ## @brief Normaliza o código de barras para GTIN-14 (vazio vira None, por ser único).
+    def clean_ean(self):
+        ean = self.cleaned_data.get("ean")
+        if not ean:
+            return None
+        normalizado = normalizar_ean(ean)
+        if normalizado is None:
+            raise forms.ValidationError("Código de barras inválido.")
+        return normalizado
+
 ## @class LojaForm
 #  @brief Formulário para criação ou edição de lojas.
 class LojaForm(forms.ModelForm):
@@ -163,12 +149,19 @@ class OfertaForm(forms.ModelForm):
 class CategoriaForm(forms.ModelForm):
     class Meta:
         model = Categoria
-        fields = ["nome"]
-        labels = {"nome": "Nome da Categoria"}
+        fields = ["nome", "pai"]
+        labels = {"nome": "Nome da Categoria", "pai": "Categoria Pai"}
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["nome"].widget.attrs["class"] = "form-control"
+        self.fields["pai"].widget.attrs["class"] = "form-select"
+        self.fields["pai"].empty_label = "Nenhuma (primeiro nível)"
+        pais = Categoria.objects.order_by("nome")
+        if self.instance.pk and self.instance.caminho:
+            # Uma categoria não pode ficar abaixo dela mesma nem de uma descendente
+            pais = pais.exclude(Categoria.filtro_subarvore(self.instance.caminho))
+        self.fields["pai"].queryset = pais
 
 
 ## @class MarcaForm
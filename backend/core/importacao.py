@@ -0,0 +1,209 @@
+## @file core/importacao.py
+#
+# @brief Importação em lote de preços de lojas, resolvendo cada linha para um produto
+#        do catálogo por SKU da loja, código de barras ou nome.
+#
+# No início de cada importação, `IndiceProdutos` carrega de uma vez os mapeamentos
+# GTIN -> produto (de `Produto.ean`) e (loja, SKU) -> produto (de `SkuLoja`) em
+# dicionários; cada linha recebida é então resolvida em memória, sem consulta. Quando
+# uma linha traz SKU e código de barras e só o código é conhecido, o par (loja, SKU) é
+# aprendido e gravado ao final, para que as próximas importações da loja dispensem o
+# código de barras.
+#
+# Linhas sem SKU nem código de barras conhecidos podem ainda ser resolvidas pelo nome do
+# produto, comparado pela coluna normalizada `Produto.nome_normalizado` (sem acentos nem
+# maiúsculas); só nomes que identificam um único produto são usados.
+#
+# @see core.management.commands.importar_ofertas
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from . import cache as cache_versionado
+from .models import Loja, Oferta, Produto, SkuLoja
+from .seed import TAMANHO_LOTE, inserir_em_lotes
+from .texto import normalizar_nome
+
+## @brief Comprimentos aceitos de código de barras: EAN-8, UPC-A, EAN-13 e GTIN-14.
+COMPRIMENTOS_GTIN = (8, 12, 13, 14)
+
+
+## @brief Normaliza um código de barras para GTIN-14.
+#
+# Remove espaços e separadores, completa com zeros à esquerda e confere o dígito
+# verificador.
+#
+# @param codigo O código recebido (pode ser None).
+# @return O GTIN com 14 dígitos, ou None se o código for vazio ou inválido.
+def normalizar_ean(codigo):
+    digitos = "".join(c for c in str(codigo or "") if c.isdigit())
+    if len(digitos) not in COMPRIMENTOS_GTIN:
+        return None
+    digitos = digitos.zfill(14)
+    soma = sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(digitos[:13]))
+    if (10 - soma % 10) % 10 != int(digitos[13]):
+        return None
+    return digitos
+
+
+## @brief Converte o preço de uma linha importada.
+#
+# @param valor O preço recebido ("12.90", "12,90" ou número).
+# @return O preço como Decimal, ou None se for inválido ou não positivo.
+def _preco(valor):
+    try:
+        preco = Decimal(str(valor).strip().replace(",", "."))
+    except (InvalidOperation, ValueError):
+        return None
+    return preco.quantize(Decimal("0.01")) if preco.is_finite() and preco > 0 else None
+
+
+## @brief Índice em memória para resolver linhas importadas em produtos.
+#
+# Carregado uma vez por importação; as consultas de `resolver` não acessam o banco.
+class IndiceProdutos:
+    ## @brief Carrega os mapeamentos do banco.
+    #
+    # @param lojas IDs das lojas cujos SKUs serão carregados (None para todas).
+    def __init__(self, lojas=None):
+        self.lojas = {
+            normalizar_nome(nome): pk for nome, pk in Loja.objects.values_list("nome", "id")
+        }
+        self.por_ean = dict(
+            Produto.objects.filter(ean__isnull=False)
+            .values_list("ean", "id")
+            .iterator(chunk_size=TAMANHO_LOTE)
+        )
+        skus = SkuLoja.objects.all()
+        if lojas is not None:
+            skus = skus.filter(loja_id__in=lojas)
+        self.por_sku = {
+            (loja_id, sku): produto_id
+            for loja_id, sku, produto_id in skus.values_list(
+                "loja_id", "sku", "produto_id"
+            ).iterator(chunk_size=TAMANHO_LOTE)
+        }
+        ## Pares (loja, SKU) aprendidos durante a importação e ainda não gravados.
+        self.novos_skus = {}
+        ## Nome normalizado -> produto, carregado só se alguma linha precisar.
+        self._por_nome = None
+
+    ## @brief Retorna o ID da loja com o nome informado (sem diferenciar acentos nem maiúsculas).
+    #
+    # @param nome O nome da loja.
+    # @return O ID da loja, ou None se não houver loja com esse nome.
+    def loja(self, nome):
+        return self.lojas.get(normalizar_nome(nome))
+
+    ## @brief Retorna o produto com o nome normalizado informado, se for único.
+    def _produto_por_nome(self, nome):
+        if self._por_nome is None:
+            self._por_nome = {}
+            for nome_normalizado, produto_id in (
+                Produto.objects.values_list("nome_normalizado", "id")
+                .iterator(chunk_size=TAMANHO_LOTE)
+            ):
+                # Nomes repetidos são ambíguos e ficam marcados com None
+                self._por_nome[nome_normalizado] = (
+                    None if nome_normalizado in self._por_nome else produto_id
+                )
+        return self._por_nome.get(normalizar_nome(nome))
+
+    ## @brief Resolve uma linha para o ID de um produto.
+    #
+    # O SKU da loja tem prioridade; se não for conhecido, o código de barras é usado e,
+    # por último, o nome do produto.
+    #
+    # @param loja_id ID da loja.
+    # @param sku Código do produto na loja (opcional).
+    # @param ean Código de barras (opcional, em qualquer formato aceito).
+    # @param nome Nome do produto (opcional).
+    # @return O ID do produto, ou None se a linha não corresponder a nenhum produto.
+    def resolver(self, loja_id, sku=None, ean=None, nome=None):
+        sku = (sku or "").strip()[:64]
+        if sku:
+            produto_id = self.por_sku.get((loja_id, sku))
+            if produto_id is not None:
+                return produto_id
+        produto_id = self.por_ean.get(normalizar_ean(ean))
+        if produto_id is not None and sku:
+            self.por_sku[(loja_id, sku)] = produto_id
+            self.novos_skus[(loja_id, sku)] = produto_id
+        if produto_id is None and nome:
+            produto_id = self._produto_por_nome(nome)
+        return produto_id
+
+    ## @brief Grava os pares (loja, SKU) aprendidos.
+    #
+    # @return Quantidade de pares gravados.
+    def gravar_skus(self):
+        SkuLoja.objects.bulk_create(
+            (
+                SkuLoja(loja_id=loja_id, sku=sku, produto_id=produto_id)
+                for (loja_id, sku), produto_id in self.novos_skus.items()
+            ),
+            batch_size=TAMANHO_LOTE,
+            ignore_conflicts=True,
+        )
+        total = len(self.novos_skus)
+        self.novos_skus = {}
+        return total
+
+
+## @brief Importa ofertas a partir de linhas de preços de lojas.
+#
+# Cada linha é um dicionário com "loja" (nome), "preco" e ao menos um entre "sku",
+# "ean" e "nome". Linhas repetidas para o mesmo produto e loja dentro de um lote mantêm
+# o último preço. As ofertas são inseridas com `bulk_create`, em lotes, e os caches do
+# catálogo são invalidados uma única vez ao final.
+#
+# @param linhas Iterável de dicionários (por exemplo, um `csv.DictReader`).
+# @param lote Quantidade de ofertas por `bulk_create`.
+# @param indice Um `IndiceProdutos` já carregado (opcional).
+# @return Dicionário com as contagens: importadas, sem_produto, loja_desconhecida,
+#         preco_invalido e novos_skus.
+def importar_ofertas(linhas, lote=TAMANHO_LOTE, indice=None):
+    indice = indice or IndiceProdutos()
+    resumo = {"sem_produto": 0, "loja_desconhecida": 0, "preco_invalido": 0}
+
+    def ofertas():
+        pendentes = {}
+        for linha in linhas:
+            loja_id = indice.loja(linha.get("loja"))
+            if loja_id is None:
+                resumo["loja_desconhecida"] += 1
+                continue
+            preco = _preco(linha.get("preco"))
+            if preco is None:
+                resumo["preco_invalido"] += 1
+                continue
+            produto_id = indice.resolver(
+                loja_id, linha.get("sku"), linha.get("ean"), linha.get("nome")
+            )
+            if produto_id is None:
+                resumo["sem_produto"] += 1
+                continue
+            # Oferta é única por produto, loja e momento da captura
+            pendentes[(produto_id, loja_id)] = preco
+            if len(pendentes) >= lote:
+                yield from _novas_ofertas(pendentes)
+                pendentes = {}
+        yield from _novas_ofertas(pendentes)
+
+    with transaction.atomic():
+        resumo["importadas"] = inserir_em_lotes(Oferta, ofertas(), lote, retornar=False)
+        resumo["novos_skus"] = indice.gravar_skus()
+    if resumo["importadas"]:
+        # `bulk_create` não dispara os sinais que invalidam os caches do catálogo
+        cache_versionado.invalidar("produto_json")
+        cache_versionado.invalidar("catalogo")
+    return resumo
+
+
+## @brief Cria as ofertas de um lote de pares (produto, loja) -> preço.
+def _novas_ofertas(pendentes):
+    return (
+        Oferta(produto_id=produto_id, loja_id=loja_id, preco=preco)
+        for (produto_id, loja_id), preco in pendentes.items()
+    )
@@ -0,0 +1,29 @@
+## @file core/management/commands/atualizar_coocorrencias.py
+#
+# @brief Comando `manage.py atualizar_coocorrencias`, que atualiza o índice de produtos
+#        comprados juntos com as compras novas.
+#
+# Deve ser agendado periodicamente (por exemplo, a cada 10 minutos no cron):
+#
+#     */10 * * * * cd /app/backend && python manage.py atualizar_coocorrencias
+
+from django.core.management.base import BaseCommand
+
+from core.recomendacoes import LOTE_COMPRAS, atualizar_coocorrencias
+
+
+## @brief Soma as compras ainda não processadas ao índice de coocorrências.
+class Command(BaseCommand):
+    help = "Atualiza o índice de produtos comprados juntos com as compras novas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=LOTE_COMPRAS,
+            help="Compras processadas por transação.",
+        )
+
+    def handle(self, *args, **options):
+        total = atualizar_coocorrencias(options["lote"])
+        self.stdout.write(f"{total} compra(s) processada(s).")
@@ -0,0 +1,103 @@
+## @file core/management/commands/benchmark.py
+#
+# @brief Comando `manage.py benchmark`, que executa os benchmarks de `core.benchmarks`.
+#
+# Um banco de testes é criado antes da execução e destruído ao final, de modo que
+# os dados gerados pelos benchmarks nunca tocam o banco configurado. O volume de dados
+# e a semente são configuráveis, e o resultado (com o commit e os parâmetros usados)
+# pode ser salvo em JSON para comparar execuções em commits diferentes.
+
+import json
+import subprocess
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmarks import BENCHMARKS, preparar_dados
+
+
+## @brief Obtém o commit atual do repositório, se disponível.
+#
+# @return O hash do commit ou None fora de um repositório git.
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+## @brief Executa os benchmarks registrados e imprime (ou salva) os resultados em JSON.
+class Command(BaseCommand):
+    help = "Executa os benchmarks de desempenho em um banco de testes temporário."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "nomes",
+            nargs="*",
+            help=f"Benchmarks a executar (padrão: todos). Opções: {', '.join(BENCHMARKS)}",
+        )
+        parser.add_argument(
+            "--repeticoes", type=int, default=50, help="Execuções por medição."
+        )
+        parser.add_argument(
+            "--produtos", type=int, default=2000, help="Produtos gerados."
+        )
+        parser.add_argument("--lojas", type=int, default=50, help="Lojas geradas.")
+        parser.add_argument(
+            "--ofertas", type=int, default=20000, help="Ofertas geradas (total)."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=42, help="Semente dos dados sintéticos."
+        )
+        parser.add_argument(
+            "--saida", help="Arquivo JSON onde os resultados serão salvos."
+        )
+
+    def handle(self, *args, **options):
+        nomes = options["nomes"] or list(BENCHMARKS)
+        desconhecidos = [nome for nome in nomes if nome not in BENCHMARKS]
+        if desconhecidos:
+            raise CommandError(f"Benchmark desconhecido: {', '.join(desconhecidos)}")
+
+        parametros = {
+            chave: options[chave]
+            for chave in ("repeticoes", "produtos", "lojas", "ofertas", "seed")
+        }
+
+        nome_original = connection.settings_dict["NAME"]
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            dados = preparar_dados(
+                options["produtos"], options["lojas"], options["ofertas"], options["seed"]
+            )
+            resultados = {
+                nome: BENCHMARKS[nome](dados, options["repeticoes"]) for nome in nomes
+            }
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+
+        relatorio = {
+            "metadados": {
+                "commit": _commit_atual(),
+                "data": datetime.now(timezone.utc).isoformat(),
+                "banco": connection.vendor,
+                "parametros": parametros,
+            },
+            "resultados": resultados,
+        }
+        saida = json.dumps(relatorio, indent=2, ensure_ascii=False)
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as arquivo:
+                arquivo.write(saida + "\n")
+            self.stdout.write(f"Resultados salvos em {options['saida']}")
+        else:
+            self.stdout.write(saida)
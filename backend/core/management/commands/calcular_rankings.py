@@ -0,0 +1,25 @@
+## @file core/management/commands/calcular_rankings.py
+#
+# @brief Comando `manage.py calcular_rankings`, que recalcula os rankings de produtos.
+#
+# Deve ser agendado periodicamente (por exemplo, a cada 10 minutos no cron):
+#
+#     */10 * * * * cd /app/backend && python manage.py calcular_rankings
+#
+# As visualizações só entram no cálculo depois que cada worker web as grava em
+# `VisualizacaoHora` (ver `core.utils.registrar_visualizacao`). Os contadores pendentes
+# ficam na memória dos workers, fora do alcance deste processo, então os rankings podem
+# não contar as visualizações dos últimos `VISUALIZACOES_INTERVALO` segundos.
+
+from django.core.management.base import BaseCommand
+
+from core.rankings import calcular_rankings
+
+
+## @brief Recalcula os rankings de produtos em alta e mais vendidos.
+class Command(BaseCommand):
+    help = "Recalcula os rankings de produtos em alta e mais vendidos."
+
+    def handle(self, *args, **options):
+        for tipo, total in calcular_rankings().items():
+            self.stdout.write(f"{tipo}: {total} produto(s)")
@@ -0,0 +1,59 @@
+## @file core/management/commands/importar_ofertas.py
+#
+# @brief Comando `manage.py importar_ofertas`, que importa preços de lojas de um
+#        arquivo CSV.
+#
+# O arquivo deve ter as colunas `loja` (nome da loja), `preco` e ao menos uma entre
+# `sku` (código do produto na loja), `ean` (código de barras) e `nome` (nome do produto):
+#
+#     python manage.py importar_ofertas precos.csv
+#
+# @see core.importacao
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importacao import importar_ofertas
+from core.seed import TAMANHO_LOTE
+
+## @brief Colunas obrigatórias do arquivo.
+COLUNAS = {"loja", "preco"}
+
+
+## @brief Importa as ofertas de um CSV, resolvendo os produtos por SKU, código de barras ou nome.
+class Command(BaseCommand):
+    help = "Importa ofertas de um arquivo CSV (colunas loja, preco e sku, ean e/ou nome)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do arquivo CSV.")
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=TAMANHO_LOTE,
+            help="Ofertas inseridas por comando INSERT.",
+        )
+        parser.add_argument(
+            "--delimitador", default=",", help="Separador de colunas do arquivo."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            arquivo = open(options["arquivo"], newline="", encoding="utf-8-sig")
+        except OSError as erro:
+            raise CommandError(f"Não foi possível abrir o arquivo: {erro}")
+        with arquivo:
+            leitor = csv.DictReader(arquivo, delimiter=options["delimitador"])
+            colunas = set(leitor.fieldnames or ())
+            if not COLUNAS <= colunas or not colunas & {"sku", "ean", "nome"}:
+                raise CommandError(
+                    "O arquivo deve ter as colunas loja, preco e sku, ean e/ou nome."
+                )
+            resumo = importar_ofertas(leitor, options["lote"])
+        self.stdout.write(
+            f"{resumo['importadas']} oferta(s) importada(s); "
+            f"{resumo['sem_produto']} sem produto correspondente, "
+            f"{resumo['loja_desconhecida']} de loja desconhecida, "
+            f"{resumo['preco_invalido']} com preço inválido; "
+            f"{resumo['novos_skus']} SKU(s) novo(s) associado(s)."
+        )
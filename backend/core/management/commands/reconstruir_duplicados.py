@@ -0,0 +1,24 @@
+## @file core/management/commands/reconstruir_duplicados.py
+#
+# @brief Comando `manage.py reconstruir_duplicados`, que recalcula as chaves LSH usadas
+#        na detecção de produtos duplicados.
+#
+# Os produtos salvos pela aplicação são indexados automaticamente; o comando é
+# necessário apenas após cargas em lote (como `seed_catalog`) ou mudanças nos
+# parâmetros de `core.duplicados`.
+
+from django.core.management.base import BaseCommand
+
+from core.duplicados import agrupar_duplicatas, reconstruir_indice
+
+
+## @brief Recalcula as chaves LSH de todos os produtos e resume os grupos de duplicatas.
+class Command(BaseCommand):
+    help = "Recalcula o índice de detecção de produtos duplicados."
+
+    def handle(self, *args, **options):
+        total = reconstruir_indice()
+        grupos = agrupar_duplicatas()
+        self.stdout.write(
+            f"{total} produto(s) indexado(s); {len(grupos)} grupo(s) de prováveis duplicatas."
+        )
@@ -0,0 +1,27 @@
+## @file core/management/commands/reconstruir_similares.py
+#
+# @brief Comando `manage.py reconstruir_similares`, que recalcula o índice TF-IDF de
+#        produtos similares.
+#
+# Os produtos aprovados no dia a dia entram no índice incrementalmente; a reconstrução
+# recalcula as frequências de documento de todos e deve ser agendada, por exemplo:
+#
+#     0 4 * * * cd /app/backend && python manage.py reconstruir_similares
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.similares import reconstruir_indice
+
+
+## @brief Recalcula os vetores TF-IDF de todos os produtos aprovados.
+class Command(BaseCommand):
+    help = "Recalcula o índice TF-IDF de produtos similares."
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        total = reconstruir_indice()
+        self.stdout.write(
+            f"{total} produto(s) indexado(s) em {time.perf_counter() - inicio:.1f}s."
+        )
@@ -0,0 +1,105 @@
+## @file core/management/commands/seed_catalog.py
+#
+# @brief Comando `manage.py seed_catalog`, que popula o banco configurado com dados sintéticos.
+#
+# Gera categorias, marcas, lojas, produtos, históricos de preço, usuários, listas de
+# compras, compras e comentários com `core.seed`. A mesma semente e os mesmos tamanhos
+# produzem sempre os mesmos dados. Exemplo:
+#
+#     python manage.py seed_catalog --products 100000 --stores 500 --days 30
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Loja, Produto
+from core.seed import TAMANHO_LOTE, gerar_atividade, gerar_catalogo
+
+
+## @brief Popula o banco com um catálogo sintético e a atividade de usuários sobre ele.
+class Command(BaseCommand):
+    help = "Gera dados sintéticos (catálogo, preços, usuários, compras e comentários) para testes de carga."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products", type=int, default=1000, help="Produtos gerados."
+        )
+        parser.add_argument("--stores", type=int, default=20, help="Lojas geradas.")
+        parser.add_argument(
+            "--days", type=int, default=30, help="Dias de histórico de preços."
+        )
+        parser.add_argument(
+            "--offers-per-product",
+            type=int,
+            default=5,
+            help="Lojas que vendem cada produto (ofertas por dia).",
+        )
+        parser.add_argument(
+            "--categories", type=int, default=20, help="Categorias geradas."
+        )
+        parser.add_argument("--brands", type=int, default=200, help="Marcas geradas.")
+        parser.add_argument("--users", type=int, default=100, help="Usuários gerados.")
+        parser.add_argument(
+            "--purchases",
+            type=int,
+            help="Itens comprados no total (padrão: 20 por usuário).",
+        )
+        parser.add_argument(
+            "--comments",
+            type=int,
+            help="Comentários no total (padrão: 2 por produto).",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=42, help="Semente do gerador pseudoaleatório."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TAMANHO_LOTE,
+            help="Linhas por bulk_create.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("--days deve ser pelo menos 1.")
+        # Os nomes gerados são fixos; uma segunda execução violaria as restrições de unicidade
+        if Produto.objects.exists() or Loja.objects.exists():
+            raise CommandError(
+                "O banco já possui produtos ou lojas; use seed_catalog em um banco vazio."
+            )
+
+        produtos = options["products"]
+        usuarios = options["users"]
+        compras = (
+            options["purchases"] if options["purchases"] is not None else usuarios * 20
+        )
+        comentarios = (
+            options["comments"] if options["comments"] is not None else produtos * 2
+        )
+
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            dados = gerar_catalogo(
+                produtos,
+                options["stores"],
+                produtos * options["offers_per_product"],
+                seed=options["seed"],
+                categorias=options["categories"],
+                marcas=options["brands"],
+                dias=options["days"],
+                lote=options["batch_size"],
+            )
+            self.stdout.write(
+                f"Catálogo: {len(dados['produtos'])} produtos, {len(dados['lojas'])} lojas, "
+                f"{len(dados['precos_atuais']) * options['days']} ofertas "
+                f"({time.perf_counter() - inicio:.1f}s)"
+            )
+            gerar_atividade(dados, usuarios, compras, comentarios)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(dados['usuarios'])} usuários, {compras} compras e {comentarios} "
+                f"comentários gerados em {time.perf_counter() - inicio:.1f}s."
+            )
+        )
@@ -0,0 +1,130 @@
+## @file core/middleware.py
+#
+# @brief Middleware de instrumentação das consultas SQL de cada requisição.
+#
+# Registra, para cada requisição, a quantidade de consultas, o tempo total gasto no
+# banco e quantas vezes cada consulta normalizada se repetiu. Os números são enviados
+# no cabeçalho `Server-Timing` (visível nas ferramentas do navegador) e numa linha de
+# log em JSON no logger `core.sql`. Requisições em que a mesma consulta roda mais de
+# `SQL_LIMITE_REPETICOES` vezes (o padrão N+1) geram um aviso com o nome da view.
+#
+# Funciona com `DEBUG=False`, pois usa `connection.execute_wrapper` em vez do
+# registro de consultas do modo de depuração.
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+## Logger das métricas de SQL por requisição.
+logger = logging.getLogger("core.sql")
+
+## @brief Quantidade padrão de repetições de uma mesma consulta a partir da qual a requisição é sinalizada.
+LIMITE_REPETICOES_PADRAO = 5
+
+## Expressões usadas para normalizar as consultas (literais e listas de IN).
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTA_IN = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_ESPACOS = re.compile(r"\s+")
+
+
+## @brief Normaliza uma consulta SQL para que execuções com parâmetros diferentes coincidam.
+#
+# Substitui literais de texto e números por `?`, colapsa listas de `IN (...)` e espaços.
+#
+# @param sql O texto da consulta.
+# @return A consulta normalizada, usada como impressão digital.
+def normalizar_sql(sql):
+    sql = _LITERAL_TEXTO.sub("?", sql)
+    sql = _LITERAL_NUMERO.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _LISTA_IN.sub("IN (...)", sql)
+    return _ESPACOS.sub(" ", sql).strip()
+
+
+## @class ColetorConsultas
+#  @brief Wrapper de execução que acumula as métricas das consultas de uma requisição.
+class ColetorConsultas:
+    def __init__(self):
+        self.total = 0
+        self.duracao = 0.0
+        self.impressoes = Counter()
+
+    ## @brief Executa a consulta medindo seu tempo (assinatura exigida por `execute_wrapper`).
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duracao += time.perf_counter() - inicio
+            self.total += 1
+            self.impressoes[normalizar_sql(sql)] += 1
+
+    ## @brief Retorna as consultas repetidas mais vezes que o limite.
+    #
+    # @param limite Quantidade máxima aceitável de execuções de uma mesma consulta.
+    # @return Lista de pares (consulta normalizada, execuções), da mais repetida para a menos.
+    def repetidas(self, limite):
+        return [(sql, n) for sql, n in self.impressoes.most_common() if n > limite]
+
+
+## @class InstrumentacaoSQLMiddleware
+#  @brief Mede as consultas SQL de cada requisição e sinaliza padrões N+1.
+#
+#  O limite de repetições pode ser ajustado por `settings.SQL_LIMITE_REPETICOES`.
+class InstrumentacaoSQLMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limite = getattr(
+            settings, "SQL_LIMITE_REPETICOES", LIMITE_REPETICOES_PADRAO
+        )
+
+    def __call__(self, request):
+        coletor = ColetorConsultas()
+        inicio = time.perf_counter()
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(coletor))
+            response = self.get_response(request)
+        duracao_total = time.perf_counter() - inicio
+
+        db_ms = coletor.duracao * 1000
+        response["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{coletor.total} consultas", '
+            f"total;dur={duracao_total * 1000:.1f}"
+        )
+
+        view = self._nome_view(request)
+        repetidas = coletor.repetidas(self.limite)
+        registro = {
+            "metodo": request.method,
+            "caminho": request.path,
+            "view": view,
+            "status": response.status_code,
+            "consultas": coletor.total,
+            "db_ms": round(db_ms, 1),
+            "total_ms": round(duracao_total * 1000, 1),
+            "repetidas": [{"sql": sql, "vezes": n} for sql, n in repetidas],
+        }
+        if repetidas:
+            logger.warning(
+                "Possível N+1 em %s: %s", view, json.dumps(registro, ensure_ascii=False)
+            )
+        else:
+            logger.info(json.dumps(registro, ensure_ascii=False))
+        return response
+
+    ## @brief Obtém o nome da view que atendeu a requisição.
+    #
+    # @param request O objeto HttpRequest do Django.
+    # @return O caminho pontuado da view (ex: "core.views.checkout_view") ou None.
+    @staticmethod
+    def _nome_view(request):
+        match = getattr(request, "resolver_match", None)
+        return match._func_path if match is not None else None
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_produto_aprovado"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="produto",
+            name="rejeitado",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="produto",
+            index=models.Index(
+                condition=models.Q(("aprovado", False), ("rejeitado", False)),
+                fields=["data_adicao", "id"],
+                name="produto_pendente_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="produto",
+            index=models.Index(
+                condition=models.Q(("aprovado", False), ("rejeitado", False)),
+                fields=["adicionado_por", "data_adicao", "id"],
+                name="produto_pendente_autor_idx",
+            ),
+        ),
+    ]
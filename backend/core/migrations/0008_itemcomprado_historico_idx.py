@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_produto_rejeitado_pendentes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="itemcomprado",
+            index=models.Index(
+                fields=["usuario", "-data_compra", "-id"],
+                name="itemcomprado_historico_idx",
+            ),
+        ),
+    ]
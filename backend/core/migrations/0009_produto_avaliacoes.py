@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:08
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def preencher_avaliacoes(apps, schema_editor):
+    Produto = apps.get_model("core", "Produto")
+    Comentario = apps.get_model("core", "Comentario")
+    agregados = (
+        Comentario.objects.filter(produto__isnull=False, nota__isnull=False)
+        .values("produto_id")
+        .annotate(soma=Sum("nota"), total=Count("id"))
+    )
+    for linha in agregados:
+        Produto.objects.filter(id=linha["produto_id"]).update(
+            soma_notas=linha["soma"],
+            total_avaliacoes=linha["total"],
+            nota_media=linha["soma"] / linha["total"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_itemcomprado_historico_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="produto",
+            name="nota_media",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="produto",
+            name="soma_notas",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="produto",
+            name="total_avaliacoes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(preencher_avaliacoes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="comentario",
+            index=models.Index(
+                fields=["produto", "-data", "-id"], name="comentario_produto_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="produto",
+            index=models.Index(fields=["-nota_media", "nome"], name="produto_nota_idx"),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_produto_avaliacoes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="categoria",
+            name="atualizado_em",
+            field=models.DateTimeField(auto_now=True, verbose_name="Atualizado Em"),
+        ),
+        migrations.AddField(
+            model_name="loja",
+            name="atualizado_em",
+            field=models.DateTimeField(auto_now=True, verbose_name="Atualizado Em"),
+        ),
+        migrations.AddField(
+            model_name="marca",
+            name="atualizado_em",
+            field=models.DateTimeField(auto_now=True, verbose_name="Atualizado Em"),
+        ),
+        migrations.AddField(
+            model_name="oferta",
+            name="atualizado_em",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, verbose_name="Atualizado Em"
+            ),
+        ),
+        migrations.AddField(
+            model_name="produto",
+            name="atualizado_em",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, verbose_name="Atualizado Em"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_atualizado_em"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="produto",
+            name="cliques",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="produto",
+            name="visualizacoes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_contadores_visualizacao"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RankingProduto",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("em_alta_24h", "Em alta nas últimas 24 horas"),
+                            ("em_alta_7d", "Em alta nos últimos 7 dias"),
+                            ("mais_vendidos", "Mais vendidos"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("posicao", models.PositiveSmallIntegerField()),
+                ("pontuacao", models.FloatField()),
+                ("calculado_em", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Ranking de Produto",
+                "verbose_name_plural": "Rankings de Produtos",
+                "ordering": ["tipo", "posicao"],
+            },
+        ),
+        migrations.CreateModel(
+            name="VisualizacaoHora",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hora", models.DateTimeField()),
+                ("quantidade", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Visualizações por Hora",
+                "verbose_name_plural": "Visualizações por Hora",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="itemcomprado",
+            index=models.Index(
+                fields=["data_compra", "produto"], name="itemcomprado_data_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="rankingproduto",
+            name="produto",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="core.produto"
+            ),
+        ),
+        migrations.AddField(
+            model_name="visualizacaohora",
+            name="produto",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="visualizacoes_por_hora",
+                to="core.produto",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="rankingproduto",
+            constraint=models.UniqueConstraint(
+                fields=("tipo", "posicao"), name="rankingproduto_posicao_unica"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="visualizacaohora",
+            index=models.Index(fields=["hora"], name="visualizacaohora_hora_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="visualizacaohora",
+            constraint=models.UniqueConstraint(
+                fields=("produto", "hora"), name="visualizacaohora_unica"
+            ),
+        ),
+    ]
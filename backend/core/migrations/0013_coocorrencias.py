@@ -0,0 +1,80 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_rankings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MarcadorProcessamento",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nome", models.CharField(max_length=50, unique=True)),
+                ("ultimo_id", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Marcador de Processamento",
+                "verbose_name_plural": "Marcadores de Processamento",
+            },
+        ),
+        migrations.CreateModel(
+            name="CoocorrenciaProduto",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("contagem", models.PositiveIntegerField(default=0)),
+                (
+                    "produto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="coocorrencias",
+                        to="core.produto",
+                    ),
+                ),
+                (
+                    "relacionado",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.produto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Coocorrência de Produtos",
+                "verbose_name_plural": "Coocorrências de Produtos",
+                "indexes": [
+                    models.Index(
+                        fields=["produto", "-contagem", "relacionado"],
+                        name="coocorrencia_top_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("produto", "relacionado"), name="coocorrencia_par_unico"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_coocorrencias"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TermoProduto",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("termo", models.CharField(max_length=64)),
+                ("peso", models.FloatField()),
+                (
+                    "produto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="termos",
+                        to="core.produto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Termo de Produto",
+                "verbose_name_plural": "Termos de Produtos",
+                "indexes": [
+                    models.Index(
+                        fields=["termo", "produto", "peso"],
+                        name="termoproduto_termo_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("produto", "termo"), name="termoproduto_unico"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_termos_produto"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BandaProduto",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chave", models.BigIntegerField(db_index=True)),
+                (
+                    "produto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bandas_lsh",
+                        to="core.produto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Banda LSH de Produto",
+                "verbose_name_plural": "Bandas LSH de Produtos",
+            },
+        ),
+    ]
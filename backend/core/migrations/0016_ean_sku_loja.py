@@ -0,0 +1,71 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:00
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_bandas_lsh"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="produto",
+            name="ean",
+            field=models.CharField(
+                blank=True,
+                max_length=14,
+                null=True,
+                unique=True,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        "^\\d{14}$", "Informe o GTIN com 14 dígitos."
+                    )
+                ],
+                verbose_name="Código de Barras (EAN/GTIN)",
+            ),
+        ),
+        migrations.CreateModel(
+            name="SkuLoja",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sku", models.CharField(max_length=64, verbose_name="SKU")),
+                (
+                    "loja",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="skus",
+                        to="core.loja",
+                    ),
+                ),
+                (
+                    "produto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="skus",
+                        to="core.produto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "SKU de Loja",
+                "verbose_name_plural": "SKUs de Lojas",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("loja", "sku"), name="skuloja_unico"
+                    )
+                ],
+            },
+        ),
+    ]
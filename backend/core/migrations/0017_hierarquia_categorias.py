@@ -0,0 +1,42 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+
+
+def preencher_caminhos(apps, schema_editor):
+    # As categorias existentes passam a ser de primeiro nível
+    Categoria = apps.get_model("core", "Categoria")
+    Categoria.objects.update(caminho=Concat(Cast("id", CharField()), Value("/")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_ean_sku_loja"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="categoria",
+            name="caminho",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="categoria",
+            name="pai",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="filhas",
+                to="core.categoria",
+                verbose_name="Categoria Pai",
+            ),
+        ),
+        migrations.RunPython(preencher_caminhos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:10
+
+from django.db import migrations, models
+
+from core.texto import normalizar_nome
+
+
+def preencher_nomes_normalizados(apps, schema_editor):
+    for nome_modelo in ("Categoria", "Marca", "Produto"):
+        modelo = apps.get_model("core", nome_modelo)
+        objetos = list(modelo.objects.only("id", "nome"))
+        for obj in objetos:
+            obj.nome_normalizado = normalizar_nome(obj.nome)
+        modelo.objects.bulk_update(objetos, ["nome_normalizado"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_hierarquia_categorias"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="categoria",
+            name="nome_normalizado",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.AddField(
+            model_name="marca",
+            name="nome_normalizado",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.AddField(
+            model_name="produto",
+            name="nome_normalizado",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(preencher_nomes_normalizados, migrations.RunPython.noop),
+    ]
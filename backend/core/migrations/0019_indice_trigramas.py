@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:40
+
+from django.db import migrations
+
+
+def criar_indice_trigramas(apps, schema_editor):
+    # A busca aproximada só usa o banco no PostgreSQL; os demais usam o índice em memória
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS core_produto_nome_trgm "
+        "ON core_produto USING gin (nome_normalizado gin_trgm_ops)"
+    )
+
+
+def remover_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS core_produto_nome_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0018_nomes_normalizados"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_trigramas, remover_indice_trigramas),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:01
+
+from django.db import migrations, models
+
+
+def marcar_processadas(apps, schema_editor):
+    # As compras até o antigo marcador já foram somadas ao índice de coocorrências
+    MarcadorProcessamento = apps.get_model("core", "MarcadorProcessamento")
+    ItemComprado = apps.get_model("core", "ItemComprado")
+    marcador = MarcadorProcessamento.objects.filter(nome="coocorrencias").first()
+    if marcador is not None:
+        ItemComprado.objects.filter(id__lte=marcador.ultimo_id).update(
+            coocorrencia_processada=True
+        )
+
+
+def restaurar_marcador(apps, schema_editor):
+    MarcadorProcessamento = apps.get_model("core", "MarcadorProcessamento")
+    ItemComprado = apps.get_model("core", "ItemComprado")
+    ultimo_id = (
+        ItemComprado.objects.filter(coocorrencia_processada=True)
+        .aggregate(models.Max("id"))["id__max"]
+    )
+    if ultimo_id is not None:
+        MarcadorProcessamento.objects.update_or_create(
+            nome="coocorrencias", defaults={"ultimo_id": ultimo_id}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0019_indice_trigramas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="itemcomprado",
+            name="coocorrencia_processada",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(marcar_processadas, restaurar_marcador),
+        migrations.DeleteModel(
+            name="MarcadorProcessamento",
+        ),
+        migrations.AddIndex(
+            model_name="itemcomprado",
+            index=models.Index(
+                condition=models.Q(("coocorrencia_processada", False)),
+                fields=["id"],
+                name="itemcomprado_pendente_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0020_coocorrencia_processada"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="termoproduto",
+            name="termoproduto_termo_idx",
+        ),
+        migrations.AddIndex(
+            model_name="termoproduto",
+            index=models.Index(
+                fields=["termo", "-peso", "produto"], name="termoproduto_peso_idx"
+            ),
+        ),
+    ]
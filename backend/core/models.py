@@ -10,17 +10,71 @@
 # Cada modelo herda de `django.db.models.Model` e define campos com tipos de dados
 # apropriados, validações, relacionamentos e metadados para administração.
 
-from django.db import models
-from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings  # Importar settings para referenciar o User model
 
+from .texto import normalizar_nome
+
+# --- Nomes normalizados ---
+
+## @brief QuerySet que mantém `nome_normalizado` nas operações em lote.
+#
+# `update()`, `bulk_create()` e `bulk_update()` não passam por `save()`; aqui, sempre que
+# `nome` é gravado, `nome_normalizado` é gravado junto.
+class NomeNormalizadoQuerySet(models.QuerySet):
+    ## @brief Atualiza as linhas, incluindo o nome normalizado quando `nome` muda.
+    #
+    # @exception ValueError Se `nome` for uma expressão (ex: `F()`), que não pode ser
+    #            normalizada em Python.
+    def update(self, **kwargs):
+        # `bulk_update()` chega aqui com expressões para os dois campos
+        if "nome" in kwargs and "nome_normalizado" not in kwargs:
+            if not isinstance(kwargs["nome"], str):
+                raise ValueError("update(nome=...) aceita apenas textos.")
+            kwargs["nome_normalizado"] = normalizar_nome(kwargs["nome"])
+        return super().update(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.nome_normalizado = normalizar_nome(obj.nome)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if "nome" in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.nome_normalizado = normalizar_nome(obj.nome)
+            fields = [*fields, "nome_normalizado"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+
+## @brief Mantém `nome_normalizado` (ver `texto.normalizar_nome`) a cada `save()`.
+#
+# Os modelos que o usam declaram o campo `nome_normalizado` e usam
+# `NomeNormalizadoQuerySet` como manager, para cobrir também as operações em lote.
+class NomeNormalizadoMixin:
+    def save(self, *args, **kwargs):
+        self.nome_normalizado = normalizar_nome(self.nome)
+        campos = kwargs.get("update_fields")
+        if campos is not None and "nome" in campos:
+            kwargs["update_fields"] = {*campos, "nome_normalizado"}
+        super().save(*args, **kwargs)
+
+
 # --- Modelos Principais ---
 
 ## @brief Modelo que representa uma Categoria de produto.
 #
-# Cada categoria possui um nome único.
-class Categoria(models.Model):
+# Cada categoria possui um nome único e pode ficar abaixo de outra (ex: "Frutas" dentro
+# de "Hortifruti"). A hierarquia é guardada também como caminho materializado, para que
+# uma categoria e todas as descendentes sejam filtradas numa única consulta.
+class Categoria(NomeNormalizadoMixin, models.Model):
     ## @var nome
     # @brief Nome da categoria (ex: "Alimentos", "Eletrônicos").
     # @type models.CharField
@@ -28,6 +82,39 @@ class Categoria(models.Model):
     nome = models.CharField(
         max_length=100, unique=True, verbose_name="Nome da Categoria"
     )
+    ## @var nome_normalizado
+    # @brief Nome sem acentos, em minúsculas e com espaços simples, usado nas buscas.
+    # @type models.CharField
+    # @details Mantido por `NomeNormalizadoMixin` e `NomeNormalizadoQuerySet`.
+    nome_normalizado = models.CharField(max_length=100, default="", db_index=True, editable=False)
+    ## @var pai
+    # @brief Categoria imediatamente acima desta na hierarquia.
+    # @type models.ForeignKey
+    # @details Nulo para as categorias de primeiro nível. Se o pai for excluído, a
+    #          categoria passa ao primeiro nível (ver `signals.reenraizar_categorias`).
+    pai = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="filhas",
+        verbose_name="Categoria Pai",
+    )
+    ## @var caminho
+    # @brief Caminho materializado: os IDs da raiz até a categoria, cada um seguido de "/".
+    # @type models.CharField
+    # @details Ex: "3/17/" para a categoria 17, filha da 3. Mantido por `save()`; as
+    #          descendentes de uma categoria são as linhas cujo caminho começa pelo
+    #          dela, obtidas por um prefixo no índice (ver `filtro_subarvore`).
+    caminho = models.CharField(max_length=255, default="", db_index=True, editable=False)
+    ## @var atualizado_em
+    # @brief Data e hora da última alteração da categoria.
+    # @type models.DateTimeField
+    # @details Atualizado automaticamente a cada `save()`. Usado nos validadores
+    #          (`Last-Modified`) das APIs JSON.
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado Em")
+
+    objects = NomeNormalizadoQuerySet.as_manager()
 
     ## @brief Opções de metadados para o modelo Categoria.
     #
@@ -44,16 +131,82 @@ class Categoria(models.Model):
     def __str__(self):
         return self.nome
 
+    ## @brief Monta o filtro das categorias de uma subárvore (a própria raiz incluída).
+    #
+    # O filtro é um prefixo (`LIKE 'caminho%'`), correto em qualquer collation. No
+    # PostgreSQL ele usa o índice `_like` (varchar_pattern_ops) que o Django cria para
+    # `caminho` junto com o índice comum; um intervalo de texto dependeria da ordem da
+    # collation do banco, que em locales como en_US.UTF-8 ignora a "/".
+    #
+    # @param caminho O caminho da raiz da subárvore.
+    # @param campo O campo filtrado (ex: "categoria__caminho" para filtrar produtos).
+    # @return Um objeto Q.
+    @staticmethod
+    def filtro_subarvore(caminho, campo="caminho"):
+        return models.Q(**{f"{campo}__startswith": caminho})
+
+    ## @brief IDs das categorias do caminho, da raiz até esta.
+    @property
+    def ancestrais_ids(self):
+        return [int(pk) for pk in self.caminho.split("/") if pk]
+
+    ## @brief Impede que uma categoria seja colocada abaixo dela mesma.
+    def clean(self):
+        if self.pai_id and self.pk and str(self.pk) in (
+            Categoria.objects.filter(pk=self.pai_id).values_list("caminho", flat=True).first() or ""
+        ).split("/"):
+            raise ValidationError({"pai": "A categoria não pode ficar abaixo dela mesma."})
+
+    ## @brief Salva a categoria e mantém os caminhos dela e das descendentes.
+    #
+    # Ao mudar de pai, os caminhos de toda a subárvore são reescritos num único UPDATE,
+    # na mesma transação em que a categoria é salva.
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            prefixo = ""
+            if self.pai_id:
+                prefixo = Categoria.objects.filter(pk=self.pai_id).values_list(
+                    "caminho", flat=True
+                ).get()
+                if self.pk is not None and str(self.pk) in prefixo.split("/"):
+                    raise ValueError("A categoria não pode ficar abaixo dela mesma.")
+            if self.pk is None:
+                super().save(*args, **kwargs)
+                self.caminho = f"{prefixo}{self.pk}/"
+                Categoria.objects.filter(pk=self.pk).update(caminho=self.caminho)
+                return
+
+            antigo, self.caminho = self.caminho, f"{prefixo}{self.pk}/"
+            if antigo and antigo != self.caminho:
+                Categoria.objects.filter(
+                    Categoria.filtro_subarvore(antigo), ~models.Q(pk=self.pk)
+                ).update(
+                    caminho=Concat(Value(self.caminho), Substr("caminho", len(antigo) + 1))
+                )
+            super().save(*args, **kwargs)
+
 ## @brief Modelo que representa uma Marca de produto.
 #
 # Cada marca possui um nome único.
-class Marca(models.Model):
+class Marca(NomeNormalizadoMixin, models.Model):
     ## @var nome
     # @brief Nome da marca (ex: "Nestlé", "Sony").
     # @type models.CharField
     # @details Único e obrigatório.
     nome = models.CharField(max_length=100, unique=True, verbose_name="Nome da Marca")
+    ## @var nome_normalizado
+    # @brief Nome sem acentos, em minúsculas e com espaços simples, usado nas buscas.
+    # @type models.CharField
+    # @details Mantido por `NomeNormalizadoMixin` e `NomeNormalizadoQuerySet`.
+    nome_normalizado = models.CharField(max_length=100, default="", db_index=True, editable=False)
+    ## @var atualizado_em
+    # @brief Data e hora da última alteração da marca.
+    # @type models.DateTimeField
+    # @details Atualizado automaticamente a cada `save()`. Usado nos validadores
+    #          (`Last-Modified`) das APIs JSON.
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado Em")
 
+    objects = NomeNormalizadoQuerySet.as_manager()
 
     class Meta:
         ## @brief Opções de metadados para o modelo Marca.
@@ -98,12 +251,17 @@ class Usuario(AbstractUser):
 ## @brief Modelo que representa um Produto no catálogo.
 #
 # Inclui informações detalhadas sobre o produto, sua categoria, marca, e status de aprovação.
-class Produto(models.Model):
+class Produto(NomeNormalizadoMixin, models.Model):
     ## @var nome
     # @brief Nome do produto (ex: "Arroz Parboilizado").
     # @type models.CharField
     # @details Obrigatório.
     nome = models.CharField(max_length=255, verbose_name="Nome do Produto")
+    ## @var nome_normalizado
+    # @brief Nome sem acentos, em minúsculas e com espaços simples, usado nas buscas.
+    # @type models.CharField
+    # @details Mantido por `NomeNormalizadoMixin` e `NomeNormalizadoQuerySet`.
+    nome_normalizado = models.CharField(max_length=255, default="", db_index=True, editable=False)
     ## @var descricao
     # @brief Descrição detalhada do produto.
     # @type models.TextField
@@ -157,6 +315,59 @@ class Produto(models.Model):
     # @type models.BooleanField
     # @details Padrão é `False`.
     aprovado = models.BooleanField(default=False)
+    ## @var rejeitado
+    # @brief Indica se o produto foi rejeitado pela equipe administrativa.
+    # @type models.BooleanField
+    # @details Padrão é `False`. Produtos pendentes são os não aprovados e não rejeitados.
+    rejeitado = models.BooleanField(default=False)
+    ## @var soma_notas
+    # @brief Soma das notas dos comentários do produto.
+    # @type models.PositiveIntegerField
+    # @details Mantida incrementalmente ao criar e excluir comentários.
+    soma_notas = models.PositiveIntegerField(default=0, editable=False)
+    ## @var total_avaliacoes
+    # @brief Quantidade de comentários do produto que possuem nota.
+    # @type models.PositiveIntegerField
+    # @details Mantida incrementalmente ao criar e excluir comentários.
+    total_avaliacoes = models.PositiveIntegerField(default=0, editable=False)
+    ## @var nota_media
+    # @brief Média das notas dos comentários do produto.
+    # @type models.FloatField
+    # @details Nula enquanto o produto não tiver avaliações. Permite ordenar e filtrar
+    #          o catálogo por nota sem agregar a tabela de comentários.
+    nota_media = models.FloatField(null=True, blank=True, editable=False)
+    ## @var visualizacoes
+    # @brief Quantidade de visualizações da página do produto.
+    # @type models.PositiveIntegerField
+    # @details Acumulada em memória e gravada em lotes (ver `utils.registrar_visualizacao`).
+    visualizacoes = models.PositiveIntegerField(default=0, editable=False)
+    ## @var cliques
+    # @brief Quantidade de aberturas da página do produto pelos resultados do catálogo.
+    # @type models.PositiveIntegerField
+    # @details Acumulada em memória e gravada em lotes (ver `utils.registrar_visualizacao`).
+    cliques = models.PositiveIntegerField(default=0, editable=False)
+    ## @var atualizado_em
+    # @brief Data e hora da última alteração do produto.
+    # @type models.DateTimeField
+    # @details Atualizado automaticamente a cada `save()`. Usado nos validadores
+    #          (`Last-Modified`) das APIs JSON.
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Atualizado Em")
+    ## @var ean
+    # @brief Código de barras do produto (EAN-8, UPC, EAN-13 ou GTIN-14).
+    # @type models.CharField
+    # @details Opcional e único. Guardado como GTIN-14 (completado com zeros à
+    #          esquerda, ver `importacao.normalizar_ean`), para que o mesmo código
+    #          escrito em formatos diferentes resolva o mesmo produto.
+    ean = models.CharField(
+        max_length=14,
+        unique=True,
+        null=True,
+        blank=True,
+        validators=[RegexValidator(r"^\d{14}$", "Informe o GTIN com 14 dígitos.")],
+        verbose_name="Código de Barras (EAN/GTIN)",
+    )
+
+    objects = NomeNormalizadoQuerySet.as_manager()
 
     class Meta:
         ## @brief Opções de metadados para o modelo Produto.
@@ -164,15 +375,85 @@ class Produto(models.Model):
         # @param verbose_name Nome singular legível para humanos.
         # @param verbose_name_plural Nome plural legível para humanos.
         # @param ordering Ordem padrão para consulta, por nome ascendente.
+        # @param indexes Índices parciais sobre os produtos pendentes, usados pela fila
+        #        de aprovação com e sem o filtro por quem enviou o produto, e índice
+        #        sobre a nota média, usado pela ordenação do catálogo.
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
         ordering = ["nome"]
+        indexes = [
+            models.Index(
+                fields=["data_adicao", "id"],
+                condition=models.Q(aprovado=False, rejeitado=False),
+                name="produto_pendente_idx",
+            ),
+            models.Index(
+                fields=["adicionado_por", "data_adicao", "id"],
+                condition=models.Q(aprovado=False, rejeitado=False),
+                name="produto_pendente_autor_idx",
+            ),
+            models.Index(fields=["-nota_media", "nome"], name="produto_nota_idx"),
+        ]
 
     ## @brief Representação em string do objeto Produto.
     # @return O nome do produto.
     def __str__(self):
         return self.nome
 
+    ## @brief Carrega o produto do banco e guarda os valores dos campos indexados.
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        produto = super().from_db(db, field_names, values)
+        produto._indexados = produto._valores_indexados()
+        return produto
+
+    ## @brief Salva o produto; os valores gravados passam a ser a nova referência.
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._indexados = self._valores_indexados()
+
+    ## @brief Valores atuais dos campos de `CAMPOS_INDEXADOS` carregados na instância.
+    def _valores_indexados(self):
+        return {
+            atributo: self.__dict__[atributo]
+            for atributo in map(_atributo_produto, CAMPOS_INDEXADOS)
+            if atributo in self.__dict__
+        }
+
+    ## @brief Indica se algum dos campos mudou desde que o produto foi lido ou salvo.
+    #
+    # Usado pelos sinais de `post_save` (antes de `save()` atualizar a referência) para
+    # não reindexar o produto quando só outros campos foram gravados. Campos adiados
+    # (`only()`/`defer()`) e não atribuídos não são gravados e contam como inalterados.
+    #
+    # @param campos Nomes dos campos de interesse (subconjunto de `CAMPOS_INDEXADOS`).
+    # @param update_fields O `update_fields` do `save()`, se houver.
+    # @return True para produtos novos ou com algum dos campos alterado.
+    def indexados_alterados(self, campos, update_fields=None):
+        anteriores = getattr(self, "_indexados", None)
+        if anteriores is None:
+            return True
+        for campo in campos:
+            atributo = _atributo_produto(campo)
+            if update_fields is not None and not {campo, atributo} & set(update_fields):
+                continue
+            if atributo in self.__dict__ and (
+                atributo not in anteriores or anteriores[atributo] != self.__dict__[atributo]
+            ):
+                return True
+        return False
+
+
+## @brief Campos de `Produto` usados pelos índices de similares e de duplicatas.
+#
+# Ver `Produto.indexados_alterados` e os sinais em `core.signals`.
+CAMPOS_INDEXADOS = ("nome", "descricao", "categoria", "marca", "aprovado", "rejeitado")
+
+
+## @brief Nome do atributo de um campo de `Produto` (ex: "categoria_id" para "categoria").
+def _atributo_produto(campo):
+    return Produto._meta.get_field(campo).attname
+
 
 ## @brief Modelo que representa uma Loja onde os produtos podem ser comprados.
 #
@@ -195,6 +476,12 @@ class Loja(models.Model):
     # @type models.URLField
     # @details Opcional.
     logo_url = models.URLField(max_length=500, blank=True, verbose_name="URL do Logo")
+    ## @var atualizado_em
+    # @brief Data e hora da última alteração da loja.
+    # @type models.DateTimeField
+    # @details Atualizado automaticamente a cada `save()`. Usado nos validadores
+    #          (`Last-Modified`) das APIs JSON.
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado Em")
 
     class Meta:
         ## @brief Opções de metadados para o modelo Loja.
@@ -244,6 +531,12 @@ class Oferta(models.Model):
     data_captura = models.DateTimeField(
         auto_now_add=True, verbose_name="Data de Captura"
     )
+    ## @var atualizado_em
+    # @brief Data e hora da última alteração da oferta.
+    # @type models.DateTimeField
+    # @details Atualizado automaticamente a cada `save()`. Usado nos validadores
+    #          (`Last-Modified`) das APIs JSON.
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Atualizado Em")
 
     class Meta:
         ## @brief Opções de metadados para o modelo Oferta.
@@ -304,6 +597,12 @@ class ItemComprado(models.Model):
     # @type models.DateField
     # @details Obrigatório.
     data_compra = models.DateField(verbose_name="Data da Compra")
+    ## @var coocorrencia_processada
+    # @brief Indica se a compra já foi somada ao índice de coocorrências.
+    # @type models.BooleanField
+    # @details Marcado por `core.recomendacoes.atualizar_coocorrencias` na mesma transação
+    #          em que os pares da compra são gravados.
+    coocorrencia_processada = models.BooleanField(default=False, editable=False)
 
     class Meta:
         ## @brief Opções de metadados para o modelo ItemComprado.
@@ -311,9 +610,27 @@ class ItemComprado(models.Model):
         # @param verbose_name Nome singular legível para humanos.
         # @param verbose_name_plural Nome plural legível para humanos.
         # @param ordering Ordem padrão para consulta, pela data de compra descendente.
+        # @param indexes Índice do histórico de cada usuário, na ordem da paginação por cursor,
+        #        índice por data, usado pelo cálculo dos rankings (`core.rankings`), e índice
+        #        parcial das compras ainda não somadas às coocorrências.
         verbose_name = "Item Comprado"
         verbose_name_plural = "Itens Comprados"
         ordering = ["-data_compra"]
+        indexes = [
+            models.Index(
+                fields=["usuario", "-data_compra", "-id"],
+                name="itemcomprado_historico_idx",
+            ),
+            models.Index(
+                fields=["data_compra", "produto"],
+                name="itemcomprado_data_idx",
+            ),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(coocorrencia_processada=False),
+                name="itemcomprado_pendente_idx",
+            ),
+        ]
     
     ## @brief Representação em string do objeto ItemComprado.
     # @return Uma string descrevendo o item comprado (produto, usuário).
@@ -488,9 +805,15 @@ class Comentario(models.Model):
         # @param verbose_name Nome singular legível para humanos.
         # @param verbose_name_plural Nome plural legível para humanos.
         # @param ordering Ordem padrão para consulta, pela data descendente.
+        # @param indexes Índice usado pela paginação por cursor dos comentários de um produto.
         verbose_name = "Comentário"
         verbose_name_plural = "Comentários"
         ordering = ["-data"]
+        indexes = [
+            models.Index(
+                fields=["produto", "-data", "-id"], name="comentario_produto_idx"
+            ),
+        ]
 
     ## @brief Representação em string do objeto Comentario.
     # @return Uma string descrevendo o comentário (usuário, produto/loja).
@@ -592,4 +915,249 @@ class ProdutoIndicado(models.Model):
     ## @brief Representação em string do objeto ProdutoIndicado.
     # @return Uma string descrevendo a indicação do produto.
     def __str__(self):
-        return f"Indicação de '{self.nome_produto}' por {self.usuario} ({self.status})"
\ No newline at end of file
+        return f"Indicação de '{self.nome_produto}' por {self.usuario} ({self.status})"
+
+
+## @brief Modelo que guarda as visualizações de um produto agrupadas por hora.
+#
+# As linhas são gravadas junto com os contadores de `Produto` (ver
+# `utils.gravar_visualizacoes`) e somadas por janela de tempo no cálculo dos rankings.
+class VisualizacaoHora(models.Model):
+    ## @var produto
+    # @brief Produto visualizado.
+    # @type models.ForeignKey
+    produto = models.ForeignKey(
+        Produto, on_delete=models.CASCADE, related_name="visualizacoes_por_hora"
+    )
+    ## @var hora
+    # @brief Início da hora a que as visualizações pertencem.
+    # @type models.DateTimeField
+    hora = models.DateTimeField()
+    ## @var quantidade
+    # @brief Visualizações e cliques do produto nessa hora.
+    # @type models.PositiveIntegerField
+    quantidade = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ## @brief Opções de metadados para o modelo VisualizacaoHora.
+        #
+        # @param constraints Uma linha por produto e hora.
+        # @param indexes Índice por hora, usado para somar uma janela e descartar as horas antigas.
+        verbose_name = "Visualizações por Hora"
+        verbose_name_plural = "Visualizações por Hora"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["produto", "hora"], name="visualizacaohora_unica"
+            ),
+        ]
+        indexes = [models.Index(fields=["hora"], name="visualizacaohora_hora_idx")]
+
+    ## @brief Representação em string do objeto VisualizacaoHora.
+    def __str__(self):
+        return f"{self.produto_id} @ {self.hora:%Y-%m-%d %H}h: {self.quantidade}"
+
+
+## @brief Modelo que guarda os rankings de produtos pré-calculados.
+#
+# A tabela é pequena (no máximo `rankings.TAMANHO_RANKING` linhas por tipo) e é
+# reescrita pelo comando `calcular_rankings`, para que as páginas nunca agreguem o
+# histórico de compras ou de visualizações.
+class RankingProduto(models.Model):
+    ## @brief Tipos de ranking disponíveis.
+    TIPOS = [
+        ("em_alta_24h", "Em alta nas últimas 24 horas"),
+        ("em_alta_7d", "Em alta nos últimos 7 dias"),
+        ("mais_vendidos", "Mais vendidos"),
+    ]
+
+    ## @var tipo
+    # @brief Tipo do ranking.
+    # @type models.CharField
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    ## @var posicao
+    # @brief Posição do produto no ranking (começando em 1).
+    # @type models.PositiveSmallIntegerField
+    posicao = models.PositiveSmallIntegerField()
+    ## @var produto
+    # @brief Produto classificado.
+    # @type models.ForeignKey
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE)
+    ## @var pontuacao
+    # @brief Pontuação que definiu a posição.
+    # @type models.FloatField
+    pontuacao = models.FloatField()
+    ## @var calculado_em
+    # @brief Data e hora do cálculo do ranking.
+    # @type models.DateTimeField
+    calculado_em = models.DateTimeField()
+
+    class Meta:
+        ## @brief Opções de metadados para o modelo RankingProduto.
+        #
+        # @param ordering Ordem padrão para consulta, por tipo e posição.
+        # @param constraints Uma posição por tipo.
+        verbose_name = "Ranking de Produto"
+        verbose_name_plural = "Rankings de Produtos"
+        ordering = ["tipo", "posicao"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tipo", "posicao"], name="rankingproduto_posicao_unica"
+            ),
+        ]
+
+    ## @brief Representação em string do objeto RankingProduto.
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.posicao}: {self.produto}"
+
+
+## @brief Modelo que conta quantas vezes dois produtos foram comprados juntos.
+#
+# Uma "cesta" é o conjunto de produtos comprados por um usuário num mesmo dia. Cada par
+# é guardado nas duas direções, para que os relacionados de um produto sejam lidos pelo
+# índice `(produto, -contagem)` com um LIMIT. Mantido incrementalmente por
+# `recomendacoes.atualizar_coocorrencias`.
+class CoocorrenciaProduto(models.Model):
+    ## @var produto
+    # @brief Produto de referência.
+    # @type models.ForeignKey
+    produto = models.ForeignKey(
+        Produto, on_delete=models.CASCADE, related_name="coocorrencias"
+    )
+    ## @var relacionado
+    # @brief Produto comprado junto com o de referência.
+    # @type models.ForeignKey
+    relacionado = models.ForeignKey(
+        Produto, on_delete=models.CASCADE, related_name="+"
+    )
+    ## @var contagem
+    # @brief Quantidade de cestas em que os dois produtos aparecem juntos.
+    # @type models.PositiveIntegerField
+    contagem = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ## @brief Opções de metadados para o modelo CoocorrenciaProduto.
+        #
+        # @param constraints Uma linha por par ordenado de produtos.
+        # @param indexes Índice da consulta dos relacionados, na ordem da contagem.
+        verbose_name = "Coocorrência de Produtos"
+        verbose_name_plural = "Coocorrências de Produtos"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["produto", "relacionado"], name="coocorrencia_par_unico"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["produto", "-contagem", "relacionado"],
+                name="coocorrencia_top_idx",
+            ),
+        ]
+
+    ## @brief Representação em string do objeto CoocorrenciaProduto.
+    def __str__(self):
+        return f"{self.produto_id} + {self.relacionado_id}: {self.contagem}"
+
+
+## @brief Modelo que guarda os pesos TF-IDF dos termos de cada produto aprovado.
+#
+# Cada produto é um vetor esparso normalizado (norma 1), guardado como uma linha por
+# termo. A similaridade de cosseno entre dois produtos é a soma dos produtos dos pesos
+# dos termos em comum, calculada no banco pelo índice `(termo, produto, peso)` (ver
+# `core.similares`).
+class TermoProduto(models.Model):
+    ## @var produto
+    # @brief Produto ao qual o termo pertence.
+    # @type models.ForeignKey
+    produto = models.ForeignKey(
+        Produto, on_delete=models.CASCADE, related_name="termos"
+    )
+    ## @var termo
+    # @brief Termo normalizado (palavra, par de palavras, categoria ou marca).
+    # @type models.CharField
+    termo = models.CharField(max_length=64)
+    ## @var peso
+    # @brief Peso TF-IDF do termo no vetor normalizado do produto.
+    # @type models.FloatField
+    peso = models.FloatField()
+
+    class Meta:
+        ## @brief Opções de metadados para o modelo TermoProduto.
+        #
+        # @param constraints Uma linha por produto e termo.
+        # @param indexes Índice das listas de produtos por termo, da de maior peso à de
+        #        menor, usado pelas listas campeãs da consulta de similares.
+        verbose_name = "Termo de Produto"
+        verbose_name_plural = "Termos de Produtos"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["produto", "termo"], name="termoproduto_unico"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["termo", "-peso", "produto"], name="termoproduto_peso_idx"
+            ),
+        ]
+
+    ## @brief Representação em string do objeto TermoProduto.
+    def __str__(self):
+        return f"{self.produto_id} {self.termo}: {self.peso:.3f}"
+
+
+## @brief Modelo que guarda as chaves de LSH (MinHash) do nome de cada produto.
+#
+# Produtos com nomes parecidos tendem a compartilhar ao menos uma chave, de modo que os
+# candidatos a duplicata de um nome são obtidos por igualdade no índice de `chave`, sem
+# comparar com o catálogo inteiro (ver `core.duplicados`).
+class BandaProduto(models.Model):
+    ## @var produto
+    # @brief Produto ao qual a chave pertence.
+    # @type models.ForeignKey
+    produto = models.ForeignKey(
+        Produto, on_delete=models.CASCADE, related_name="bandas_lsh"
+    )
+    ## @var chave
+    # @brief Hash de uma banda da assinatura MinHash (inclui o número da banda).
+    # @type models.BigIntegerField
+    chave = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        verbose_name = "Banda LSH de Produto"
+        verbose_name_plural = "Bandas LSH de Produtos"
+
+    ## @brief Representação em string do objeto BandaProduto.
+    def __str__(self):
+        return f"{self.produto_id}: {self.chave}"
+
+
+## @brief Modelo que associa o código interno (SKU) de uma loja a um produto do catálogo.
+#
+# Usado pela importação de ofertas (ver `core.importacao`) para resolver as linhas
+# recebidas de cada loja por igualdade, sem depender do nome do produto.
+class SkuLoja(models.Model):
+    ## @var loja
+    # @brief Loja dona do código.
+    # @type models.ForeignKey
+    loja = models.ForeignKey(Loja, on_delete=models.CASCADE, related_name="skus")
+    ## @var sku
+    # @brief Código do produto na loja.
+    # @type models.CharField
+    sku = models.CharField(max_length=64, verbose_name="SKU")
+    ## @var produto
+    # @brief Produto do catálogo correspondente.
+    # @type models.ForeignKey
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name="skus")
+
+    class Meta:
+        ## @brief Opções de metadados para o modelo SkuLoja.
+        #
+        # @param constraints Um produto por código em cada loja.
+        verbose_name = "SKU de Loja"
+        verbose_name_plural = "SKUs de Lojas"
+        constraints = [
+            models.UniqueConstraint(fields=["loja", "sku"], name="skuloja_unico"),
+        ]
+
+    ## @brief Representação em string do objeto SkuLoja.
+    def __str__(self):
+        return f"{self.loja_id}/{self.sku} -> {self.produto_id}"
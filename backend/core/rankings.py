@@ -0,0 +1,149 @@
+## @file core/rankings.py
+#
+# @brief Rankings de produtos em alta e mais vendidos.
+#
+# Os rankings são calculados periodicamente por `calcular_rankings` (comando
+# `python manage.py calcular_rankings`, agendado no cron) a partir das visualizações
+# agrupadas por hora (`VisualizacaoHora`) e das compras (`ItemComprado`), e gravados na
+# tabela pequena `RankingProduto`. As páginas leem apenas essa tabela, através do cache
+# versionado, e nunca agregam o histórico.
+#
+# @see core.utils.gravar_visualizacoes
+# @see core.management.commands.calcular_rankings
+
+import heapq
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from . import cache as cache_versionado
+from .models import ItemComprado, RankingProduto, VisualizacaoHora
+
+## @brief Quantidade máxima de produtos em cada ranking.
+TAMANHO_RANKING = 12
+
+## @brief Peso de uma compra em relação a uma visualização na pontuação dos produtos em alta.
+PESO_COMPRA = 5
+
+## @brief Janelas de tempo dos rankings de produtos em alta.
+JANELAS_EM_ALTA = {
+    "em_alta_24h": timedelta(hours=24),
+    "em_alta_7d": timedelta(days=7),
+}
+
+## @brief Janela de tempo do ranking de mais vendidos.
+JANELA_MAIS_VENDIDOS = timedelta(days=30)
+
+## @brief Tempo que as visualizações por hora são mantidas (a maior janela, com folga).
+RETENCAO_VISUALIZACOES = timedelta(days=8)
+
+
+## @brief Conta as compras de produtos aprovados a partir de uma data.
+#
+# `data_compra` guarda apenas o dia, então a janela começa no dia do instante `inicio`.
+#
+# @param inicio Instante inicial da janela.
+# @return Counter produto_id -> quantidade de itens comprados.
+def _compras_desde(inicio):
+    linhas = (
+        ItemComprado.objects.filter(
+            data_compra__gte=timezone.localdate(inicio), produto__aprovado=True
+        )
+        .values("produto_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    return Counter({linha["produto_id"]: linha["total"] for linha in linhas})
+
+
+## @brief Soma as visualizações por hora de produtos aprovados a partir de um instante.
+#
+# @param inicio Instante inicial da janela.
+# @return Counter produto_id -> quantidade de visualizações e cliques.
+def _visualizacoes_desde(inicio):
+    linhas = (
+        VisualizacaoHora.objects.filter(hora__gte=inicio, produto__aprovado=True)
+        .values("produto_id")
+        .annotate(total=Sum("quantidade"))
+        .order_by()
+    )
+    return Counter({linha["produto_id"]: linha["total"] for linha in linhas})
+
+
+## @brief Seleciona os produtos de maior pontuação (empates pelo menor ID).
+#
+# @param pontuacoes Mapeamento produto_id -> pontuação.
+# @return Lista de pares (produto_id, pontuação), do maior para o menor.
+def _melhores(pontuacoes):
+    return heapq.nsmallest(
+        TAMANHO_RANKING,
+        ((pk, pontos) for pk, pontos in pontuacoes.items() if pontos > 0),
+        key=lambda item: (-item[1], item[0]),
+    )
+
+
+## @brief Recalcula e grava todos os rankings, descartando as visualizações antigas.
+#
+# A pontuação dos produtos em alta é `visualizações + PESO_COMPRA * compras` dentro
+# de cada janela; a dos mais vendidos é a quantidade de itens comprados em
+# `JANELA_MAIS_VENDIDOS`. A tabela é reescrita numa transação, e o cache é invalidado.
+#
+# @param agora Instante de referência (padrão: agora).
+# @return Dicionário tipo -> quantidade de produtos no ranking.
+def calcular_rankings(agora=None):
+    agora = agora or timezone.now()
+    rankings = {}
+    for tipo, janela in JANELAS_EM_ALTA.items():
+        inicio = agora - janela
+        pontuacoes = _visualizacoes_desde(inicio)
+        for pk, compras in _compras_desde(inicio).items():
+            pontuacoes[pk] += PESO_COMPRA * compras
+        rankings[tipo] = _melhores(pontuacoes)
+    rankings["mais_vendidos"] = _melhores(_compras_desde(agora - JANELA_MAIS_VENDIDOS))
+
+    with transaction.atomic():
+        RankingProduto.objects.all().delete()
+        RankingProduto.objects.bulk_create(
+            RankingProduto(
+                tipo=tipo,
+                posicao=posicao,
+                produto_id=pk,
+                pontuacao=pontos,
+                calculado_em=agora,
+            )
+            for tipo, itens in rankings.items()
+            for posicao, (pk, pontos) in enumerate(itens, start=1)
+        )
+        VisualizacaoHora.objects.filter(hora__lt=agora - RETENCAO_VISUALIZACOES).delete()
+    cache_versionado.invalidar("rankings")
+    return {tipo: len(itens) for tipo, itens in rankings.items()}
+
+
+## @brief Lê os rankings gravados, sem usar o cache.
+#
+# @return Dicionário tipo -> lista de produtos (id, nome, imagem_url, pontuacao).
+def _carregar_rankings():
+    rankings = {tipo: [] for tipo, _ in RankingProduto.TIPOS}
+    linhas = RankingProduto.objects.select_related("produto").only(
+        "tipo", "pontuacao", "produto__id", "produto__nome", "produto__imagem_url"
+    )
+    for linha in linhas:
+        rankings[linha.tipo].append(
+            {
+                "id": linha.produto.id,
+                "nome": linha.produto.nome,
+                "imagem_url": linha.produto.imagem_url,
+                "pontuacao": linha.pontuacao,
+            }
+        )
+    return rankings
+
+
+## @brief Retorna os rankings pré-calculados, a partir do cache versionado.
+#
+# @return Dicionário tipo -> lista de produtos, com todos os tipos de `RankingProduto.TIPOS`.
+def obter_rankings():
+    return cache_versionado.obter_versionado("rankings", _carregar_rankings)
@@ -0,0 +1,160 @@
+## @file core/recomendacoes.py
+#
+# @brief Índice de coocorrência de compras ("frequentemente comprados juntos").
+#
+# `atualizar_coocorrencias` lê apenas as compras (`ItemComprado`) ainda não marcadas
+# como processadas, agrupa-as em cestas (usuário e dia da compra) e soma os novos
+# pares à tabela `CoocorrenciaProduto`, sem reconstruí-la. É executado pelo comando
+# `python manage.py atualizar_coocorrencias`, agendado no cron; a primeira execução
+# processa todo o histórico. A marca fica em cada compra, e não num "maior ID
+# processado": IDs são reservados antes do commit, então uma compra de uma transação
+# mais lenta pode aparecer depois de outras com IDs maiores já terem sido lidas.
+#
+# `produtos_relacionados` lê os mais frequentes de um produto por índice, com o
+# resultado em cache até a próxima atualização.
+#
+# @see core.management.commands.atualizar_coocorrencias
+
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from . import cache as cache_versionado
+from .models import CoocorrenciaProduto, ItemComprado
+
+## @brief Quantidade de produtos relacionados retornada por `produtos_relacionados`.
+TOP_K = 10
+
+## @brief Cestas com mais produtos que isto são ignoradas (pouco informativas e caras).
+MAX_ITENS_CESTA = 50
+
+## @brief Quantidade de compras lidas e gravadas por transação.
+LOTE_COMPRAS = 5000
+
+## @brief Nome da versão do cache invalidada quando o índice é atualizado.
+MARCADOR = "coocorrencias"
+
+
+## @brief Soma os pares de um lote de compras novas à tabela de coocorrências.
+#
+# As compras anteriores de cada cesta (já processadas) entram nos pares com os produtos
+# novos, mas não entre si; produtos que já estavam na cesta não são contados de novo.
+#
+# @param compras Lista de tuplas (usuario_id, data_compra, produto_id) do lote.
+# @return Quantidade de pares (ordenados) incrementados.
+def _processar_lote(compras):
+    cestas = defaultdict(set)
+    for usuario_id, data, produto_id in compras:
+        cestas[(usuario_id, data)].add(produto_id)
+
+    anteriores = defaultdict(set)
+    linhas = ItemComprado.objects.filter(
+        coocorrencia_processada=True,
+        usuario_id__in={usuario_id for usuario_id, _ in cestas},
+        data_compra__in={data for _, data in cestas},
+        produto__isnull=False,
+    ).values_list("usuario_id", "data_compra", "produto_id")
+    for usuario_id, data, produto_id in linhas:
+        if (usuario_id, data) in cestas:
+            anteriores[(usuario_id, data)].add(produto_id)
+
+    pares = Counter()
+    for chave, produtos in cestas.items():
+        antigos = anteriores[chave]
+        novos = produtos - antigos
+        if len(novos) + len(antigos) > MAX_ITENS_CESTA:
+            continue
+        for a in novos:
+            for b in novos:
+                if a != b:
+                    pares[(a, b)] += 1
+            for b in antigos:
+                pares[(a, b)] += 1
+                pares[(b, a)] += 1
+    if not pares:
+        return 0
+
+    CoocorrenciaProduto.objects.bulk_create(
+        [CoocorrenciaProduto(produto_id=a, relacionado_id=b) for a, b in pares],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+    # Um UPDATE por (produto, incremento), com os relacionados num IN
+    grupos = defaultdict(list)
+    for (a, b), quantidade in pares.items():
+        grupos[(a, quantidade)].append(b)
+    for (a, quantidade), relacionados in grupos.items():
+        CoocorrenciaProduto.objects.filter(
+            produto_id=a, relacionado_id__in=relacionados
+        ).update(contagem=F("contagem") + quantidade)
+    return len(pares)
+
+
+## @brief Processa as compras ainda não somadas ao índice.
+#
+# Cada lote de até `lote` compras é gravado numa transação junto com a marca das
+# compras, de modo que uma execução interrompida recomeça do último lote concluído. As
+# compras do lote ficam travadas até o commit, o que serializa execuções simultâneas.
+#
+# @param lote Quantidade de compras por transação.
+# @return Quantidade de compras processadas.
+def atualizar_coocorrencias(lote=LOTE_COMPRAS):
+    total = 0
+    while True:
+        with transaction.atomic():
+            compras = list(
+                ItemComprado.objects.filter(
+                    coocorrencia_processada=False, produto__isnull=False
+                )
+                .select_for_update()
+                .order_by("id")
+                .values_list("id", "usuario_id", "data_compra", "produto_id")[:lote]
+            )
+            if not compras:
+                break
+            _processar_lote([compra[1:] for compra in compras])
+            ItemComprado.objects.filter(id__in=[compra[0] for compra in compras]).update(
+                coocorrencia_processada=True
+            )
+        total += len(compras)
+    if total:
+        cache_versionado.invalidar(MARCADOR)
+    return total
+
+
+## @brief Retorna os produtos mais comprados junto com um produto.
+#
+# Lê as `k` primeiras linhas do índice `(produto, -contagem)`, apenas de produtos
+# aprovados. O resultado fica no cache compartilhado até a próxima atualização do índice.
+#
+# @param produto_id O ID do produto.
+# @param k Quantidade máxima de produtos.
+# @return Lista de dicionários (id, nome, imagem_url, contagem), do mais frequente ao menos.
+def produtos_relacionados(produto_id, k=TOP_K):
+    versao = cache_versionado.obter_versao(MARCADOR)
+    chave = f"core:relacionados:{produto_id}:{k}:v{versao}"
+    relacionados = cache.get(chave)
+    if relacionados is None:
+        relacionados = [
+            {
+                "id": linha.relacionado.id,
+                "nome": linha.relacionado.nome,
+                "imagem_url": linha.relacionado.imagem_url,
+                "contagem": linha.contagem,
+            }
+            for linha in CoocorrenciaProduto.objects.filter(
+                produto_id=produto_id, relacionado__aprovado=True
+            )
+            .select_related("relacionado")
+            .only(
+                "contagem",
+                "relacionado__id",
+                "relacionado__nome",
+                "relacionado__imagem_url",
+            )
+            .order_by("-contagem", "relacionado_id")[:k]
+        ]
+        cache.set(chave, relacionados, cache_versionado.TIMEOUT_VALORES)
+    return relacionados
@@ -0,0 +1,356 @@
+## @file core/seed.py
+#
+# @brief Geração de dados sintéticos para testes de carga e benchmarks.
+#
+# Todos os dados são derivados de um `random.Random` com semente fixa, de modo que
+# a mesma semente e os mesmos tamanhos geram exatamente o mesmo catálogo. As linhas
+# são inseridas com `bulk_create` em lotes, sem carregar tudo na memória de uma vez.
+#
+# @see core.benchmarks
+# @see core.management.commands.seed_catalog
+
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import (
+    CharField,
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.utils import timezone
+
+from .models import (
+    Categoria,
+    Comentario,
+    ItemComprado,
+    ItemLista,
+    ListaCompra,
+    Loja,
+    Marca,
+    Oferta,
+    Produto,
+)
+
+## Obtém o modelo de usuário ativo do Django.
+Usuario = get_user_model()
+
+## @brief Quantidade de linhas enviadas ao banco em cada `bulk_create`.
+TAMANHO_LOTE = 5000
+
+## Palavras usadas para compor nomes e descrições de produtos.
+_PALAVRAS = (
+    "arroz feijão café açúcar leite queijo manteiga pão biscoito macarrão molho azeite "
+    "óleo farinha fubá sal tempero sabão detergente amaciante shampoo sabonete creme "
+    "suco refrigerante água cerveja vinho chocolate bala iogurte presunto frango carne "
+    "peixe batata cebola alho tomate banana maçã laranja uva integral light zero "
+    "tradicional premium orgânico família econômico"
+).split()
+
+## Notas possíveis dos comentários gerados e seus pesos: concentradas em 4 e 5,
+## com alguns comentários sem nota.
+_NOTAS = (None, 1, 2, 3, 4, 5)
+_PESOS_NOTAS = (10, 5, 5, 15, 35, 30)
+
+
+## @brief Desativa temporariamente o `auto_now_add` de campos de data.
+#
+# Permite gravar datas no passado (históricos de preço, compras e comentários antigos)
+# diretamente no `bulk_create`, sem um UPDATE posterior.
+#
+# @param campos Pares (modelo, nome do campo).
+@contextmanager
+def sem_auto_now_add(*campos):
+    alterados = []
+    for modelo, nome in campos:
+        campo = modelo._meta.get_field(nome)
+        if campo.auto_now_add:
+            campo.auto_now_add = False
+            alterados.append(campo)
+    try:
+        yield
+    finally:
+        for campo in alterados:
+            campo.auto_now_add = True
+
+
+## @brief Insere objetos em lotes, consumindo um gerador preguiçosamente.
+#
+# @param modelo A classe do modelo.
+# @param objetos Iterável de instâncias ainda não salvas.
+# @param lote Quantidade de objetos por `bulk_create`.
+# @param retornar Se False, as instâncias não são guardadas (para tabelas muito grandes).
+# @return A lista de instâncias salvas (com as chaves primárias preenchidas), ou a
+#         quantidade de linhas inseridas quando `retornar` é False.
+def inserir_em_lotes(modelo, objetos, lote=TAMANHO_LOTE, retornar=True):
+    objetos = iter(objetos)
+    salvos = []
+    total = 0
+    while True:
+        bloco = list(islice(objetos, lote))
+        if not bloco:
+            return salvos if retornar else total
+        criados = modelo.objects.bulk_create(bloco, batch_size=lote)
+        total += len(criados)
+        if retornar:
+            salvos.extend(criados)
+
+
+## @brief Gera um catálogo sintético: categorias, marcas, lojas, produtos e ofertas.
+#
+# Cada produto recebe ofertas de lojas distintas (no máximo uma por loja), com preços
+# próximos de um preço-base do produto. Com `dias` maior que 1, cada par produto/loja
+# recebe uma oferta por dia, formando um histórico de preços: um passeio aleatório com
+# leve inflação e promoções ocasionais de um dia.
+#
+# @param produtos Quantidade de produtos.
+# @param lojas Quantidade de lojas.
+# @param ofertas Quantidade total aproximada de ofertas por dia (dividida entre os produtos).
+# @param seed Semente do gerador pseudoaleatório.
+# @param categorias Quantidade de categorias.
+# @param marcas Quantidade de marcas.
+# @param dias Quantidade de dias do histórico de preços (1 gera só as ofertas atuais).
+# @param lote Quantidade de linhas por `bulk_create`.
+# @return Dicionário com as listas de IDs criados e o gerador usado, para etapas seguintes.
+def gerar_catalogo(
+    produtos,
+    lojas,
+    ofertas,
+    seed=42,
+    categorias=20,
+    marcas=200,
+    dias=1,
+    lote=TAMANHO_LOTE,
+):
+    rng = random.Random(seed)
+    # Datas ancoradas na meia-noite, para que execuções no mesmo dia coincidam
+    hoje = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    inicio = hoje - timedelta(days=dias - 1)
+
+    categorias_ids = [
+        c.id
+        for c in inserir_em_lotes(
+            Categoria,
+            (Categoria(nome=f"Categoria {i:03d}") for i in range(categorias)),
+            lote,
+        )
+    ]
+    # `bulk_create` não passa por `Categoria.save()`, que preenche o caminho materializado
+    Categoria.objects.filter(id__in=categorias_ids).update(
+        caminho=Concat(Cast("id", CharField()), Value("/"))
+    )
+    marcas_ids = [
+        m.id
+        for m in inserir_em_lotes(
+            Marca, (Marca(nome=f"Marca {i:04d}") for i in range(marcas)), lote
+        )
+    ]
+    lojas_ids = [
+        loja.id
+        for loja in inserir_em_lotes(
+            Loja,
+            (
+                Loja(nome=f"Loja {i:05d}", url=f"https://loja{i}.example.com")
+                for i in range(lojas)
+            ),
+            lote,
+        )
+    ]
+
+    def novo_produto(i):
+        palavras = rng.sample(_PALAVRAS, 3)
+        return Produto(
+            nome=f"{' '.join(palavras).capitalize()} {i:06d}",
+            descricao=" ".join(rng.choices(_PALAVRAS, k=12)),
+            categoria_id=rng.choice(categorias_ids),
+            marca_id=rng.choice(marcas_ids),
+            # Uma pequena parte fica pendente, para popular a fila de aprovação
+            aprovado=rng.random() >= 0.02,
+            data_adicao=inicio - timedelta(minutes=rng.randrange(60 * 24 * 365)),
+        )
+
+    with sem_auto_now_add((Produto, "data_adicao")):
+        produtos_ids = [
+            p.id
+            for p in inserir_em_lotes(Produto, map(novo_produto, range(produtos)), lote)
+        ]
+
+    ofertas_por_produto = min(len(lojas_ids), max(1, ofertas // max(1, produtos)))
+    precos_base = {pid: rng.uniform(2, 200) for pid in produtos_ids}
+    precos_atuais = {}
+
+    def novas_ofertas():
+        for produto_id in produtos_ids:
+            base = precos_base[produto_id]
+            for loja_id in rng.sample(lojas_ids, ofertas_por_produto):
+                preco = base * rng.uniform(0.85, 1.25)
+                for dia in range(dias):
+                    # Deriva diária de ~0,05% com ruído; promoções de 15% duram um dia
+                    preco *= 1 + rng.gauss(0.0005, 0.01)
+                    promocao = 0.85 if rng.random() < 0.03 else 1
+                    yield Oferta(
+                        produto_id=produto_id,
+                        loja_id=loja_id,
+                        preco=Decimal(f"{max(preco * promocao, 0.5):.2f}"),
+                        data_captura=inicio + timedelta(days=dia),
+                    )
+                precos_atuais[(produto_id, loja_id)] = preco
+
+    with sem_auto_now_add((Oferta, "data_captura")):
+        inserir_em_lotes(Oferta, novas_ofertas(), lote, retornar=False)
+
+    return {
+        "rng": rng,
+        "inicio": inicio,
+        "dias": dias,
+        "lote": lote,
+        "categorias": categorias_ids,
+        "marcas": marcas_ids,
+        "lojas": lojas_ids,
+        "produtos": produtos_ids,
+        "precos_base": precos_base,
+        "precos_atuais": precos_atuais,
+    }
+
+
+## @brief Gera a atividade dos usuários sobre um catálogo criado por `gerar_catalogo`.
+#
+# Cria usuários (todos com a mesma senha, cujo hash é calculado uma única vez), listas
+# de compras com itens (no máximo uma lista aberta por usuário), compras distribuídas
+# pelo período do histórico e comentários com notas. Ao final, os agregados de nota dos
+# produtos são recalculados com um único UPDATE.
+#
+# @param dados O dicionário retornado por `gerar_catalogo`.
+# @param usuarios Quantidade de usuários.
+# @param compras Quantidade total de itens comprados.
+# @param comentarios Quantidade total de comentários.
+# @param listas_por_usuario Quantidade máxima de listas de compras por usuário.
+# @param senha Senha de todos os usuários gerados.
+# @return O próprio `dados`, acrescido dos IDs dos usuários.
+def gerar_atividade(
+    dados, usuarios, compras, comentarios, listas_por_usuario=3, senha="senha123"
+):
+    rng = dados["rng"]
+    lote = dados["lote"]
+    inicio = dados["inicio"]
+    dias = dados["dias"]
+    produtos_ids = dados["produtos"]
+    precos = list(dados["precos_atuais"].items())
+    if not produtos_ids or not precos:
+        dados["usuarios"] = []
+        return dados
+
+    hash_senha = make_password(senha)
+    usuarios_ids = [
+        u.id
+        for u in inserir_em_lotes(
+            Usuario,
+            (
+                Usuario(
+                    username=f"usuario{i:06d}",
+                    email=f"usuario{i:06d}@example.com",
+                    first_name="Usuário",
+                    last_name=f"{i:06d}",
+                    password=hash_senha,
+                )
+                for i in range(usuarios)
+            ),
+            lote,
+        )
+    ]
+    dados["usuarios"] = usuarios_ids
+    if not usuarios_ids:
+        return dados
+
+    def momento_aleatorio():
+        return inicio + timedelta(seconds=rng.randrange(max(1, dias) * 86400))
+
+    # Listas de compras: a primeira de cada usuário fica aberta, as demais finalizadas
+    def novas_listas():
+        for usuario_id in usuarios_ids:
+            for n in range(rng.randint(0, listas_por_usuario)):
+                yield ListaCompra(
+                    usuario_id=usuario_id,
+                    nome=f"Lista {n + 1}",
+                    finalizada=n > 0,
+                    criada_em=momento_aleatorio(),
+                )
+
+    with sem_auto_now_add((ListaCompra, "criada_em")):
+        listas_ids = [
+            lista.id for lista in inserir_em_lotes(ListaCompra, novas_listas(), lote)
+        ]
+
+    def novos_itens_lista():
+        for lista_id in listas_ids:
+            quantidade = min(rng.randint(3, 15), len(produtos_ids))
+            for produto_id in rng.sample(produtos_ids, quantidade):
+                yield ItemLista(lista_id=lista_id, produto_id=produto_id)
+
+    inserir_em_lotes(ItemLista, novos_itens_lista(), lote, retornar=False)
+
+    def novas_compras():
+        for _ in range(compras):
+            (produto_id, loja_id), preco = rng.choice(precos)
+            yield ItemComprado(
+                usuario_id=rng.choice(usuarios_ids),
+                produto_id=produto_id,
+                loja_id=loja_id,
+                preco_pago=Decimal(f"{max(preco * rng.uniform(0.9, 1.1), 0.5):.2f}"),
+                data_compra=momento_aleatorio().date(),
+            )
+
+    inserir_em_lotes(ItemComprado, novas_compras(), lote, retornar=False)
+
+    def novos_comentarios():
+        for _ in range(comentarios):
+            palavras = rng.choices(_PALAVRAS, k=rng.randint(5, 25))
+            yield Comentario(
+                usuario_id=rng.choice(usuarios_ids),
+                produto_id=rng.choice(produtos_ids),
+                texto=" ".join(palavras).capitalize() + ".",
+                nota=rng.choices(_NOTAS, weights=_PESOS_NOTAS)[0],
+                data=momento_aleatorio(),
+            )
+
+    with sem_auto_now_add((Comentario, "data")):
+        inserir_em_lotes(Comentario, novos_comentarios(), lote, retornar=False)
+
+    recalcular_avaliacoes()
+    return dados
+
+
+## @brief Recalcula, com um único UPDATE, os agregados de nota de todos os produtos.
+#
+# Usado após inserções em massa de comentários, que não passam pelas views que
+# mantêm os agregados incrementalmente.
+def recalcular_avaliacoes():
+    avaliacoes = Comentario.objects.filter(
+        produto=OuterRef("pk"), nota__isnull=False
+    ).values("produto")
+    soma = Subquery(
+        avaliacoes.annotate(soma=Sum("nota")).values("soma"),
+        output_field=IntegerField(),
+    )
+    total = Subquery(
+        avaliacoes.annotate(total=Count("id")).values("total"),
+        output_field=IntegerField(),
+    )
+    Produto.objects.update(
+        soma_notas=Coalesce(soma, 0), total_avaliacoes=Coalesce(total, 0)
+    )
+    Produto.objects.update(nota_media=None)
+    Produto.objects.filter(total_avaliacoes__gt=0).update(
+        nota_media=Cast("soma_notas", FloatField()) / F("total_avaliacoes")
+    )
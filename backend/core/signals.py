@@ -0,0 +1,163 @@
+## @file core/signals.py
+#
+# @brief Receptores de sinais do aplicativo 'core'.
+#
+# Mantém os caches derivados dos modelos coerentes com o banco de dados,
+# invalidando-os sempre que uma instância relevante é salva ou excluída.
+# Os receptores são conectados em `core.apps.CoreConfig.ready`.
+#
+# @see core.utils
+
+from django.core.cache import cache
+from django.db.models.functions import Substr
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache as cache_versionado
+from .models import Categoria, Loja, Marca, Oferta, Produto
+from . import busca_aproximada, duplicados, similares, sugestoes
+from .utils import LOJAS_HTML_CACHE_KEY, invalidar_produto_json
+
+
+## @brief Invalida o fragmento HTML da lista de lojas.
+#
+# Disparado após salvar ou excluir uma `Loja`, para que a próxima renderização
+# de `render_lojas_html` reflita o estado atual do banco.
+@receiver(post_save, sender=Loja)
+@receiver(post_delete, sender=Loja)
+def invalidar_cache_lojas(sender, **kwargs):
+    cache.delete(LOJAS_HTML_CACHE_KEY)
+
+
+## @brief Invalida a lista de categorias em cache em todos os processos.
+#
+# Disparado após salvar ou excluir uma `Categoria`.
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def invalidar_cache_categorias(sender, **kwargs):
+    cache_versionado.invalidar("categorias")
+
+
+## @brief Passa as filhas de uma categoria excluída ao primeiro nível.
+#
+# O `SET_NULL` de `Categoria.pai` só limpa o pai das filhas; aqui o prefixo da
+# categoria excluída é retirado dos caminhos de toda a subárvore, num único UPDATE.
+@receiver(post_delete, sender=Categoria)
+def reenraizar_categorias(sender, instance, **kwargs):
+    if instance.caminho:
+        Categoria.objects.filter(Categoria.filtro_subarvore(instance.caminho)).update(
+            caminho=Substr("caminho", len(instance.caminho) + 1)
+        )
+
+
+## @brief Invalida as contagens de produtos por categoria em todos os processos.
+#
+# Disparado após salvar ou excluir uma `Categoria` ou um `Produto`.
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_save, sender=Produto)
+@receiver(post_delete, sender=Produto)
+def invalidar_contagem_categorias(sender, **kwargs):
+    cache_versionado.invalidar("contagem_categorias")
+
+
+## @brief Invalida a resposta JSON em cache de um produto quando ele muda.
+#
+# Disparado após salvar ou excluir um `Produto`.
+@receiver(post_save, sender=Produto)
+@receiver(post_delete, sender=Produto)
+def invalidar_json_produto(sender, instance, **kwargs):
+    invalidar_produto_json(instance.pk)
+
+
+## @brief Invalida a resposta JSON em cache do produto de uma oferta.
+#
+# Disparado após salvar ou excluir uma `Oferta`.
+@receiver(post_save, sender=Oferta)
+@receiver(post_delete, sender=Oferta)
+def invalidar_json_produto_da_oferta(sender, instance, **kwargs):
+    invalidar_produto_json(instance.produto_id)
+
+
+## @brief Invalida as respostas JSON em cache de todos os produtos.
+#
+# Nomes de lojas, categorias e marcas aparecem nos detalhes de muitos produtos, então
+# salvar ou excluir um deles incrementa a versão geral em vez de apagar chave por chave.
+@receiver(post_save, sender=Loja)
+@receiver(post_delete, sender=Loja)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_save, sender=Marca)
+@receiver(post_delete, sender=Marca)
+def invalidar_json_todos_produtos(sender, **kwargs):
+    cache_versionado.invalidar("produto_json")
+
+
+## @brief Invalida os validadores (ETag/Last-Modified) das APIs do catálogo e do carrinho.
+#
+# Disparado após salvar ou excluir qualquer modelo exibido no catálogo.
+@receiver(post_save, sender=Produto)
+@receiver(post_delete, sender=Produto)
+@receiver(post_save, sender=Oferta)
+@receiver(post_delete, sender=Oferta)
+@receiver(post_save, sender=Loja)
+@receiver(post_delete, sender=Loja)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_save, sender=Marca)
+@receiver(post_delete, sender=Marca)
+def invalidar_catalogo(sender, **kwargs):
+    cache_versionado.invalidar("catalogo")
+
+
+## @brief Invalida os rankings em cache quando um produto muda ou é excluído.
+#
+# Os rankings guardam o nome e a imagem dos produtos (ver `core.rankings`).
+@receiver(post_save, sender=Produto)
+@receiver(post_delete, sender=Produto)
+def invalidar_rankings(sender, **kwargs):
+    cache_versionado.invalidar("rankings")
+
+
+## @brief Invalida o índice de sugestões de marcas quando uma marca é salva ou excluída.
+@receiver(post_save, sender=Marca)
+@receiver(post_delete, sender=Marca)
+def invalidar_sugestoes_marcas(sender, **kwargs):
+    cache_versionado.invalidar(sugestoes.VERSOES["marca"])
+
+
+## @brief Invalida o índice da busca aproximada quando um produto é salvo ou excluído.
+#
+# O índice em memória de cada processo é reconstruído na próxima busca.
+@receiver(post_save, sender=Produto)
+@receiver(post_delete, sender=Produto)
+def invalidar_busca_aproximada(sender, **kwargs):
+    cache_versionado.invalidar(busca_aproximada.VERSAO)
+
+
+## @brief Atualiza o índice de produtos similares quando um produto é salvo.
+#
+# Produtos aprovados são (re)indexados; os demais são removidos do índice. Salvamentos
+# que não mudam os campos tokenizados nem a aprovação não tocam no índice.
+@receiver(post_save, sender=Produto)
+def indexar_produto_similares(sender, instance, update_fields=None, **kwargs):
+    if instance.indexados_alterados(similares.CAMPOS, update_fields):
+        similares.indexar_produtos([instance.pk])
+
+
+## @brief Invalida as listas de similares em cache quando um produto é excluído.
+#
+# As linhas do índice são removidas em cascata.
+@receiver(post_delete, sender=Produto)
+def invalidar_similares(sender, **kwargs):
+    cache_versionado.invalidar(similares.VERSAO)
+
+
+## @brief Atualiza as chaves LSH de detecção de duplicatas quando um produto é salvo.
+#
+# Produtos rejeitados são removidos do índice (ver `core.duplicados`). Salvamentos que
+# não mudam o nome nem a rejeição não tocam no índice.
+@receiver(post_save, sender=Produto)
+def indexar_produto_duplicados(sender, instance, update_fields=None, **kwargs):
+    if instance.indexados_alterados(duplicados.CAMPOS, update_fields):
+        duplicados.indexar_produtos([instance.pk])
@@ -0,0 +1,271 @@
+## @file core/similares.py
+#
+# @brief Índice de produtos similares por conteúdo (TF-IDF sobre nome, descrição,
+#        categoria e marca).
+#
+# Cada produto aprovado vira um vetor TF-IDF esparso e normalizado, guardado em
+# `TermoProduto` (uma linha por termo). A similaridade de cosseno é então o produto
+# escalar dos vetores, somado no banco sobre as listas de produtos dos termos em comum,
+# numa única consulta agrupada por produto.
+#
+# `reconstruir_indice` recalcula todos os vetores (comando `reconstruir_similares`);
+# `indexar_produtos` adiciona ou atualiza produtos isoladamente, quando são aprovados
+# ou editados, usando as frequências de documento já presentes no índice. Como o IDF
+# dos produtos antigos não é recalculado a cada adição, a reconstrução deve ser
+# agendada periodicamente (por exemplo, uma vez por dia).
+#
+# A consulta dos similares lê, de cada termo do produto, só as `LINHAS_POR_TERMO`
+# linhas de maior peso ("listas campeãs"): termos muito frequentes, como a categoria,
+# têm peso baixo e listas longas, que não são percorridas inteiras.
+#
+# Cada lista em cache tem a versão do próprio produto, além da versão geral. Indexar um
+# produto invalida só a lista dele; as listas dos outros produtos passam a incluí-lo na
+# reconstrução periódica ou quando vencem (`cache.TIMEOUT_VALORES`). Um produto que sai
+# do índice invalida todas as listas, para não continuar sendo sugerido.
+#
+# @see core.management.commands.reconstruir_similares
+
+import math
+import re
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+
+from . import cache as cache_versionado
+from .models import Produto, TermoProduto
+from .texto import normalizar
+
+## @brief Quantidade de produtos similares retornada por `produtos_similares`.
+TOP_K = 10
+
+## @brief Quantidade máxima de termos (os de maior peso) guardados por produto.
+MAX_TERMOS = 32
+
+## @brief Peso das palavras do nome em relação às da descrição.
+PESO_NOME = 2
+
+## @brief Palavras muito comuns ignoradas na tokenização.
+STOPWORDS = frozenset(
+    "a o as os de da do das dos e em na no nas nos com sem para por um uma ao".split()
+)
+
+## @brief Nome da versão geral do cache, invalidada quando produtos saem do índice ou
+#         na reconstrução; a de cada produto é "similares:<id>".
+VERSAO = "similares"
+
+## @brief Quantidade máxima de linhas lidas da lista de produtos de cada termo.
+LINHAS_POR_TERMO = 500
+
+## @brief Campos de `Produto` que, alterados, exigem reindexar o produto.
+CAMPOS = ("nome", "descricao", "categoria", "marca", "aprovado")
+
+## @brief Tempo (em segundos) em que a quantidade de produtos aprovados fica em cache.
+TTL_TOTAL = 3600
+
+
+## @brief Divide um texto normalizado em palavras, sem as stopwords.
+#
+# @param texto O texto original.
+# @return Lista de palavras.
+def palavras(texto):
+    return [
+        palavra
+        for palavra in re.findall(r"[a-z0-9]+", normalizar(texto))
+        if len(palavra) > 1 and palavra not in STOPWORDS
+    ]
+
+
+## @brief Conta os termos de um produto.
+#
+# Os termos são as palavras e os pares de palavras consecutivas do nome (com peso
+# `PESO_NOME`), as palavras da descrição e a categoria e a marca inteiras, com prefixo
+# próprio para que só combinem com a mesma categoria ou marca.
+#
+# @param produto Produto com `categoria` e `marca` carregadas.
+# @return Counter termo -> frequência.
+def termos_produto(produto):
+    termos = Counter()
+    nome = palavras(produto.nome)
+    for termo in nome + [f"{a}_{b}" for a, b in zip(nome, nome[1:])]:
+        termos[termo[:64]] += PESO_NOME
+    termos.update(palavra[:64] for palavra in palavras(produto.descricao))
+    if produto.categoria_id:
+        termos[f"categoria:{normalizar(produto.categoria.nome)}"[:64]] += 1
+    if produto.marca_id:
+        termos[f"marca:{normalizar(produto.marca.nome)}"[:64]] += 1
+    return termos
+
+
+## @brief Calcula o vetor TF-IDF normalizado de um produto.
+#
+# @param termos Counter termo -> frequência (de `termos_produto`).
+# @param frequencias Mapeamento termo -> quantidade de produtos que o contêm.
+# @param total Quantidade de produtos indexados.
+# @return Dicionário termo -> peso, com no máximo `MAX_TERMOS` termos e norma 1.
+def _vetor(termos, frequencias, total):
+    pesos = {
+        termo: (1 + math.log(tf))
+        * (math.log((1 + total) / (1 + frequencias.get(termo, 0))) + 1)
+        for termo, tf in termos.items()
+    }
+    pesos = dict(sorted(pesos.items(), key=lambda item: -item[1])[:MAX_TERMOS])
+    norma = math.sqrt(sum(peso * peso for peso in pesos.values())) or 1.0
+    return {termo: peso / norma for termo, peso in pesos.items()}
+
+
+## @brief Produtos aprovados com os campos usados pela tokenização.
+def _aprovados():
+    return (
+        Produto.objects.filter(aprovado=True)
+        .select_related("categoria", "marca")
+        .only("id", "nome", "descricao", "categoria__nome", "marca__nome")
+    )
+
+
+## @brief Quantidade de produtos aprovados, usada no IDF das indexações isoladas.
+#
+# Fica em cache por `TTL_TOTAL` segundos: um valor um pouco desatualizado muda o IDF
+# muito pouco, e a reconstrução periódica recalcula tudo com o valor exato.
+def _total_aprovados():
+    return cache_versionado.obter_coalescido(
+        "core:similares:total",
+        lambda: Produto.objects.filter(aprovado=True).count(),
+        TTL_TOTAL,
+    )
+
+
+## @brief Recalcula os vetores de todos os produtos aprovados.
+#
+# @param lote Quantidade de linhas por INSERT.
+# @return Quantidade de produtos indexados.
+def reconstruir_indice(lote=1000):
+    documentos = {produto.id: termos_produto(produto) for produto in _aprovados().iterator()}
+    frequencias = Counter()
+    for termos in documentos.values():
+        frequencias.update(termos.keys())
+
+    with transaction.atomic():
+        TermoProduto.objects.all().delete()
+        TermoProduto.objects.bulk_create(
+            (
+                TermoProduto(produto_id=produto_id, termo=termo, peso=peso)
+                for produto_id, termos in documentos.items()
+                for termo, peso in _vetor(termos, frequencias, len(documentos)).items()
+            ),
+            batch_size=lote,
+        )
+    cache_versionado.invalidar(VERSAO)
+    return len(documentos)
+
+
+## @brief Adiciona ou atualiza produtos no índice, sem recalcular os demais.
+#
+# As frequências de documento vêm do próprio índice. Produtos que não estão
+# aprovados (ou não existem mais) são removidos do índice.
+#
+# @param ids IDs dos produtos.
+def indexar_produtos(ids):
+    produtos = list(_aprovados().filter(id__in=ids))
+    documentos = {produto.id: termos_produto(produto) for produto in produtos}
+    todos = {termo for termos in documentos.values() for termo in termos}
+
+    with transaction.atomic():
+        removidos, _ = (
+            TermoProduto.objects.filter(produto_id__in=ids)
+            .exclude(produto_id__in=documentos)
+            .delete()
+        )
+        TermoProduto.objects.filter(produto_id__in=documentos).delete()
+        if documentos:
+            frequencias = Counter(
+                dict(
+                    TermoProduto.objects.filter(termo__in=todos)
+                    .values_list("termo")
+                    .annotate(total=Count("id"))
+                    .order_by()
+                )
+            )
+            for termos in documentos.values():
+                frequencias.update(termos.keys())
+            total = _total_aprovados()
+            TermoProduto.objects.bulk_create(
+                TermoProduto(produto_id=produto_id, termo=termo, peso=peso)
+                for produto_id, termos in documentos.items()
+                for termo, peso in _vetor(termos, frequencias, total).items()
+            )
+    if removidos:
+        cache_versionado.invalidar(VERSAO)
+    for produto_id in documentos:
+        cache_versionado.invalidar(f"{VERSAO}:{produto_id}")
+
+
+## @brief Monta a subconsulta das linhas de maior peso da lista de produtos de cada termo.
+#
+# Uma subconsulta limitada por termo (`UNION ALL`), servida pelo índice
+# `(termo, -peso, produto)`.
+#
+# @param termos Os termos consultados.
+# @return Tupla (sql, parâmetros) de uma consulta com as colunas produto_id, termo e peso.
+def _listas_campeas(termos):
+    tabela = connection.ops.quote_name(TermoProduto._meta.db_table)
+    subconsultas = [
+        f"SELECT * FROM (SELECT produto_id, termo, peso FROM {tabela} "
+        f"WHERE termo = %s ORDER BY peso DESC LIMIT %s) AS t{i}"
+        for i in range(len(termos))
+    ]
+    parametros = [valor for termo in termos for valor in (termo, LINHAS_POR_TERMO)]
+    return " UNION ALL ".join(subconsultas), parametros
+
+
+## @brief Retorna os produtos aprovados mais similares a um produto.
+#
+# O vetor do produto (até `MAX_TERMOS` termos) é lido primeiro; a segunda consulta soma,
+# sobre as listas campeãs dos termos (`_listas_campeas`), o peso do termo multiplicado
+# pelo peso correspondente do vetor consultado, e ordena pela soma (o cosseno). O
+# resultado fica em cache até a próxima alteração do produto no índice (ver o início
+# do arquivo).
+#
+# @param produto_id O ID do produto.
+# @param k Quantidade máxima de produtos.
+# @return Lista de dicionários (id, nome, imagem_url, similaridade), do mais similar ao menos.
+def produtos_similares(produto_id, k=TOP_K):
+    versoes = cache_versionado.obter_versoes(VERSAO, f"{VERSAO}:{produto_id}")
+    chave = f"core:similares:{produto_id}:{k}:v{versoes[0]}.{versoes[1]}"
+    similares = cache.get(chave)
+    if similares is not None:
+        return similares
+
+    vetor = dict(
+        TermoProduto.objects.filter(produto_id=produto_id).values_list("termo", "peso")
+    )
+    similares = []
+    if vetor:
+        campeas, parametros_campeas = _listas_campeas(list(vetor))
+        pesos = " ".join("WHEN %s THEN %s" for _ in vetor)
+        produtos = connection.ops.quote_name(Produto._meta.db_table)
+        sql = (
+            f"SELECT c.produto_id, p.nome, p.imagem_url, "
+            f"SUM(c.peso * CASE c.termo {pesos} END) AS similaridade "
+            f"FROM ({campeas}) AS c JOIN {produtos} AS p ON p.id = c.produto_id "
+            f"WHERE p.aprovado = %s AND c.produto_id <> %s "
+            f"GROUP BY c.produto_id, p.nome, p.imagem_url "
+            f"ORDER BY similaridade DESC, c.produto_id LIMIT %s"
+        )
+        parametros = [valor for item in vetor.items() for valor in item]
+        parametros += parametros_campeas + [True, produto_id, k]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, parametros)
+            linhas = cursor.fetchall()
+        similares = [
+            {
+                "id": outro_id,
+                "nome": nome,
+                "imagem_url": imagem_url,
+                "similaridade": round(similaridade, 4),
+            }
+            for outro_id, nome, imagem_url, similaridade in linhas
+        ]
+    cache.set(chave, similares, cache_versionado.TIMEOUT_VALORES)
+    return similares
@@ -0,0 +1,70 @@
+/**
+ * @fileoverview
+ * Script responsável pelas sugestões (autocompletar) da barra de busca.
+ * A cada tecla, consulta a API de sugestões com o texto digitado e exibe os produtos,
+ * marcas e categorias sugeridos logo abaixo do campo.
+ *
+ * A URL da API é extraída do atributo `data-sugestoes-url` do campo de busca.
+ *
+ * Requisitos:
+ * - Campo `#search-form input[name="q"]` com o atributo `data-sugestoes-url`
+ * - Elemento `#sugestoes-busca` para a lista de sugestões
+ */
+
+document.addEventListener('DOMContentLoaded', function() {
+    /** @type {HTMLInputElement} */
+    const campo = document.querySelector('#search-form input[name="q"]');
+    /** @type {HTMLElement} */
+    const lista = document.getElementById('sugestoes-busca');
+    if (!campo || !lista) return;
+
+    const sugestoesUrl = campo.dataset.sugestoesUrl;
+    const rotulos = { produto: 'Produto', marca: 'Marca', categoria: 'Categoria' };
+    /** @type {AbortController|null} */
+    let pendente = null;
+
+    /**
+     * Exibe as sugestões recebidas da API.
+     * @param {Array<Object>} sugestoes - Lista de sugestões com tipo, nome e url.
+     */
+    function exibirSugestoes(sugestoes) {
+        lista.innerHTML = '';
+        sugestoes.forEach(function(sugestao) {
+            const item = document.createElement('a');
+            item.className = 'list-group-item list-group-item-action d-flex justify-content-between';
+            item.href = sugestao.url;
+
+            const nome = document.createElement('span');
+            nome.textContent = sugestao.nome;
+            const tipo = document.createElement('small');
+            tipo.className = 'text-muted';
+            tipo.textContent = rotulos[sugestao.tipo] || '';
+
+            item.append(nome, tipo);
+            lista.appendChild(item);
+        });
+        lista.classList.toggle('d-none', sugestoes.length === 0);
+    }
+
+    campo.addEventListener('input', function() {
+        const termo = campo.value.trim();
+        // Cancela a consulta da tecla anterior, se ainda não respondeu
+        if (pendente) pendente.abort();
+        if (!termo) {
+            exibirSugestoes([]);
+            return;
+        }
+        pendente = new AbortController();
+        fetch(`${sugestoesUrl}?q=${encodeURIComponent(termo)}`, { signal: pendente.signal })
+            .then(response => response.json())
+            .then(data => exibirSugestoes(data.sugestoes))
+            .catch(error => {
+                if (error.name !== 'AbortError') console.error('Erro ao buscar sugestões:', error);
+            });
+    });
+
+    // Esconde as sugestões ao clicar fora da barra de busca
+    document.addEventListener('click', function(event) {
+        if (!lista.contains(event.target) && event.target !== campo) exibirSugestoes([]);
+    });
+});
@@ -0,0 +1,235 @@
+## @file core/sugestoes.py
+#
+# @brief Sugestões de busca por prefixo (autocompletar) para a barra de busca.
+#
+# Cada processo mantém, para produtos aprovados, marcas e categorias, um `IndicePrefixos`
+# em memória: as chaves normalizadas (`nome_normalizado`) ordenadas num vetor, onde os
+# nomes que começam por um prefixo formam um intervalo contíguo achado por busca
+# binária. Cada nome entra uma vez por palavra ("refrigerante cola" também é achado por
+# "col"), e as sugestões são ordenadas pela popularidade (visualizações e cliques dos
+# produtos). Os prefixos de até `PREFIXO_CURTO` letras, cujos intervalos são os maiores,
+# têm as melhores sugestões pré-calculadas.
+#
+# Os três índices são independentes: cada um é reconstruído só quando a versão do seu
+# conjunto de dados muda ("nomes_produtos", "marcas" ou "categorias", invalidadas pelos
+# sinais dos modelos) ou quando passa de `SUGESTOES_MAX_IDADE` segundos, o que atualiza
+# os pesos de popularidade gravados por `utils.gravar_visualizacoes`. A reconstrução
+# roda numa thread em segundo plano, e as requisições continuam usando o índice
+# anterior até ela terminar; só a primeira montagem de cada índice no processo é feita
+# na própria requisição.
+
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+
+from . import busca_aproximada
+from . import cache as cache_versionado
+from .models import Categoria, Marca, Produto
+from .texto import normalizar_nome
+
+## @brief Quantidade padrão de sugestões retornadas.
+LIMITE = 8
+
+## @brief Prefixos até este tamanho têm as sugestões pré-calculadas.
+PREFIXO_CURTO = 2
+
+## @brief Idade máxima padrão (em segundos) de um índice (ver `SUGESTOES_MAX_IDADE`).
+SUGESTOES_MAX_IDADE = 300
+
+## @brief Versão do cache de cada tipo de sugestão.
+#
+# Em caso de empate na popularidade, categorias vêm antes de marcas e marcas antes de
+# produtos.
+VERSOES = {
+    "categoria": "categorias",
+    "marca": "marcas",
+    "produto": busca_aproximada.VERSAO,
+}
+
+logger = logging.getLogger(__name__)
+
+_indices = {}
+_indices_lock = threading.Lock()
+## @brief Tipos com reconstrução em andamento (no máximo uma por tipo).
+_reconstruindo = set()
+
+
+## @brief Índice ordenado de chaves normalizadas para busca por prefixo.
+class IndicePrefixos:
+    ## @brief Monta o índice.
+    #
+    # @param itens Iterável de tuplas (id, nome, nome normalizado, peso).
+    def __init__(self, itens):
+        entradas = []
+        for item in itens:
+            palavras = item[2].split()
+            for i in range(len(palavras)):
+                entradas.append((" ".join(palavras[i:]), item))
+        entradas.sort(key=lambda entrada: entrada[0])
+        ## Chaves ordenadas, para a busca binária.
+        self.chaves = [chave for chave, _ in entradas]
+        ## Item de cada chave, na mesma ordem.
+        self.itens = [item for _, item in entradas]
+        ## Prefixo curto -> melhores itens, do mais popular ao menos.
+        self.curtos = {}
+        for prefixo in {
+            chave[:n] for chave in self.chaves for n in range(1, PREFIXO_CURTO + 1)
+        }:
+            self.curtos[prefixo] = self._melhores(prefixo, LIMITE)
+
+    ## @brief Busca os itens mais populares cujos nomes têm uma palavra com o prefixo.
+    #
+    # @param prefixo O prefixo normalizado.
+    # @param limite Quantidade máxima de itens.
+    # @return Lista de tuplas (id, nome, nome normalizado, peso), da mais popular à menos.
+    def buscar(self, prefixo, limite=LIMITE):
+        if len(prefixo) <= PREFIXO_CURTO and limite <= LIMITE:
+            return self.curtos.get(prefixo, [])[:limite]
+        return self._melhores(prefixo, limite)
+
+    ## @brief Percorre o intervalo de chaves com o prefixo e escolhe os mais populares.
+    def _melhores(self, prefixo, limite):
+        inicio = bisect_left(self.chaves, prefixo)
+        fim = bisect_left(self.chaves, prefixo + "\U0010ffff", inicio)
+        # Um nome com várias palavras com o prefixo aparece uma vez só
+        itens = {item[0]: item for item in self.itens[inicio:fim]}
+        return heapq.nlargest(
+            limite, itens.values(), key=lambda item: (item[3], -item[0])
+        )
+
+
+## @brief Carrega os produtos aprovados, com o peso de popularidade.
+def _produtos():
+    return (
+        Produto.objects.filter(aprovado=True, rejeitado=False)
+        .annotate(peso=F("visualizacoes") + F("cliques"))
+        .values_list("id", "nome", "nome_normalizado", "peso")
+        .iterator(chunk_size=2000)
+    )
+
+
+## @brief Carrega marcas ou categorias, com a popularidade somada dos seus produtos.
+#
+# @param modelo `Marca` ou `Categoria`.
+# @param campo Nome do campo de `Produto` que aponta para o modelo.
+def _agrupados(modelo, campo):
+    popularidade = (
+        Produto.objects.filter(
+            aprovado=True, rejeitado=False, **{campo: OuterRef("pk")}
+        )
+        .order_by()
+        .values(campo)
+        .annotate(total=Sum(F("visualizacoes") + F("cliques")))
+        .values("total")
+    )
+    return modelo.objects.annotate(
+        peso=Coalesce(Subquery(popularidade, output_field=IntegerField()), Value(0))
+    ).values_list("id", "nome", "nome_normalizado", "peso")
+
+
+## @brief Funções que carregam os itens de cada tipo de sugestão.
+_CARREGAR = {
+    "produto": _produtos,
+    "marca": lambda: _agrupados(Marca, "marca"),
+    "categoria": lambda: _agrupados(Categoria, "categoria"),
+}
+
+
+## @brief Monta o registro (versão, momento, índice) de um tipo de sugestão.
+def _montar(tipo, versao):
+    return (versao, time.monotonic(), IndicePrefixos(_CARREGAR[tipo]()))
+
+
+## @brief Reconstrói o índice de um tipo e o troca pelo anterior.
+#
+# @param tipo O tipo de sugestão.
+# @param versao A versão dos dados lida antes da reconstrução.
+# @param em_thread Se roda na thread de segundo plano (que fecha a própria conexão).
+def _reconstruir(tipo, versao, em_thread=False):
+    try:
+        _indices[tipo] = _montar(tipo, versao)
+    except Exception:
+        # O índice anterior continua em uso; a próxima requisição tenta de novo
+        logger.exception("Falha ao reconstruir as sugestões de %s", tipo)
+    finally:
+        with _indices_lock:
+            _reconstruindo.discard(tipo)
+        if em_thread:
+            connection.close()
+
+
+## @brief Agenda a reconstrução do índice de um tipo, se ainda não houver uma.
+#
+# Dentro de uma transação (ex: nos testes), a reconstrução é feita na própria
+# requisição: a thread usaria outra conexão, que não vê os dados ainda não confirmados.
+def _agendar(tipo, versao):
+    with _indices_lock:
+        if tipo in _reconstruindo:
+            return
+        _reconstruindo.add(tipo)
+    if connection.in_atomic_block:
+        _reconstruir(tipo, versao)
+    else:
+        threading.Thread(
+            target=_reconstruir, args=(tipo, versao, True), daemon=True
+        ).start()
+
+
+## @brief Retorna os índices de todos os tipos, agendando a reconstrução dos desatualizados.
+#
+# @return Dicionário tipo -> `IndicePrefixos`.
+def obter_indices():
+    versoes = dict(zip(VERSOES, cache_versionado.obter_versoes(*VERSOES.values())))
+    max_idade = getattr(settings, "SUGESTOES_MAX_IDADE", SUGESTOES_MAX_IDADE)
+    agora = time.monotonic()
+
+    for tipo in VERSOES:
+        registro = _indices.get(tipo)
+        if registro is None:
+            # Ainda não há índice para servir: monta na própria requisição
+            with _indices_lock:
+                if tipo not in _indices:
+                    _indices[tipo] = _montar(tipo, versoes[tipo])
+        elif registro[0] != versoes[tipo] or agora - registro[1] >= max_idade:
+            _agendar(tipo, versoes[tipo])
+    return {tipo: registro[2] for tipo, registro in _indices.items()}
+
+
+## @brief Busca as sugestões para o que foi digitado na barra de busca.
+#
+# @param termo O texto digitado (normalizado aqui).
+# @param limite Quantidade máxima de sugestões.
+# @return Lista de dicionários com tipo ("produto", "marca" ou "categoria"), id, nome e
+#         url, da sugestão mais popular à menos.
+def sugerir(termo, limite=LIMITE):
+    prefixo = normalizar_nome(termo)
+    if not prefixo:
+        return []
+    candidatos = [
+        (item[3], tipo, item)
+        for tipo, indice in obter_indices().items()
+        for item in indice.buscar(prefixo, limite)
+    ]
+    melhores = heapq.nlargest(limite, candidatos, key=lambda candidato: candidato[0])
+    return [_sugestao(tipo, item) for _, tipo, item in melhores]
+
+
+## @brief Monta o dicionário de uma sugestão, com o endereço para onde ela leva.
+def _sugestao(tipo, item):
+    if tipo == "produto":
+        url = reverse("core:produto", args=[item[0]])
+    else:
+        parametro = "q" if tipo == "marca" else "categoria"
+        url = (
+            reverse("core:product_catalog_page") + "?" + urlencode({parametro: item[1]})
+        )
+    return {"tipo": tipo, "id": item[0], "nome": item[1], "url": url}
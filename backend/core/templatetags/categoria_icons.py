@@ -1,5 +1,7 @@
 from django import template
 
+from core.texto import normalizar
+
 register = template.Library()
 
 # Dicionário de emojis para cada categoria
@@ -18,7 +20,6 @@ ICONS = {
     "eletronico": "🔌",
     "Eletrônicos": "💻",
     "Frios & Laticínios": "🧀",
-    "fruta": "🍎",
     "Fruta": "🍎",
     "Guloseimas": "🍬",
     "Higiene & Perfumaria": "🧴",
@@ -36,6 +37,10 @@ ICONS = {
     "Vinhos": "🍷",
 }
 
+## Ícones indexados pelo nome normalizado, para que "fruta" e "Fruta" (ou variações de
+## acento) compartilhem o mesmo ícone.
+_ICONES = {normalizar(nome): icone for nome, icone in ICONS.items()}
+
 
 @register.simple_tag
 def icon_categoria(nome_categoria):
@@ -43,6 +48,5 @@ def icon_categoria(nome_categoria):
     Retorna um emoji para a categoria.
     Usa um carrinho de compras como ícone padrão se a categoria não for encontrada.
     """
-    # A comparação de categoria deve ser insensível a maiúsculas/minúsculas
-    # e trata o & se necessário
-    return ICONS.get(nome_categoria, "🛒")  # Ícone padrão (carrinho de compras)
+    # A comparação de categoria é insensível a maiúsculas/minúsculas e a acentos
+    return _ICONES.get(normalizar(nome_categoria), "🛒")  # Ícone padrão (carrinho de compras)
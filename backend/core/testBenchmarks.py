@@ -0,0 +1,35 @@
+## @file core/testBenchmarks.py
+#
+# @brief Contém testes de unidade para a infraestrutura de benchmarks.
+#
+# Verifica o resumo produzido por `medir` e executa cada benchmark registrado sobre
+# um conjunto pequeno de dados, para que nenhum deles quebre sem ser notado.
+#
+# @see core.benchmarks
+
+from django.test import TestCase
+
+from .benchmarks import BENCHMARKS, medir, preparar_dados
+from .models import Produto
+
+
+## @brief Testes para `medir` e para os benchmarks registrados.
+class BenchmarksTest(TestCase):
+    ## @brief Testa as chaves do resumo e a contagem de consultas por execução.
+    def test_medir(self):
+        resultado = medir(lambda: list(Produto.objects.all()), 10)
+        self.assertEqual(
+            set(resultado),
+            {"media_ms", "p50_ms", "p95_ms", "min_ms", "max_ms", "consultas"},
+        )
+        self.assertLessEqual(resultado["p50_ms"], resultado["p95_ms"])
+        self.assertEqual(resultado["consultas"], 1)
+
+    ## @brief Testa que todos os benchmarks rodam sobre um catálogo pequeno.
+    def test_benchmarks_executam(self):
+        dados = preparar_dados(produtos=20, lojas=5, ofertas=60)
+        self.assertEqual(Produto.objects.count(), 20)
+        for nome, func in BENCHMARKS.items():
+            with self.subTest(benchmark=nome):
+                resultados = func(dados, 2)
+                self.assertTrue(resultados)
@@ -0,0 +1,109 @@
+## @file core/testBuscaAproximada.py
+#
+# @brief Contém testes de unidade para a busca tolerante a erros de digitação.
+#
+# Verifica a distância de edição com limite, o índice de trigramas em memória, o
+# complemento dos resultados do catálogo com nomes aproximados e a reconstrução do
+# índice quando os produtos mudam.
+#
+# @see core.busca_aproximada
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .busca_aproximada import (
+    LIMITE,
+    IndiceTrigramas,
+    buscar_aproximado,
+    distancia_edicao,
+)
+from .models import Categoria, Produto
+from .utils import search_products
+
+
+## @brief Testes para as funções e o índice da busca aproximada.
+class IndiceTrigramasTest(TestCase):
+    ## @brief Testa a distância de edição e o corte pelo limite.
+    def test_distancia_edicao(self):
+        self.assertEqual(distancia_edicao("refrigerante", "refrigernte", 2), 1)
+        self.assertEqual(distancia_edicao("sabao", "sabonete", 2), 3)
+        self.assertEqual(distancia_edicao("leite", "lite", 1), 1)
+        self.assertEqual(distancia_edicao("arroz", "feijao", 2), 3)
+        self.assertEqual(distancia_edicao("cafe", "cafe", 0), 0)
+
+    ## @brief Testa a busca no índice: orçamento de edições por tamanho e ordenação.
+    def test_buscar(self):
+        indice = IndiceTrigramas(
+            [
+                (1, "refrigerante cola"),
+                (2, "refrigerante guarana"),
+                (3, "leite integral"),
+                (4, "sal refinado"),
+            ]
+        )
+        self.assertEqual(indice.buscar("refrigernte"), [1, 2])
+        self.assertEqual(indice.buscar("refrigernte guarna"), [2, 1])
+        self.assertEqual(indice.buscar("lete"), [3])
+        # Palavras de até 3 letras só são aceitas exatas
+        self.assertEqual(indice.buscar("sal"), [4])
+        self.assertEqual(indice.buscar("sol"), [])
+        self.assertEqual(indice.buscar("produtoinexistente123"), [])
+
+
+## @brief Testes para o uso da busca aproximada no catálogo.
+class BuscaAproximadaCatalogoTest(TestCase):
+    ## @brief Cria produtos em duas categorias.
+    def setUp(self):
+        cache.clear()
+        self.bebidas = Categoria.objects.create(nome="Bebidas")
+        self.cola = Produto.objects.create(
+            nome="Refrigerante Cola", categoria=self.bebidas, aprovado=True
+        )
+        self.laranja = Produto.objects.create(nome="Suco de Laranja", aprovado=True)
+
+    ## @brief Testa que um termo com erro de digitação encontra o produto.
+    def test_catalogo(self):
+        dados = (
+            Client().get(reverse("core:product_catalog"), {"q": "refrigernte"}).json()
+        )
+        self.assertEqual([p["nome"] for p in dados["products"]], ["Refrigerante Cola"])
+
+    ## @brief Testa que os exatos vêm primeiro e que os filtros valem para os aproximados.
+    def test_exatos_primeiro_e_filtros(self):
+        Produto.objects.create(nome="Lanche Natural", aprovado=True)
+        nomes = [p["nome"] for p in search_products("laranja")]
+        self.assertEqual(nomes[0], "Suco de Laranja")
+        self.assertEqual(search_products("larnja", categoria=self.bebidas.caminho), [])
+
+    ## @brief Testa que os filtros são aplicados antes do corte da busca aproximada.
+    def test_filtros_antes_do_limite(self):
+        guaranas = Produto.objects.bulk_create(
+            Produto(nome=f"Refrigerante Guaraná {i}", aprovado=True)
+            for i in range(LIMITE + 5)
+        )
+        limao = Produto.objects.create(
+            nome="Refrigerante Limão", categoria=self.bebidas, aprovado=True
+        )
+        nomes = [
+            p["nome"] for p in search_products("refrigernte", categoria=self.bebidas.caminho)
+        ]
+        self.assertEqual(nomes, ["Refrigerante Cola", "Refrigerante Limão"])
+        self.assertEqual(
+            buscar_aproximado(
+                "refrigernte", produtos=Produto.objects.exclude(id=self.cola.id), limite=1
+            ),
+            [guaranas[0].id],
+        )
+        self.assertNotIn(limao.id, buscar_aproximado("refrigernte"))
+
+    ## @brief Testa que o índice em memória é reconstruído quando os produtos mudam.
+    def test_reconstrucao(self):
+        self.assertEqual(buscar_aproximado("biscoto"), [])
+        biscoito = Produto.objects.create(nome="Biscoito Recheado")
+        self.assertEqual(buscar_aproximado("biscoto"), [biscoito.id])
+        biscoito.nome = "Bolacha Recheada"
+        biscoito.save()
+        self.assertEqual(buscar_aproximado("biscoto"), [])
+        with self.assertNumQueries(0):
+            buscar_aproximado("bolaxa")
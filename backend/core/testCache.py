@@ -0,0 +1,250 @@
+## @file core/testCache.py
+#
+# @brief Contém testes de unidade para o cache versionado, o processador de contexto de
+#        categorias e o cache das respostas JSON de produtos.
+#
+# Verifica que os valores são calculados uma única vez por versão, que os sinais
+# de `Categoria` invalidam a lista em cache, que a lista só é lida quando um
+# template realmente a utiliza e que as respostas JSON de produtos acompanham as
+# alterações de produtos, ofertas e lojas. Também cobre o recálculo coalescido de
+# `obter_coalescido` (uma única thread recalcula; as demais esperam ou recebem o
+# valor vencido) e a busca do catálogo em cache.
+#
+# @see core.cache
+# @see core.context_processors
+
+import json
+import threading
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import cache as cache_versionado
+from .context_processors import categorias_disponiveis
+from .models import Categoria, Loja, Oferta, Produto, Usuario
+from .utils import (
+    _produtos_json,
+    buscar_produtos,
+    estatisticas_produto_json,
+    obter_categorias,
+    obter_produto_json,
+)
+
+
+## @brief Testes para as funções de `core.cache`.
+class CacheVersionadoTest(TestCase):
+    ## @brief Limpa o cache compartilhado antes de cada teste.
+    def setUp(self):
+        cache.clear()
+        self.chamadas = 0
+
+    ## @brief Função de carga que conta quantas vezes foi chamada.
+    def _carregar(self):
+        self.chamadas += 1
+        return ["valor", self.chamadas]
+
+    ## @brief Testa que o valor é calculado apenas uma vez enquanto a versão não muda.
+    def test_valor_calculado_uma_vez_por_versao(self):
+        primeiro = cache_versionado.obter_versionado("teste", self._carregar)
+        segundo = cache_versionado.obter_versionado("teste", self._carregar)
+        self.assertEqual(primeiro, segundo)
+        self.assertEqual(self.chamadas, 1)
+
+    ## @brief Testa que invalidar força um novo cálculo.
+    def test_invalidar_recalcula(self):
+        cache_versionado.obter_versionado("teste", self._carregar)
+        cache_versionado.invalidar("teste")
+        valor = cache_versionado.obter_versionado("teste", self._carregar)
+        self.assertEqual(valor, ["valor", 2])
+
+    ## @brief Testa que a cópia local é descartada quando a versão compartilhada some.
+    def test_versao_expulsa_nao_reaproveita_copia_local(self):
+        cache_versionado.obter_versionado("teste", self._carregar)
+        cache.clear()
+        cache_versionado.obter_versionado("teste", self._carregar)
+        self.assertEqual(self.chamadas, 2)
+
+
+## @brief Testes para `obter_coalescido` e `buscar_produtos`.
+class CacheCoalescidoTest(TestCase):
+    ## @brief Limpa o cache compartilhado antes de cada teste.
+    def setUp(self):
+        cache.clear()
+        self.chamadas = 0
+
+    ## @brief Função de cálculo que conta as chamadas.
+    def _calcular(self):
+        self.chamadas += 1
+        return self.chamadas
+
+    ## @brief Testa que o valor é reaproveitado dentro do prazo.
+    def test_valor_fresco(self):
+        self.assertEqual(cache_versionado.obter_coalescido("k", self._calcular, 60), 1)
+        self.assertEqual(cache_versionado.obter_coalescido("k", self._calcular, 60), 1)
+        self.assertEqual(self.chamadas, 1)
+
+    ## @brief Testa que o valor vencido é servido enquanto outro worker recalcula.
+    def test_valor_obsoleto_durante_recalculo(self):
+        cache.set("k", (time.time() - 1, "antigo"), 60)
+        cache.add("k:trava", 1)  # simula outro worker recalculando
+        self.assertEqual(
+            cache_versionado.obter_coalescido("k", self._calcular, 60, 60), "antigo"
+        )
+        self.assertEqual(self.chamadas, 0)
+
+        cache.delete("k:trava")
+        self.assertEqual(cache_versionado.obter_coalescido("k", self._calcular, 60, 60), 1)
+
+    ## @brief Testa que, sem valor anterior, a espera pela trava é limitada.
+    def test_espera_limitada(self):
+        cache.add("k:trava", 1)
+        valor = cache_versionado.obter_coalescido("k", self._calcular, 60, espera=0.1)
+        self.assertEqual(valor, 1)
+
+    ## @brief Testa que threads concorrentes disparam um único cálculo.
+    def test_threads_coalescidas(self):
+        barreira = threading.Barrier(8)
+        resultados = []
+
+        def calcular_devagar():
+            time.sleep(0.2)
+            return self._calcular()
+
+        def requisicao():
+            barreira.wait()
+            resultados.append(
+                cache_versionado.obter_coalescido("k", calcular_devagar, 60)
+            )
+
+        threads = [threading.Thread(target=requisicao) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.chamadas, 1)
+        self.assertEqual(resultados, [1] * 8)
+
+    ## @brief Testa que a busca em cache acompanha as alterações do catálogo.
+    def test_buscar_produtos(self):
+        Produto.objects.create(nome="Sabonete", aprovado=True)
+        self.assertEqual(len(buscar_produtos("sab")), 1)
+        with CaptureQueriesContext(connection) as ctx:
+            buscar_produtos("sab")
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        Produto.objects.create(nome="Sabão", aprovado=True)
+        self.assertEqual(len(buscar_produtos("sab")), 2)
+
+
+## @brief Testes para o processador de contexto `categorias_disponiveis` e a `home_view`.
+class CategoriasDisponiveisTest(TestCase):
+    ## @brief Limpa o cache e cria duas categorias.
+    def setUp(self):
+        cache.clear()
+        Categoria.objects.create(nome="Bebida")
+        Categoria.objects.create(nome="Alimentos")
+
+    ## @brief Testa que o processador de contexto não consulta o banco até a lista ser lida.
+    def test_processador_e_preguicoso(self):
+        request = RequestFactory().get("/")
+        with self.assertNumQueries(0):
+            contexto = categorias_disponiveis(request)
+        with self.assertNumQueries(1):
+            nomes = [c.nome for c in contexto["categorias"]]
+        self.assertEqual(nomes, ["Alimentos", "Bebida"])
+
+    ## @brief Testa que leituras seguintes vêm do cache, sem consultas.
+    def test_lista_em_cache(self):
+        obter_categorias()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(obter_categorias()), 2)
+
+    ## @brief Testa que salvar e excluir uma categoria atualiza a lista em cache.
+    def test_invalidacao_por_sinais(self):
+        obter_categorias()
+        nova = Categoria.objects.create(nome="Casa")
+        self.assertIn("Casa", [c.nome for c in obter_categorias()])
+        nova.delete()
+        self.assertNotIn("Casa", [c.nome for c in obter_categorias()])
+
+    ## @brief Testa que a home e o processador de contexto compartilham a mesma lista.
+    #
+    # Após a primeira requisição, a home não deve consultar a tabela de categorias.
+    def test_home_sem_consulta_de_categorias(self):
+        client = Client()
+        client.get(reverse("core:home"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse("core:home"))
+        self.assertContains(response, "Alimentos")
+        self.assertFalse(
+            any("core_categoria" in q["sql"] for q in ctx.captured_queries)
+        )
+
+
+## @brief Testes para o cache das respostas JSON de produtos (`obter_produto_json`).
+class ProdutoJsonCacheTest(TestCase):
+    ## @brief Limpa os caches e cria um produto com uma oferta.
+    def setUp(self):
+        cache.clear()
+        _produtos_json.clear()
+        estatisticas_produto_json.clear()
+        self.loja = Loja.objects.create(nome="Loja X")
+        self.produto = Produto.objects.create(nome="Café")
+        self.oferta = Oferta.objects.create(produto=self.produto, loja=self.loja, preco=Decimal("10.00"))
+
+    ## @brief Retorna o corpo decodificado da API de detalhes do produto.
+    def _produto(self):
+        return json.loads(obter_produto_json(self.produto.id))["product"]
+
+    ## @brief Testa a sequência miss -> hit local -> hit compartilhado.
+    def test_contadores(self):
+        self._produto()
+        with self.assertNumQueries(0):
+            self._produto()
+        _produtos_json.clear()  # Simula outro worker, sem a cópia local
+        self._produto()
+        self.assertEqual(
+            dict(estatisticas_produto_json),
+            {"miss": 1, "hit_local": 1, "hit_compartilhado": 1},
+        )
+
+    ## @brief Testa que alterar uma oferta invalida apenas o produto dela.
+    def test_invalidacao_por_oferta(self):
+        self._produto()
+        self.oferta.preco = Decimal("8.50")
+        self.oferta.save()
+        self.assertEqual(self._produto()["menor_preco"], 8.5)
+
+    ## @brief Testa que renomear uma loja invalida os produtos que a exibem.
+    def test_invalidacao_por_loja(self):
+        self._produto()
+        self.loja.nome = "Loja Y"
+        self.loja.save()
+        self.assertEqual(self._produto()["ofertas"][0]["loja"], "Loja Y")
+
+    ## @brief Testa que o LRU local respeita o tamanho máximo.
+    def test_lru_limitado(self):
+        lru = cache_versionado.CacheLRU(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual((lru.get("a"), lru.get("c"), len(lru)), (1, 3, 2))
+
+    ## @brief Testa a API de detalhes e o endpoint de estatísticas (apenas staff).
+    def test_api_e_estatisticas(self):
+        client = Client()
+        response = client.get(reverse("core:get_product_data_api", args=[self.produto.id]))
+        self.assertEqual(response.json()["product"]["nome"], "Café")
+        self.assertEqual(client.get(reverse("core:cache_estatisticas")).status_code, 302)
+
+        staff = Usuario.objects.create_user(username="staff", email="s@x.com", password="s", is_staff=True)
+        client.force_login(staff)
+        dados = client.get(reverse("core:cache_estatisticas")).json()
+        self.assertEqual(dados["produto_json"]["miss"], 1)
@@ -0,0 +1,155 @@
+## @file core/testCatalogoStreaming.py
+#
+# @brief Contém testes de unidade para o modo de streaming e o parâmetro `fields` das
+#        APIs do catálogo e do produto.
+#
+# Verifica que a resposta em partes tem o mesmo conteúdo da resposta comum, que os
+# produtos são lidos em blocos, a serialização de `json_em_partes` e a projeção das
+# colunas pedidas em `fields`.
+#
+# @see core.utils.iterar_produtos
+
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Categoria, Loja, Marca, Oferta, Produto
+from .utils import get_product_info, iterar_produtos, json_em_partes, search_products
+
+
+## @brief Testes para o modo de streaming do catálogo.
+class CatalogoStreamingTest(TestCase):
+    ## @brief Cria produtos com categoria, marca e ofertas.
+    def setUp(self):
+        cache.clear()
+        categoria = Categoria.objects.create(nome="Mercearia")
+        marca = Marca.objects.create(nome="Camil")
+        loja = Loja.objects.create(nome="Loja 1")
+        for i in range(5):
+            produto = Produto.objects.create(
+                nome=f"Arroz Tipo {i}", categoria=categoria, marca=marca, aprovado=True
+            )
+            Oferta.objects.create(
+                produto=produto, loja=loja, preco=Decimal("10.50") + i
+            )
+        Produto.objects.create(nome="Feijão Carioca", aprovado=True)
+
+    ## @brief Testa que a resposta em streaming é igual à resposta comum.
+    def test_mesmo_conteudo(self):
+        client = Client()
+        for parametros in [{}, {"q": "arroz", "ordenar": "avaliacao"}, {"q": "feijao"}]:
+            with self.subTest(parametros=parametros):
+                comum = client.get(reverse("core:product_catalog"), parametros).json()
+                resposta = client.get(
+                    reverse("core:product_catalog"), {**parametros, "stream": "1"}
+                )
+                self.assertTrue(resposta.streaming)
+                corpo = b"".join(resposta.streaming_content)
+                self.assertEqual(json.loads(corpo), comum)
+
+    ## @brief Testa a leitura em blocos e a busca aproximada no final do gerador.
+    def test_iterar_produtos(self):
+        with self.assertNumQueries(1):
+            nomes = [p["nome"] for p in iterar_produtos(query="arroz", chunk_size=2)]
+        self.assertEqual(nomes, [f"Arroz Tipo {i}" for i in range(5)])
+        self.assertEqual(
+            [p["nome"] for p in iterar_produtos(query="feijao carioka", chunk_size=2)],
+            ["Feijão Carioca"],
+        )
+
+    ## @brief Testa a serialização em partes.
+    def test_json_em_partes(self):
+        itens = [{"id": i, "preco": Decimal("1.5")} for i in range(5)]
+        partes = list(json_em_partes("products", iter(itens), tamanho=2))
+        self.assertEqual(len(partes), 5)
+        self.assertEqual(
+            "".join(partes),
+            json.dumps({"products": [{"id": i, "preco": "1.5"} for i in range(5)]}),
+        )
+        self.assertEqual("".join(json_em_partes("products", [])), '{"products": []}')
+
+
+## @brief Testes para o parâmetro `fields` das APIs do catálogo e do produto.
+class CamposSolicitadosTest(TestCase):
+    ## @brief Cria um produto com categoria, marca e oferta.
+    def setUp(self):
+        cache.clear()
+        categoria = Categoria.objects.create(nome="Mercearia")
+        marca = Marca.objects.create(nome="Camil")
+        self.produto = Produto.objects.create(
+            nome="Arroz Branco",
+            descricao="Uma descrição longa",
+            categoria=categoria,
+            marca=marca,
+            aprovado=True,
+        )
+        loja = Loja.objects.create(nome="Loja 1")
+        Oferta.objects.create(produto=self.produto, loja=loja, preco=Decimal("9.90"))
+
+    ## @brief Testa os campos no catálogo, inclusive no modo de streaming.
+    def test_catalogo(self):
+        client = Client()
+        url = reverse("core:product_catalog")
+        dados = client.get(url, {"fields": "nome,menor_preco,categoria"}).json()
+        self.assertEqual(
+            dados["products"],
+            [{"nome": "Arroz Branco", "categoria": "Mercearia", "menor_preco": 9.9}],
+        )
+        resposta = client.get(url, {"fields": "id", "stream": "1"})
+        self.assertEqual(
+            json.loads(b"".join(resposta.streaming_content)),
+            {"products": [{"id": self.produto.id}]},
+        )
+        resposta = client.get(url, {"fields": "nome,preco"})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn("preco", resposta.json()["error"])
+
+    ## @brief Testa que as colunas e ofertas não pedidas não são lidas do banco.
+    def test_projecao(self):
+        with CaptureQueriesContext(connection) as ctx:
+            search_products("arroz", campos={"nome"})
+        sql = ctx.captured_queries[0]["sql"]
+        self.assertNotIn("descricao", sql.split("FROM")[0])
+        self.assertNotIn("core_oferta", sql)
+        with self.assertNumQueries(1):
+            info = get_product_info(self.produto.id, {"nome", "marca"})
+        self.assertEqual(info, {"nome": "Arroz Branco", "marca": "Camil"})
+
+    ## @brief Testa os campos na API do produto e o cache separado por campos.
+    def test_produto(self):
+        client = Client()
+        url = reverse("core:get_product_data_api", args=[self.produto.id])
+        completo = client.get(url)
+        parcial = client.get(url, {"fields": "nome,menor_preco"})
+        self.assertEqual(
+            parcial.json(), {"product": {"nome": "Arroz Branco", "menor_preco": 9.9}}
+        )
+        self.assertIn("ofertas", completo.json()["product"])
+        self.assertNotEqual(completo["ETag"], parcial["ETag"])
+        self.assertEqual(client.get(url, {"fields": "nome,x"}).status_code, 400)
+
+    ## @brief Testa que o ETag do produto não depende da grafia de `fields` e que campos
+    # inválidos recebem 400 mesmo com um `If-None-Match` que casaria.
+    def test_etag_produto(self):
+        client = Client()
+        url = reverse("core:get_product_data_api", args=[self.produto.id])
+        parcial = client.get(url, {"fields": "nome,menor_preco"})
+        self.assertRegex(parcial["ETag"], r'^"[\w.-]+"$')
+        reordenado = client.get(
+            url, {"fields": " menor_preco ,nome"}, HTTP_IF_NONE_MATCH=parcial["ETag"]
+        )
+        self.assertEqual(reordenado.status_code, 304)
+
+        for invalido in ('nome,"x', "nome,x y"):
+            resposta = client.get(url, {"fields": invalido}, HTTP_IF_NONE_MATCH="*")
+            self.assertEqual(resposta.status_code, 400)
+            self.assertNotIn("ETag", resposta)
+        resposta = client.get(
+            reverse("core:product_catalog"), {"fields": "nome,x"}, HTTP_IF_NONE_MATCH="*"
+        )
+        self.assertEqual(resposta.status_code, 400)
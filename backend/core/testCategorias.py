@@ -0,0 +1,143 @@
+## @file core/testCategorias.py
+#
+# @brief Contém testes de unidade para a hierarquia de categorias (caminho materializado).
+#
+# Verifica a manutenção dos caminhos ao criar, mover e excluir categorias, a proteção
+# contra ciclos, o filtro do catálogo por subárvore e as contagens de produtos por
+# categoria em cache.
+#
+# @see core.models.Categoria
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .forms import CategoriaForm
+from .models import Categoria, Produto
+from .templatetags.categoria_icons import icon_categoria
+from .utils import contar_produtos_por_categoria
+
+
+## @brief Testes para a hierarquia de categorias.
+class CategoriasTest(TestCase):
+    ## @brief Cria a árvore Hortifruti > Frutas > Cítricas e a categoria Limpeza.
+    def setUp(self):
+        cache.clear()
+        self.hortifruti = Categoria.objects.create(nome="Hortifruti")
+        self.frutas = Categoria.objects.create(nome="Frutas", pai=self.hortifruti)
+        self.citricas = Categoria.objects.create(nome="Cítricas", pai=self.frutas)
+        self.limpeza = Categoria.objects.create(nome="Limpeza")
+
+    ## @brief Recarrega as categorias do banco.
+    def _recarregar(self):
+        for categoria in (self.hortifruti, self.frutas, self.citricas, self.limpeza):
+            categoria.refresh_from_db()
+
+    ## @brief Testa os caminhos gerados na criação e o filtro de subárvore.
+    def test_caminhos(self):
+        h, f, c = self.hortifruti.id, self.frutas.id, self.citricas.id
+        self.assertEqual(self.citricas.caminho, f"{h}/{f}/{c}/")
+        self.assertEqual(self.citricas.ancestrais_ids, [h, f, c])
+        subarvore = Categoria.objects.filter(Categoria.filtro_subarvore(self.hortifruti.caminho))
+        self.assertEqual(set(subarvore), {self.hortifruti, self.frutas, self.citricas})
+
+    ## @brief Testa que mover uma categoria reescreve os caminhos das descendentes.
+    def test_mover_subarvore(self):
+        self.frutas.pai = self.limpeza
+        self.frutas.save()
+        self._recarregar()
+        self.assertEqual(
+            self.citricas.caminho, f"{self.limpeza.id}/{self.frutas.id}/{self.citricas.id}/"
+        )
+        self.frutas.pai = None
+        self.frutas.save()
+        self._recarregar()
+        self.assertEqual(self.citricas.caminho, f"{self.frutas.id}/{self.citricas.id}/")
+
+    ## @brief Testa que uma falha ao salvar desfaz a reescrita dos caminhos da subárvore.
+    def test_mover_subarvore_atomico(self):
+        antigo = self.citricas.caminho
+        self.frutas.pai = self.limpeza
+        with mock.patch("django.db.models.Model.save", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.frutas.save()
+        self.citricas.refresh_from_db()
+        self.assertEqual(self.citricas.caminho, antigo)
+
+    ## @brief Testa que o filtro de subárvore não inclui caminhos que só compartilham dígitos.
+    def test_filtro_prefixo(self):
+        Categoria.objects.filter(pk=self.limpeza.pk).update(
+            caminho=f"{self.hortifruti.id}0/"
+        )
+        subarvore = Categoria.objects.filter(Categoria.filtro_subarvore(self.hortifruti.caminho))
+        self.assertNotIn(self.limpeza, subarvore)
+        self.assertIn(self.citricas, subarvore)
+
+    ## @brief Testa que as filhas de uma categoria excluída passam ao primeiro nível.
+    def test_excluir_pai(self):
+        self.hortifruti.delete()
+        self.frutas.refresh_from_db()
+        self.citricas.refresh_from_db()
+        self.assertIsNone(self.frutas.pai)
+        self.assertEqual(self.frutas.caminho, f"{self.frutas.id}/")
+        self.assertEqual(self.citricas.caminho, f"{self.frutas.id}/{self.citricas.id}/")
+
+    ## @brief Testa que uma categoria não pode ficar abaixo de uma descendente.
+    def test_ciclo(self):
+        form = CategoriaForm(
+            {"nome": "Hortifruti", "pai": self.citricas.id}, instance=self.hortifruti
+        )
+        self.assertFalse(form.is_valid())
+        self.assertNotIn(self.citricas, form.fields["pai"].queryset)
+        self.hortifruti.pai = self.citricas
+        with self.assertRaises(ValueError):
+            self.hortifruti.save()
+
+    ## @brief Testa o filtro do catálogo pela categoria de primeiro nível.
+    def test_catalogo_por_subarvore(self):
+        Produto.objects.create(nome="Laranja", categoria=self.citricas, aprovado=True)
+        Produto.objects.create(nome="Banana", categoria=self.frutas, aprovado=True)
+        Produto.objects.create(nome="Detergente", categoria=self.limpeza, aprovado=True)
+        client = Client()
+        dados = client.get(reverse("core:product_catalog"), {"categoria": "hortifruti"}).json()
+        self.assertEqual([p["nome"] for p in dados["products"]], ["Banana", "Laranja"])
+        dados = client.get(
+            reverse("core:product_catalog"), {"categoria": "Hortifruti", "q": "lara"}
+        ).json()
+        self.assertEqual([p["nome"] for p in dados["products"]], ["Laranja"])
+        # Um nome que não é categoria continua sendo usado como termo de busca
+        dados = client.get(reverse("core:product_catalog"), {"categoria": "Deterg"}).json()
+        self.assertEqual([p["nome"] for p in dados["products"]], ["Detergente"])
+
+    ## @brief Testa as contagens por subárvore, o cache e a invalidação.
+    def test_contagens(self):
+        Produto.objects.create(nome="Laranja", categoria=self.citricas, aprovado=True)
+        Produto.objects.create(nome="Banana", categoria=self.frutas, aprovado=True)
+        Produto.objects.create(nome="Pendente", categoria=self.frutas)
+        contagens = contar_produtos_por_categoria()
+        self.assertEqual(contagens[self.hortifruti.id], 2)
+        self.assertEqual(contagens[self.frutas.id], 2)
+        self.assertEqual(contagens[self.citricas.id], 1)
+        self.assertEqual(contagens[self.limpeza.id], 0)
+        with self.assertNumQueries(0):
+            contar_produtos_por_categoria()
+
+        Produto.objects.create(nome="Limão", categoria=self.citricas, aprovado=True)
+        self.assertEqual(contar_produtos_por_categoria()[self.hortifruti.id], 3)
+
+    ## @brief Testa que a página inicial lista só as categorias de primeiro nível.
+    def test_home(self):
+        response = Client().get(reverse("core:home"))
+        self.assertEqual(
+            [categoria for categoria, _ in response.context["categorias_raiz"]],
+            [self.hortifruti, self.limpeza],
+        )
+
+    ## @brief Testa que o ícone ignora maiúsculas e acentos.
+    def test_icone(self):
+        self.assertEqual(icon_categoria("fruta"), icon_categoria("Fruta"))
+        self.assertEqual(icon_categoria("eletrônicos"), icon_categoria("Eletrônicos"))
+        self.assertEqual(icon_categoria("Desconhecida"), "🛒")
@@ -0,0 +1,247 @@
+## @file core/testDuplicados.py
+#
+# @brief Contém testes de unidade para a detecção de produtos duplicados (`core.duplicados`).
+#
+# Verifica as chaves LSH, a busca de candidatos por nome, o preenchimento de
+# `ProdutoIndicado.produto_existente` na solicitação de produtos, o relatório de grupos
+# de duplicatas e a mesclagem de produtos.
+#
+# @see core.duplicados
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .duplicados import (
+    NUM_BANDAS,
+    agrupar_duplicatas,
+    chaves_lsh,
+    encontrar_duplicatas,
+    mesclar_produtos,
+)
+from .models import (
+    BandaProduto,
+    Categoria,
+    Comentario,
+    CoocorrenciaProduto,
+    ItemLista,
+    ListaCompra,
+    Loja,
+    Marca,
+    Oferta,
+    Produto,
+    ProdutoIndicado,
+    SkuLoja,
+    Usuario,
+    VisualizacaoHora,
+)
+
+
+## @brief Testes para o índice LSH e a busca de duplicatas.
+class DuplicadosTest(TestCase):
+    ## @brief Cria um pequeno catálogo (indexado pelos sinais de `Produto`).
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nome="Mercearia")
+        self.marca = Marca.objects.create(nome="Tio João")
+        self.arroz = Produto.objects.create(
+            nome="Arroz Branco Tipo 1 5kg", categoria=self.categoria, marca=self.marca, aprovado=True
+        )
+        self.feijao = Produto.objects.create(
+            nome="Feijão Carioca 1kg", categoria=self.categoria, marca=self.marca, aprovado=True
+        )
+
+    ## @brief Testa que as chaves são determinísticas e que nomes parecidos compartilham chaves.
+    def test_chaves_lsh(self):
+        chaves = chaves_lsh("Arroz Branco Tipo 1 5kg")
+        self.assertEqual(len(chaves), NUM_BANDAS)
+        self.assertEqual(chaves, chaves_lsh("ARROZ  branco tipo 1 5kg"))
+        self.assertTrue(set(chaves) & set(chaves_lsh("Arroz Branco Tipo1 5kg")))
+        self.assertEqual(chaves_lsh("!!"), [])
+        self.assertEqual(BandaProduto.objects.filter(produto=self.arroz).count(), NUM_BANDAS)
+
+    ## @brief Testa a busca por variações de grafia, acentos e a exclusão de nomes diferentes.
+    def test_encontrar_duplicatas(self):
+        resultados = encontrar_duplicatas("Feijao carioca 1 kg")
+        self.assertEqual([produto for produto, _ in resultados], [self.feijao])
+        self.assertGreaterEqual(resultados[0][1], 0.5)
+        self.assertEqual(encontrar_duplicatas("Feijão Carioca 1kg", excluir_id=self.feijao.id), [])
+        self.assertEqual(encontrar_duplicatas("Detergente Neutro"), [])
+
+    ## @brief Testa que produtos rejeitados saem do índice.
+    def test_rejeitados_fora_do_indice(self):
+        self.feijao.rejeitado = True
+        self.feijao.save()
+        self.assertFalse(BandaProduto.objects.filter(produto=self.feijao).exists())
+        self.assertEqual(encontrar_duplicatas("Feijão Carioca 1kg"), [])
+
+    ## @brief Testa os grupos do relatório e o comando de reconstrução do índice.
+    def test_agrupar_duplicatas(self):
+        copia = Produto.objects.create(nome="Arroz branco tipo 1 - 5 kg", categoria=self.categoria)
+        Oferta.objects.create(
+            produto=copia, loja=Loja.objects.create(nome="Loja A"), preco=Decimal("20.00")
+        )
+        BandaProduto.objects.all().delete()
+        call_command("reconstruir_duplicados", stdout=StringIO())
+
+        grupos = agrupar_duplicatas()
+        self.assertEqual(len(grupos), 1)
+        # O produto com mais ofertas vem primeiro (é a sugestão de produto a manter)
+        self.assertEqual([p["id"] for p in grupos[0]], [copia.id, self.arroz.id])
+        self.assertEqual(grupos[0][0]["ofertas_total"], 1)
+
+
+## @brief Testes para a mesclagem de produtos duplicados.
+class MesclarProdutosTest(TestCase):
+    ## @brief Cria dois produtos duplicados com ofertas, listas e comentários.
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            username="cliente", email="cliente@example.com", password="senha"
+        )
+        self.manter = Produto.objects.create(nome="Leite Integral 1L", aprovado=True)
+        self.duplicado = Produto.objects.create(nome="Leite integral 1 L", aprovado=True, visualizacoes=7)
+        Produto.objects.filter(id=self.manter.id).update(visualizacoes=3)
+        self.loja = Loja.objects.create(nome="Loja A")
+        data = timezone.now()
+        Oferta.objects.create(produto=self.manter, loja=self.loja, preco=Decimal("5.00"))
+        Oferta.objects.create(produto=self.duplicado, loja=self.loja, preco=Decimal("4.50"))
+        # Oferta com a mesma loja e data de captura de uma oferta do produto mantido
+        Oferta.objects.filter(produto=self.duplicado).update(data_captura=data)
+        Oferta.objects.filter(produto=self.manter).update(data_captura=data)
+        Oferta.objects.create(produto=self.duplicado, loja=Loja.objects.create(nome="Loja B"), preco=Decimal("4.00"))
+        lista = ListaCompra.objects.create(usuario=self.usuario, nome="Mercado")
+        ItemLista.objects.create(lista=lista, produto=self.manter)
+        ItemLista.objects.create(lista=lista, produto=self.duplicado)
+        Comentario.objects.create(usuario=self.usuario, produto=self.duplicado, texto="Bom", nota=4)
+
+    ## @brief Testa a transferência das linhas, o descarte das repetidas e os agregados.
+    def test_mesclar_produtos(self):
+        self.assertEqual(mesclar_produtos(self.manter, [self.duplicado.id, self.manter.id]), 1)
+        self.assertFalse(Produto.objects.filter(id=self.duplicado.id).exists())
+        self.assertEqual(Oferta.objects.filter(produto=self.manter).count(), 2)
+        self.assertEqual(ItemLista.objects.filter(produto=self.manter).count(), 1)
+        self.manter.refresh_from_db()
+        self.assertEqual(self.manter.visualizacoes, 10)
+        self.assertEqual(self.manter.total_avaliacoes, 1)
+        self.assertEqual(self.manter.nota_media, 4)
+
+    ## @brief Testa que as visualizações por hora e as coocorrências são somadas ao mantido.
+    def test_mesclar_historico(self):
+        hora = timezone.now().replace(minute=0, second=0, microsecond=0)
+        anterior = hora - timedelta(hours=1)
+        VisualizacaoHora.objects.create(produto=self.manter, hora=hora, quantidade=2)
+        VisualizacaoHora.objects.create(produto=self.duplicado, hora=hora, quantidade=5)
+        VisualizacaoHora.objects.create(produto=self.duplicado, hora=anterior, quantidade=1)
+        cafe = Produto.objects.create(nome="Café", aprovado=True)
+        for produto, relacionado, contagem in [
+            (self.manter, cafe, 3),
+            (cafe, self.manter, 3),
+            (self.duplicado, cafe, 2),
+            (cafe, self.duplicado, 2),
+            (self.manter, self.duplicado, 1),
+            (self.duplicado, self.manter, 1),
+        ]:
+            CoocorrenciaProduto.objects.create(
+                produto=produto, relacionado=relacionado, contagem=contagem
+            )
+
+        mesclar_produtos(self.manter, [self.duplicado.id])
+        self.assertEqual(
+            dict(
+                VisualizacaoHora.objects.filter(produto=self.manter).values_list(
+                    "hora", "quantidade"
+                )
+            ),
+            {hora: 7, anterior: 1},
+        )
+        self.assertEqual(
+            set(CoocorrenciaProduto.objects.values_list("produto", "relacionado", "contagem")),
+            {(self.manter.id, cafe.id, 5), (cafe.id, self.manter.id, 5)},
+        )
+
+    ## @brief Testa que os SKUs de lojas e o código de barras passam para o produto mantido.
+    def test_mesclar_sku_e_ean(self):
+        Produto.objects.filter(id=self.duplicado.id).update(ean="07891000100103")
+        SkuLoja.objects.create(loja=self.loja, sku="LEITE-1", produto=self.duplicado)
+        mesclar_produtos(self.manter, [self.duplicado.id])
+        self.assertEqual(SkuLoja.objects.get(sku="LEITE-1").produto, self.manter)
+        self.manter.refresh_from_db()
+        self.assertEqual(self.manter.ean, "07891000100103")
+
+        # O código de barras do produto mantido não é substituído
+        outro = Produto.objects.create(nome="Leite Integral", ean="17891000100100")
+        mesclar_produtos(self.manter, [outro.id])
+        self.manter.refresh_from_db()
+        self.assertEqual(self.manter.ean, "07891000100103")
+
+
+## @brief Testes das views de solicitação de produto e do relatório de duplicatas.
+class DuplicadosViewsTest(TestCase):
+    ## @brief Cria um usuário, um membro da equipe e um produto existente.
+    def setUp(self):
+        self.client = Client()
+        self.usuario = Usuario.objects.create_user(
+            username="cliente", email="cliente@example.com", password="senha"
+        )
+        self.staff = Usuario.objects.create_user(
+            username="staff", email="staff@example.com", password="senha", is_staff=True
+        )
+        self.categoria = Categoria.objects.create(nome="Mercearia")
+        self.marca = Marca.objects.create(nome="Camil")
+        self.existente = Produto.objects.create(
+            nome="Açúcar Refinado 1kg", categoria=self.categoria, marca=self.marca, aprovado=True
+        )
+        self.dados = {
+            "nome": "Acucar refinado 1 kg",
+            "descricao": "",
+            "imagem_url": "",
+            "categoria_id": self.categoria.id,
+            "marca_id": self.marca.id,
+        }
+
+    ## @brief Testa que uma solicitação parecida registra a indicação e não cria o produto.
+    def test_solicitacao_com_duplicata(self):
+        self.client.force_login(self.usuario)
+        response = self.client.post(reverse("core:solicitar_produto"), self.dados)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Açúcar Refinado 1kg")
+        self.assertContains(response, 'value="Acucar refinado 1 kg"')
+        self.assertEqual(Produto.objects.count(), 1)
+        indicacao = ProdutoIndicado.objects.get()
+        self.assertEqual(indicacao.produto_existente, self.existente)
+
+        # Reenviar não duplica a indicação
+        self.client.post(reverse("core:solicitar_produto"), self.dados)
+        self.assertEqual(ProdutoIndicado.objects.count(), 1)
+
+    ## @brief Testa que a confirmação do usuário cria o produto mesmo com duplicatas.
+    def test_solicitacao_confirmada(self):
+        self.client.force_login(self.usuario)
+        response = self.client.post(
+            reverse("core:solicitar_produto"), {**self.dados, "confirmar_novo": "1"}
+        )
+        self.assertRedirects(response, reverse("core:ver_solicitacao_produtos"))
+        self.assertTrue(Produto.objects.filter(nome="Acucar refinado 1 kg").exists())
+
+    ## @brief Testa que o relatório exige staff, lista os grupos e mescla os selecionados.
+    def test_relatorio_duplicados(self):
+        copia = Produto.objects.create(nome="Acucar refinado 1 kg", categoria=self.categoria)
+        url = reverse("core:relatorio_duplicados")
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(url)
+        self.assertContains(response, "Acucar refinado 1 kg")
+        self.assertEqual(len(response.context["grupos"]), 1)
+
+        response = self.client.post(
+            url, {"manter": self.existente.id, "duplicados": [self.existente.id, copia.id]}
+        )
+        self.assertRedirects(response, url)
+        self.assertEqual(list(Produto.objects.values_list("id", flat=True)), [self.existente.id])
@@ -15,6 +15,9 @@ from core.models import Usuario, Categoria, Marca, Produto, Loja, Categoria, Ofe
 from django.contrib.auth import get_user_model
 from django.test import RequestFactory
 from core.forms import ProdutoForm, LojaForm, OfertaForm, CategoriaForm
+from core.backends import EmailOuUsernameBackend
+from django.contrib.auth.hashers import check_password, make_password
+from unittest.mock import patch
 
 ## Obtém o modelo de usuário ativo do Django.
 User = get_user_model()
@@ -135,6 +138,56 @@ class CustomAuthenticationFormTests(TestCase):
         self.assertIn("__all__", form.errors)
 
 
+## @brief Conjunto de testes para o backend `EmailOuUsernameBackend`.
+#
+# Garante uma única consulta e uma única verificação de senha por tentativa de login,
+# inclusive para e-mails e para usuários inexistentes.
+class EmailOuUsernameBackendTests(TestCase):
+    ## @brief Cria o usuário usado nas tentativas de login.
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.backend = EmailOuUsernameBackend()
+        self.user = User.objects.create_user(
+            username="usuario_teste", email="teste@example.com", password="senha123"
+        )
+
+    ## @brief Testa o login por e-mail com uma consulta e uma verificação de senha.
+    def test_login_por_email_uma_verificacao(self):
+        with patch("django.contrib.auth.base_user.check_password", wraps=check_password) as verificar:
+            with self.assertNumQueries(1):
+                user = self.backend.authenticate(None, username="teste@example.com", password="senha123")
+        self.assertEqual(user, self.user)
+        self.assertEqual(verificar.call_count, 1)
+
+    ## @brief Testa que uma senha errada via e-mail também é verificada uma única vez.
+    def test_senha_errada_por_email_uma_verificacao(self):
+        with patch("django.contrib.auth.base_user.check_password", wraps=check_password) as verificar:
+            user = self.backend.authenticate(None, username="teste@example.com", password="errada")
+        self.assertIsNone(user)
+        self.assertEqual(verificar.call_count, 1)
+
+    ## @brief Testa que um usuário inexistente ainda executa o hasher uma vez.
+    def test_usuario_inexistente_executa_hasher(self):
+        with patch("django.contrib.auth.base_user.make_password", wraps=make_password) as hasher:
+            user = self.backend.authenticate(None, username="ninguem@example.com", password="senha123")
+        self.assertIsNone(user)
+        self.assertEqual(hasher.call_count, 1)
+
+    ## @brief Testa que o username tem prioridade quando coincide com o e-mail de outra conta.
+    def test_username_tem_prioridade_sobre_email(self):
+        outro = User.objects.create_user(
+            username="teste@example.com", email="outro@example.com", password="outrasenha"
+        )
+        user = self.backend.authenticate(None, username="teste@example.com", password="outrasenha")
+        self.assertEqual(user, outro)
+
+    ## @brief Testa que usuários inativos não são autenticados.
+    def test_usuario_inativo(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.authenticate(None, username="usuario_teste", password="senha123"))
+
+
 ## @brief Conjunto de testes para o formulário ProdutoForm.
 #
 # Testa a inicialização e os atributos dos campos do formulário Produto.
@@ -0,0 +1,117 @@
+## @file core/testImportacao.py
+#
+# @brief Contém testes de unidade para a importação de ofertas (`core.importacao`).
+#
+# Verifica a normalização de códigos de barras, a resolução de linhas por SKU e por
+# GTIN sem consultas ao banco, o aprendizado de SKUs, a importação em lote e o comando
+# `importar_ofertas`.
+#
+# @see core.importacao
+
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .forms import ProdutoForm
+from .importacao import IndiceProdutos, importar_ofertas, normalizar_ean
+from .models import Loja, Oferta, Produto, SkuLoja
+
+
+## @brief Testes para a normalização de códigos de barras.
+class NormalizarEanTest(TestCase):
+    ## @brief Testa os formatos aceitos, o dígito verificador e os códigos inválidos.
+    def test_normalizar_ean(self):
+        self.assertEqual(normalizar_ean("4006381333931"), "04006381333931")
+        self.assertEqual(normalizar_ean(" 4006-3813-3393-1 "), "04006381333931")
+        self.assertEqual(normalizar_ean("96385074"), "00000096385074")
+        self.assertIsNone(normalizar_ean("4006381333932"))  # dígito verificador errado
+        self.assertIsNone(normalizar_ean("12345"))
+        self.assertIsNone(normalizar_ean(None))
+
+    ## @brief Testa que o formulário de produto grava o código normalizado.
+    def test_formulario_produto(self):
+        form = ProdutoForm({"nome": "Leite", "ean": "4006381333931"})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save().ean, "04006381333931")
+        form = ProdutoForm({"nome": "Outro leite", "ean": ""})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertIsNone(form.save().ean)
+        self.assertFalse(ProdutoForm({"nome": "Leite", "ean": "4006381333932"}).is_valid())
+
+
+## @brief Testes para o índice em memória e a importação em lote.
+class ImportacaoTest(TestCase):
+    ## @brief Cria lojas, produtos com código de barras e um SKU conhecido.
+    def setUp(self):
+        self.loja_a = Loja.objects.create(nome="Loja A")
+        self.loja_b = Loja.objects.create(nome="Loja B")
+        self.leite = Produto.objects.create(nome="Leite", ean="04006381333931", aprovado=True)
+        self.cafe = Produto.objects.create(nome="Café", ean="00000096385074", aprovado=True)
+        SkuLoja.objects.create(loja=self.loja_a, sku="LT-1", produto=self.leite)
+
+    ## @brief Testa a resolução por SKU e por GTIN, sem consultas, e o aprendizado de SKUs.
+    def test_resolver(self):
+        indice = IndiceProdutos()
+        with self.assertNumQueries(0):
+            self.assertEqual(indice.resolver(self.loja_a.id, sku="LT-1"), self.leite.id)
+            self.assertEqual(indice.resolver(self.loja_b.id, ean="96385074"), self.cafe.id)
+            self.assertEqual(
+                indice.resolver(self.loja_b.id, sku="C-9", ean="0000096385074"), self.cafe.id
+            )
+            self.assertEqual(indice.resolver(self.loja_b.id, sku="C-9"), self.cafe.id)
+            self.assertIsNone(indice.resolver(self.loja_b.id, sku="LT-1"))
+        self.assertEqual(indice.gravar_skus(), 1)
+        self.assertEqual(
+            SkuLoja.objects.get(loja=self.loja_b, sku="C-9").produto, self.cafe
+        )
+
+    ## @brief Testa a importação: contagens, último preço por par e número de consultas.
+    def test_importar_ofertas(self):
+        linhas = [
+            {"loja": "Loja A", "sku": "LT-1", "preco": "5,49"},
+            {"loja": "Loja A", "sku": "LT-1", "preco": "5.29"},
+            {"loja": "Loja B", "ean": "4006381333931", "sku": "777", "preco": "5.99"},
+            {"loja": "Loja B", "ean": "7891000000000", "preco": "1.00"},
+            {"loja": "Loja C", "sku": "LT-1", "preco": "5.00"},
+            {"loja": "Loja A", "sku": "LT-1", "preco": "grátis"},
+        ]
+        resumo = importar_ofertas(linhas)
+        self.assertEqual(
+            resumo,
+            {
+                "importadas": 2,
+                "sem_produto": 1,
+                "loja_desconhecida": 1,
+                "preco_invalido": 1,
+                "novos_skus": 1,
+            },
+        )
+        self.assertEqual(
+            Oferta.objects.get(produto=self.leite, loja=self.loja_a).preco, Decimal("5.29")
+        )
+
+        # O número de consultas não depende da quantidade de linhas
+        contagens = []
+        for total in (10, 500):
+            with CaptureQueriesContext(connection) as ctx:
+                importar_ofertas(
+                    {"loja": "Loja B", "sku": "777", "preco": str(i + 1)} for i in range(total)
+                )
+            contagens.append(len(ctx.captured_queries))
+        self.assertEqual(contagens[0], contagens[1])
+
+    ## @brief Testa o comando de importação a partir de um arquivo CSV.
+    def test_comando(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as arquivo:
+            arquivo.write("loja;sku;ean;preco\nLoja A;LT-1;;4,50\nLoja B;;96385074;12,00\n")
+        self.addCleanup(os.remove, arquivo.name)
+        saida = StringIO()
+        call_command("importar_ofertas", arquivo.name, delimitador=";", stdout=saida)
+        self.assertIn("2 oferta(s) importada(s)", saida.getvalue())
+        self.assertEqual(Oferta.objects.filter(produto=self.cafe, loja=self.loja_b).count(), 1)
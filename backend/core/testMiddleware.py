@@ -0,0 +1,79 @@
+## @file core/testMiddleware.py
+#
+# @brief Contém testes de unidade para o middleware de instrumentação de SQL.
+#
+# Verifica a normalização das consultas, o cabeçalho `Server-Timing`, a linha de log
+# por requisição e a sinalização de consultas repetidas (N+1) com o nome da view.
+#
+# @see core.middleware
+
+import json
+
+from django.http import HttpResponse
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.urls import resolve, reverse
+
+from .middleware import InstrumentacaoSQLMiddleware, normalizar_sql
+from .models import Produto
+
+
+## @brief Testes para a função `normalizar_sql`.
+class NormalizarSqlTest(TestCase):
+    ## @brief Testa que parâmetros e literais diferentes geram a mesma impressão digital.
+    def test_literais_e_parametros(self):
+        a = normalizar_sql('SELECT * FROM "core_produto" WHERE "id" = 10 AND nome = \'a\'')
+        b = normalizar_sql('SELECT *  FROM "core_produto" WHERE "id" = %s AND nome = %s')
+        self.assertEqual(a, b)
+
+    ## @brief Testa que listas de IN de tamanhos diferentes coincidem.
+    def test_lista_in(self):
+        self.assertEqual(
+            normalizar_sql("SELECT 1 FROM t WHERE id IN (%s, %s, %s)"),
+            normalizar_sql("SELECT 1 FROM t WHERE id IN (%s)"),
+        )
+
+
+## @brief Testes para o `InstrumentacaoSQLMiddleware`.
+@override_settings(SQL_LIMITE_REPETICOES=3)
+class InstrumentacaoSQLMiddlewareTest(TestCase):
+    ## @brief Cria alguns produtos para as consultas de teste.
+    def setUp(self):
+        self.produtos = [Produto.objects.create(nome=f"P{i}") for i in range(5)]
+        self.factory = RequestFactory()
+
+    ## @brief Monta o middleware em torno de uma view que faz uma consulta por produto.
+    #
+    # @param consultas Quantidade de consultas individuais executadas pela view.
+    def _middleware(self, consultas):
+        def view(request):
+            request.resolver_match = resolve(reverse("core:home"))
+            for produto in self.produtos[:consultas]:
+                Produto.objects.get(id=produto.id)
+            return HttpResponse("ok")
+
+        return InstrumentacaoSQLMiddleware(view)
+
+    ## @brief Testa o cabeçalho Server-Timing e a linha de log de uma requisição comum.
+    def test_cabecalho_e_log(self):
+        with self.assertLogs("core.sql", level="INFO") as logs:
+            response = self._middleware(2)(self.factory.get("/"))
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn('desc="2 consultas"', response["Server-Timing"])
+
+        registro = json.loads(logs.records[0].getMessage())
+        self.assertEqual(registro["consultas"], 2)
+        self.assertEqual(registro["view"], "core.views.home_view")
+        self.assertEqual(registro["repetidas"], [])
+
+    ## @brief Testa que consultas repetidas acima do limite geram um aviso com a view.
+    def test_sinaliza_n_mais_um(self):
+        with self.assertLogs("core.sql", level="WARNING") as logs:
+            self._middleware(5)(self.factory.get("/"))
+        mensagem = logs.records[0].getMessage()
+        self.assertIn("Possível N+1 em core.views.home_view", mensagem)
+        self.assertIn('"vezes": 5', mensagem)
+
+    ## @brief Testa que o middleware está ativo nas requisições reais.
+    def test_ativo_nas_requisicoes(self):
+        response = Client().get(reverse("core:home"))
+        self.assertIn("Server-Timing", response)
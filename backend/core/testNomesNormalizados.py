@@ -0,0 +1,94 @@
+## @file core/testNomesNormalizados.py
+#
+# @brief Contém testes de unidade para as colunas `nome_normalizado` de produtos, marcas
+#        e categorias.
+#
+# Verifica a normalização, a sincronização das colunas em `save()` e nas operações em
+# lote, e o uso das colunas na busca do catálogo e na importação de ofertas.
+#
+# @see core.texto
+
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .importacao import importar_ofertas
+from .models import Categoria, Loja, Marca, Oferta, Produto
+from .texto import normalizar_nome
+
+
+## @brief Testes para a normalização e a sincronização das colunas.
+class NomesNormalizadosTest(TestCase):
+    ## @brief Testa a normalização de acentos, maiúsculas e espaços.
+    def test_normalizar_nome(self):
+        self.assertEqual(normalizar_nome("  Açúcar   Refinado\tUNIÃO "), "acucar refinado uniao")
+        self.assertEqual(normalizar_nome(None), "")
+
+    ## @brief Testa a sincronização em `save()`, inclusive com `update_fields`.
+    def test_save(self):
+        marca = Marca.objects.create(nome="Três Corações")
+        self.assertEqual(marca.nome_normalizado, "tres coracoes")
+        produto = Produto.objects.create(nome="Café  Torrado", marca=marca)
+        produto.nome = "Café Extra Forte"
+        produto.save(update_fields=["nome"])
+        produto.refresh_from_db()
+        self.assertEqual(produto.nome_normalizado, "cafe extra forte")
+        categoria = Categoria.objects.create(nome="Padarias & Matinais")
+        categoria.refresh_from_db()
+        self.assertEqual(categoria.nome_normalizado, "padarias & matinais")
+
+    ## @brief Testa a sincronização em `update()`, `bulk_create()` e `bulk_update()`.
+    def test_operacoes_em_lote(self):
+        produtos = Produto.objects.bulk_create([Produto(nome="Pão Francês"), Produto(nome="Maçã")])
+        self.assertEqual(
+            set(Produto.objects.values_list("nome_normalizado", flat=True)), {"pao frances", "maca"}
+        )
+        Produto.objects.filter(id=produtos[0].id).update(nome="Pão de Queijo")
+        self.assertEqual(Produto.objects.get(id=produtos[0].id).nome_normalizado, "pao de queijo")
+        produtos[1].nome = "Maçã Fuji"
+        Produto.objects.bulk_update(produtos[1:], ["nome"])
+        self.assertEqual(Produto.objects.get(id=produtos[1].id).nome_normalizado, "maca fuji")
+        with self.assertRaises(ValueError):
+            Produto.objects.update(nome=F("descricao"))
+
+
+## @brief Testes para o uso das colunas na busca e na importação.
+class BuscaNormalizadaTest(TestCase):
+    ## @brief Cria produtos com acentos no nome, na marca e na categoria.
+    def setUp(self):
+        cache.clear()
+        mercearia = Categoria.objects.create(nome="Mercearia")
+        uniao = Marca.objects.create(nome="União")
+        self.acucar = Produto.objects.create(
+            nome="Açúcar Refinado", categoria=mercearia, marca=uniao, aprovado=True
+        )
+        self.feijao = Produto.objects.create(nome="Feijão Preto", categoria=mercearia, aprovado=True)
+
+    ## @brief Testa a busca sem acentos e sem diferenciar maiúsculas.
+    def test_busca(self):
+        client = Client()
+        for termo, esperados in [
+            ("acucar", ["Açúcar Refinado"]),
+            ("AÇUCAR  REFINADO", ["Açúcar Refinado"]),
+            ("uniao", ["Açúcar Refinado"]),
+            ("mercearia", ["Açúcar Refinado", "Feijão Preto"]),
+            ("feijao", ["Feijão Preto"]),
+        ]:
+            with self.subTest(termo=termo):
+                dados = client.get(reverse("core:product_catalog"), {"q": termo}).json()
+                self.assertEqual([p["nome"] for p in dados["products"]], esperados)
+
+    ## @brief Testa a importação resolvendo loja e produto pelo nome normalizado.
+    def test_importacao_por_nome(self):
+        loja = Loja.objects.create(nome="Supermercado São Jorge")
+        Produto.objects.create(nome="Feijão preto")  # nome repetido: ambíguo
+        resumo = importar_ofertas(
+            [
+                {"loja": "supermercado sao jorge", "nome": "ACUCAR refinado", "preco": "4.99"},
+                {"loja": "Supermercado São Jorge", "nome": "feijao preto", "preco": "7.50"},
+            ]
+        )
+        self.assertEqual(resumo["importadas"], 1)
+        self.assertEqual(resumo["sem_produto"], 1)
+        self.assertTrue(Oferta.objects.filter(produto=self.acucar, loja=loja).exists())
@@ -0,0 +1,307 @@
+## @file core/testOrcamentoConsultas.py
+#
+# @brief Testes de regressão do número de consultas SQL de cada view ("orçamento de consultas").
+#
+# `ORCAMENTOS` declara, para cada nome de URL, o máximo de consultas permitido numa
+# requisição. Cada view é chamada sobre dados gerados em três escalas (1, 10 e 100
+# itens: produtos, ofertas, comentários, compras, itens de lista e de carrinho); o
+# teste falha se alguma requisição passar do orçamento ou se o número de consultas
+# crescer com a escala, o que denuncia um N+1. A mensagem de falha lista todas as views
+# fora do orçamento, com as contagens em cada escala.
+#
+# Toda URL nomeada de `core.urls` precisa de ao menos uma entrada em `ORCAMENTOS`;
+# `test_todas_as_urls_tem_orcamento` falha quando uma view nova fica de fora.
+#
+# @see core.middleware
+
+from collections import namedtuple
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import urls
+from .duplicados import chaves_lsh
+from .models import (
+    BandaProduto,
+    Categoria,
+    Comentario,
+    CoocorrenciaProduto,
+    ItemComprado,
+    ItemLista,
+    ListaCompra,
+    Loja,
+    Marca,
+    Oferta,
+    Produto,
+    TermoProduto,
+    Usuario,
+)
+from .utils import gravar_visualizacoes
+
+## @brief Uma entrada do registro de orçamentos.
+#
+# @param url Nome da URL (com o namespace "core:").
+# @param maximo Número máximo de consultas por requisição.
+# @param usuario "anonimo", "cliente" ou "staff".
+# @param args Função que recebe os dados gerados e devolve os argumentos da URL.
+# @param metodo "get" ou "post".
+# @param dados Função que recebe os dados gerados e devolve o corpo do POST.
+# @param carrinho Se True, o carrinho da sessão recebe todos os produtos gerados.
+Orcamento = namedtuple(
+    "Orcamento",
+    ["url", "maximo", "usuario", "args", "metodo", "dados", "carrinho"],
+    defaults=["anonimo", None, "get", None, False],
+)
+
+## @brief Escalas em que cada view é exercitada.
+ESCALAS = (1, 10, 100)
+
+## @brief Registro declarativo do número máximo de consultas por view.
+ORCAMENTOS = [
+    Orcamento("core:home", 3),
+    Orcamento("core:login", 1),
+    Orcamento("core:register", 1),
+    Orcamento("core:logout", 4, usuario="cliente"),
+    Orcamento("core:perfil", 3, usuario="cliente"),
+    Orcamento("core:lista_de_compras", 3, usuario="cliente"),
+    Orcamento("core:buscar_produtos", 1),
+    Orcamento("core:solicitar_produto", 4, usuario="cliente"),
+    Orcamento("core:ver_solicitacao_produtos", 4, usuario="staff"),
+    Orcamento("core:cache_estatisticas", 2, usuario="staff"),
+    Orcamento("core:rankings", 1),
+    Orcamento("core:sugestoes", 3, dados=lambda d: {"q": "pro"}),
+    Orcamento("core:product_catalog", 1),
+    Orcamento("core:product_catalog_page", 1),
+    Orcamento("core:get_product_data_api", 3, args=lambda d: [d["produto"].id]),
+    Orcamento("core:produto", 4, args=lambda d: [d["produto"].id]),
+    Orcamento("core:produto", 6, usuario="cliente", args=lambda d: [d["produto"].id]),
+    Orcamento("core:produtos_relacionados", 1, args=lambda d: [d["produto"].id]),
+    Orcamento("core:produtos_similares", 2, args=lambda d: [d["produto"].id]),
+    Orcamento(
+        "core:comentar_produto",
+        10,
+        usuario="cliente",
+        args=lambda d: [d["produto"].id],
+        metodo="post",
+        dados=lambda d: {"texto": "Muito bom", "nota": 5},
+    ),
+    Orcamento(
+        "core:excluir_comentario",
+        8,
+        usuario="cliente",
+        args=lambda d: [d["comentario"].id],
+        metodo="post",
+    ),
+    Orcamento("core:get_cart", 2, carrinho=True),
+    Orcamento(
+        "core:add_to_cart",
+        5,
+        metodo="post",
+        dados=lambda d: {"product_id": d["produto"].id},
+        carrinho=True,
+    ),
+    # Sem carrinho prévio: com um só produto gerado, a remoção o esvaziaria apenas na
+    # menor escala e a contagem variaria por isso, não por um N+1
+    Orcamento(
+        "core:remove_from_cart",
+        4,
+        metodo="post",
+        dados=lambda d: {"product_id": d["produto"].id},
+    ),
+    Orcamento("core:checkout", 4, usuario="cliente", carrinho=True),
+    Orcamento(
+        "core:finalizar_compra", 7, usuario="cliente", metodo="post", carrinho=True
+    ),
+    Orcamento("core:historico", 6, usuario="cliente"),
+    Orcamento("core:historico_resumo", 4, usuario="cliente"),
+    Orcamento("core:manage_shopping_lists", 7, usuario="cliente"),
+    Orcamento(
+        "core:manage_shopping_lists",
+        7,
+        usuario="cliente",
+        metodo="post",
+        dados=lambda d: {"action": "popular_carrinho", "lista_id": d["lista"].id},
+    ),
+    Orcamento(
+        "core:deletar_item_lista",
+        6,
+        usuario="cliente",
+        args=lambda d: [d["item"].id],
+        metodo="post",
+    ),
+    Orcamento(
+        "core:usar_lista_como_carrinho",
+        7,
+        usuario="cliente",
+        args=lambda d: [d["lista"].id],
+        metodo="post",
+    ),
+    Orcamento(
+        "core:finalizar_lista",
+        4,
+        usuario="cliente",
+        args=lambda d: [d["lista"].id],
+        metodo="post",
+    ),
+    Orcamento("core:manage_stores", 4, usuario="staff"),
+    Orcamento("core:manage_products", 6, usuario="staff"),
+    Orcamento("core:manage_offers", 6, usuario="staff"),
+    Orcamento("core:manage_categories", 5, usuario="staff"),
+    Orcamento("core:manage_brands", 4, usuario="staff"),
+    Orcamento("core:ver_aprovar_produtos", 6, usuario="staff"),
+    Orcamento("core:relatorio_duplicados", 4, usuario="staff"),
+]
+
+
+## @brief Verifica o registro `ORCAMENTOS` em todas as escalas.
+class OrcamentoConsultasTest(TestCase):
+    ## @brief Cria os usuários usados pelas requisições.
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = Usuario.objects.create_user(
+            username="cliente", email="cliente@example.com", password="senha"
+        )
+        cls.staff = Usuario.objects.create_user(
+            username="staff", email="staff@example.com", password="senha", is_staff=True
+        )
+
+    ## @brief Gera os dados de uma escala: `n` itens de cada tipo relevante.
+    #
+    # @param n A escala.
+    # @return Dicionário com os objetos que as entradas do registro referenciam.
+    def _gerar_dados(self, n):
+        categorias = Categoria.objects.bulk_create(
+            Categoria(nome=f"Categoria {i}") for i in range(n)
+        )
+        marcas = Marca.objects.bulk_create(Marca(nome=f"Marca {i}") for i in range(n))
+        lojas = Loja.objects.bulk_create(
+            Loja(nome=f"Loja {i}", url=f"https://loja{i}.example.com") for i in range(n)
+        )
+        produtos = Produto.objects.bulk_create(
+            Produto(
+                nome=f"Produto {i}",
+                categoria=categorias[i],
+                marca=marcas[i],
+                aprovado=i % 2 == 1,
+                adicionado_por=self.cliente,
+            )
+            for i in range(n)
+        )
+        Oferta.objects.bulk_create(
+            Oferta(produto=p, loja=lojas[(i + j) % n], preco=Decimal(10 + j))
+            for i, p in enumerate(produtos)
+            for j in range(min(3, n))
+        )
+        comentarios = Comentario.objects.bulk_create(
+            Comentario(usuario=self.cliente, produto=produtos[0], texto="Ok", nota=4)
+            for _ in range(n)
+        )
+        # Os agregados de nota acompanham os comentários, como fazem as views
+        Produto.objects.filter(pk=produtos[0].pk).update(
+            soma_notas=4 * n, total_avaliacoes=n
+        )
+        ItemComprado.objects.bulk_create(
+            ItemComprado(
+                usuario=self.cliente,
+                produto=p,
+                loja=lojas[0],
+                preco_pago=Decimal("10.00"),
+                data_compra=timezone.now().date(),
+            )
+            for p in produtos
+        )
+        TermoProduto.objects.bulk_create(
+            TermoProduto(produto=p, termo=termo, peso=0.5)
+            for p in produtos
+            for termo in ("produto", f"categoria:{p.categoria_id}")
+        )
+        BandaProduto.objects.bulk_create(
+            BandaProduto(produto=p, chave=chave)
+            for p in produtos
+            for chave in chaves_lsh(p.nome)
+        )
+        CoocorrenciaProduto.objects.bulk_create(
+            CoocorrenciaProduto(produto=produtos[0], relacionado=p, contagem=1)
+            for p in produtos[1:]
+        )
+        lista = ListaCompra.objects.create(usuario=self.cliente, nome="Mercado")
+        itens = ItemLista.objects.bulk_create(
+            ItemLista(lista=lista, produto=p) for p in produtos
+        )
+        return {
+            "produto": produtos[0],
+            "produtos": produtos,
+            "lista": lista,
+            "item": itens[0],
+            "comentario": comentarios[0],
+        }
+
+    ## @brief Executa a requisição de uma entrada e conta as consultas.
+    #
+    # @param orcamento A entrada do registro.
+    # @param dados Os dados gerados para a escala.
+    # @return A quantidade de consultas da requisição.
+    def _contar(self, orcamento, dados):
+        client = Client()
+        if orcamento.usuario != "anonimo":
+            client.force_login(
+                self.staff if orcamento.usuario == "staff" else self.cliente
+            )
+        if orcamento.carrinho:
+            session = client.session
+            session["cart"] = {str(p.id): {"quantity": 1} for p in dados["produtos"]}
+            session.save()
+
+        args = orcamento.args(dados) if orcamento.args else None
+        url = reverse(orcamento.url, args=args)
+        corpo = orcamento.dados(dados) if orcamento.dados else {}
+        # Caches derivados (categorias, fragmentos) são esvaziados para medir o pior caso
+        cache.clear()
+        # Contadores de visualização pendentes não podem vencer dentro da medição
+        gravar_visualizacoes()
+        with CaptureQueriesContext(connection) as ctx:
+            getattr(client, orcamento.metodo)(url, corpo)
+        return len(ctx.captured_queries)
+
+    ## @brief Testa que nenhuma view passa do orçamento nem cresce com a escala.
+    def test_orcamentos(self):
+        contagens = {orcamento: [] for orcamento in ORCAMENTOS}
+        for escala in ESCALAS:
+            for orcamento in ORCAMENTOS:
+                # Cada medição roda sobre dados novos, descartados ao final
+                with transaction.atomic():
+                    dados = self._gerar_dados(escala)
+                    contagens[orcamento].append(self._contar(orcamento, dados))
+                    transaction.set_rollback(True)
+
+        falhas = []
+        for orcamento, valores in contagens.items():
+            descricao = (
+                f"{orcamento.metodo.upper()} {orcamento.url} ({orcamento.usuario})"
+            )
+            medidas = ", ".join(f"{n} itens: {c}" for n, c in zip(ESCALAS, valores))
+            if max(valores) > orcamento.maximo:
+                falhas.append(
+                    f"{descricao} passou do orçamento de {orcamento.maximo} consultas [{medidas}]"
+                )
+            elif len(set(valores)) > 1:
+                falhas.append(
+                    f"{descricao} cresce com a quantidade de dados [{medidas}]"
+                )
+        if falhas:
+            self.fail("Views fora do orçamento de consultas:\n" + "\n".join(falhas))
+
+    ## @brief Testa que toda URL nomeada do app tem ao menos um orçamento registrado.
+    def test_todas_as_urls_tem_orcamento(self):
+        nomes = {
+            f"{urls.app_name}:{padrao.name}" for padrao in urls.urlpatterns if padrao.name
+        }
+        faltando = sorted(nomes - {orcamento.url for orcamento in ORCAMENTOS})
+        self.assertFalse(
+            faltando, "URLs sem entrada em ORCAMENTOS: " + ", ".join(faltando)
+        )
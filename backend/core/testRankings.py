@@ -0,0 +1,124 @@
+## @file core/testRankings.py
+#
+# @brief Contém testes de unidade para os rankings de produtos (`core.rankings`).
+#
+# Verifica a gravação das visualizações por hora, o cálculo dos rankings de produtos
+# em alta e mais vendidos sobre janelas de tempo, e que a página inicial e a API leem
+# apenas a tabela pré-calculada, sem agregar o histórico de compras.
+#
+# @see core.rankings
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ItemComprado, Produto, RankingProduto, Usuario, VisualizacaoHora
+from .rankings import TAMANHO_RANKING, calcular_rankings, obter_rankings
+from .utils import gravar_visualizacoes, registrar_visualizacao
+
+
+## @brief Testes para o cálculo e a leitura dos rankings.
+class RankingsTest(TestCase):
+    ## @brief Cria produtos, um usuário e esvazia o cache e os contadores pendentes.
+    def setUp(self):
+        cache.clear()
+        gravar_visualizacoes()
+        self.usuario = Usuario.objects.create_user(
+            username="u", email="u@example.com", password="s"
+        )
+        self.cafe = Produto.objects.create(nome="Café", aprovado=True)
+        self.arroz = Produto.objects.create(nome="Arroz", aprovado=True)
+        self.pendente = Produto.objects.create(nome="Pendente")
+
+    ## @brief Registra `n` compras de um produto numa data.
+    def _comprar(self, produto, n, data=None):
+        ItemComprado.objects.bulk_create(
+            ItemComprado(
+                usuario=self.usuario,
+                produto=produto,
+                preco_pago=Decimal("1.00"),
+                data_compra=data or timezone.localdate(),
+            )
+            for _ in range(n)
+        )
+
+    ## @brief Testa que as visualizações gravadas são somadas por hora.
+    def test_visualizacoes_por_hora(self):
+        for _ in range(3):
+            registrar_visualizacao(self.cafe.id)
+        registrar_visualizacao(self.cafe.id, "cliques")
+        registrar_visualizacao(999999)  # produto inexistente é ignorado
+        gravar_visualizacoes()
+        registrar_visualizacao(self.cafe.id)
+        gravar_visualizacoes()
+        linha = VisualizacaoHora.objects.get()
+        self.assertEqual((linha.produto, linha.quantidade), (self.cafe, 5))
+
+    ## @brief Testa a pontuação em alta (visualizações e compras) e os mais vendidos.
+    def test_calcular_rankings(self):
+        agora = timezone.now()
+        VisualizacaoHora.objects.create(produto=self.cafe, hora=agora, quantidade=3)
+        VisualizacaoHora.objects.create(
+            produto=self.arroz, hora=agora - timedelta(days=3), quantidade=100
+        )
+        VisualizacaoHora.objects.create(produto=self.pendente, hora=agora, quantidade=50)
+        self._comprar(self.arroz, 1)
+        self._comprar(self.cafe, 2, timezone.localdate() - timedelta(days=10))
+
+        calcular_rankings(agora)
+        rankings = obter_rankings()
+        self.assertEqual([p["nome"] for p in rankings["em_alta_24h"]], ["Arroz", "Café"])
+        self.assertEqual([p["pontuacao"] for p in rankings["em_alta_24h"]], [5, 3])
+        self.assertEqual([p["nome"] for p in rankings["em_alta_7d"]], ["Arroz", "Café"])
+        self.assertEqual([p["nome"] for p in rankings["mais_vendidos"]], ["Café", "Arroz"])
+
+    ## @brief Testa o tamanho máximo do ranking e o descarte das horas antigas.
+    def test_limite_e_retencao(self):
+        agora = timezone.now()
+        produtos = Produto.objects.bulk_create(
+            Produto(nome=f"P{i}", aprovado=True) for i in range(TAMANHO_RANKING + 5)
+        )
+        VisualizacaoHora.objects.bulk_create(
+            VisualizacaoHora(produto=p, hora=agora, quantidade=1) for p in produtos
+        )
+        VisualizacaoHora.objects.create(
+            produto=self.cafe, hora=agora - timedelta(days=30), quantidade=1
+        )
+        totais = calcular_rankings(agora)
+        self.assertEqual(totais["em_alta_24h"], TAMANHO_RANKING)
+        self.assertEqual(totais["mais_vendidos"], 0)
+        self.assertFalse(VisualizacaoHora.objects.filter(produto=self.cafe).exists())
+
+    ## @brief Testa que a página inicial e a API leem apenas a tabela de rankings.
+    def test_home_e_api_sem_agregar_historico(self):
+        self._comprar(self.cafe, 3)
+        call_command("calcular_rankings", stdout=StringIO())
+        client = Client()
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse("core:home"))
+        self.assertContains(response, "Mais vendidos")
+        self.assertContains(response, "Café")
+        self.assertFalse(any("core_itemcomprado" in q["sql"] for q in ctx.captured_queries))
+
+        with CaptureQueriesContext(connection) as ctx:
+            dados = client.get(reverse("core:rankings")).json()
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(dados["mais_vendidos"][0]["id"], self.cafe.id)
+        self.assertEqual(RankingProduto.objects.filter(tipo="mais_vendidos").count(), 1)
+
+    ## @brief Testa que renomear um produto atualiza os rankings em cache.
+    def test_invalidacao_por_produto(self):
+        self._comprar(self.cafe, 1)
+        calcular_rankings()
+        obter_rankings()
+        self.cafe.nome = "Café Especial"
+        self.cafe.save()
+        self.assertEqual(obter_rankings()["mais_vendidos"][0]["nome"], "Café Especial")
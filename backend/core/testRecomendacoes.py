@@ -0,0 +1,119 @@
+## @file core/testRecomendacoes.py
+#
+# @brief Contém testes de unidade para o índice de coocorrência de compras
+#        (`core.recomendacoes`).
+#
+# Verifica que o índice é atualizado apenas com as compras novas, que as cestas são
+# formadas por usuário e dia, e que os relacionados de um produto são lidos do índice.
+#
+# @see core.recomendacoes
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .models import CoocorrenciaProduto, ItemComprado, Produto, Usuario
+from .recomendacoes import atualizar_coocorrencias, produtos_relacionados
+
+
+## @brief Testes para `atualizar_coocorrencias` e `produtos_relacionados`.
+class CoocorrenciasTest(TestCase):
+    ## @brief Cria usuários e produtos e esvazia o cache.
+    def setUp(self):
+        cache.clear()
+        self.ana = Usuario.objects.create_user(username="ana", email="ana@example.com", password="s")
+        self.bia = Usuario.objects.create_user(username="bia", email="bia@example.com", password="s")
+        self.cafe, self.leite, self.pao, self.arroz = Produto.objects.bulk_create(
+            Produto(nome=nome, aprovado=True) for nome in ("Café", "Leite", "Pão", "Arroz")
+        )
+
+    ## @brief Registra uma compra (uma cesta parcial) de um usuário num dia.
+    def _comprar(self, usuario, produtos, dia=date(2025, 1, 10)):
+        ItemComprado.objects.bulk_create(
+            ItemComprado(usuario=usuario, produto=p, preco_pago=Decimal("1.00"), data_compra=dia)
+            for p in produtos
+        )
+
+    ## @brief Retorna a contagem de um par ordenado (0 se não existir).
+    def _contagem(self, a, b):
+        linha = CoocorrenciaProduto.objects.filter(produto=a, relacionado=b).first()
+        return linha.contagem if linha else 0
+
+    ## @brief Testa a formação das cestas por usuário e dia.
+    def test_cestas_por_usuario_e_dia(self):
+        self._comprar(self.ana, [self.cafe, self.leite])
+        self._comprar(self.bia, [self.cafe, self.leite, self.pao])
+        self._comprar(self.ana, [self.arroz], dia=date(2025, 1, 11))
+        self.assertEqual(atualizar_coocorrencias(), 6)
+
+        self.assertEqual(self._contagem(self.cafe, self.leite), 2)
+        self.assertEqual(self._contagem(self.leite, self.cafe), 2)
+        self.assertEqual(self._contagem(self.cafe, self.pao), 1)
+        self.assertEqual(self._contagem(self.cafe, self.arroz), 0)
+
+    ## @brief Testa a atualização incremental com uma nova compra na mesma cesta.
+    def test_atualizacao_incremental(self):
+        self._comprar(self.ana, [self.cafe, self.leite])
+        atualizar_coocorrencias()
+        self.assertEqual(atualizar_coocorrencias(), 0)
+
+        # Segunda compra no mesmo dia: o café repetido não é contado de novo
+        self._comprar(self.ana, [self.cafe, self.pao])
+        self.assertEqual(atualizar_coocorrencias(lote=1), 2)
+        self.assertEqual(self._contagem(self.cafe, self.leite), 1)
+        self.assertEqual(self._contagem(self.pao, self.cafe), 1)
+        self.assertEqual(self._contagem(self.pao, self.leite), 1)
+        self.assertEqual(self._contagem(self.leite, self.pao), 1)
+
+    ## @brief Testa que uma compra com ID menor, gravada depois (commit fora de ordem), é
+    # processada.
+    def test_compra_fora_de_ordem(self):
+        self._comprar(self.bia, [self.arroz])
+        self._comprar(self.ana, [self.cafe, self.leite])
+        atrasada = ItemComprado.objects.get(usuario=self.bia)
+        atrasada.delete()
+        atualizar_coocorrencias()
+
+        # A transação que reservou o ID menor só agora fez commit
+        ItemComprado.objects.create(
+            id=atrasada.id,
+            usuario=self.ana,
+            produto=self.pao,
+            preco_pago=Decimal("1.00"),
+            data_compra=date(2025, 1, 10),
+        )
+        self.assertEqual(atualizar_coocorrencias(), 1)
+        self.assertEqual(self._contagem(self.pao, self.cafe), 1)
+        self.assertEqual(self._contagem(self.leite, self.pao), 1)
+        self.assertEqual(self._contagem(self.cafe, self.leite), 1)
+
+    ## @brief Testa a ordem dos relacionados, o filtro de aprovados e o cache.
+    def test_produtos_relacionados(self):
+        self._comprar(self.ana, [self.cafe, self.leite, self.pao])
+        self._comprar(self.bia, [self.cafe, self.leite])
+        call_command("atualizar_coocorrencias", stdout=StringIO())
+        self.assertEqual([p["nome"] for p in produtos_relacionados(self.cafe.id)], ["Leite", "Pão"])
+
+        Produto.objects.filter(id=self.pao.id).update(aprovado=False)
+        with self.assertNumQueries(0):
+            produtos_relacionados(self.cafe.id)
+        self._comprar(self.bia, [self.arroz])
+        atualizar_coocorrencias()  # Nova versão do índice: o cache é descartado
+        self.assertEqual(
+            [p["nome"] for p in produtos_relacionados(self.cafe.id)], ["Leite", "Arroz"]
+        )
+
+    ## @brief Testa a API e a seção da página do produto.
+    def test_api_e_pagina(self):
+        self._comprar(self.ana, [self.cafe, self.leite])
+        atualizar_coocorrencias()
+        client = Client()
+        dados = client.get(reverse("core:produtos_relacionados", args=[self.cafe.id])).json()
+        self.assertEqual(dados["produtos"][0]["id"], self.leite.id)
+        response = client.get(reverse("core:produto", args=[self.cafe.id]))
+        self.assertContains(response, "Frequentemente comprados juntos")
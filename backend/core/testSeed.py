@@ -0,0 +1,71 @@
+## @file core/testSeed.py
+#
+# @brief Contém testes de unidade para o gerador de dados sintéticos e o comando `seed_catalog`.
+#
+# @see core.seed
+# @see core.management.commands.seed_catalog
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .models import Categoria, Comentario, ItemComprado, Loja, Marca, Oferta, Produto
+from .seed import gerar_catalogo
+
+
+## @brief Testes para `core.seed` e o comando `seed_catalog`.
+class SeedCatalogTest(TestCase):
+    ## @brief Retorna um retrato do catálogo atual, para comparar execuções.
+    def _retrato(self):
+        return (
+            list(Produto.objects.order_by("nome").values_list("nome", "descricao")),
+            list(
+                Oferta.objects.order_by("produto__nome", "loja__nome", "data_captura")
+                .values_list("produto__nome", "loja__nome", "preco")
+            ),
+        )
+
+    ## @brief Testa que a mesma semente gera exatamente os mesmos dados.
+    def test_deterministico(self):
+        gerar_catalogo(30, 5, 90, seed=7, dias=3)
+        primeiro = self._retrato()
+        for modelo in (Oferta, Produto, Loja, Marca, Categoria):
+            modelo.objects.all().delete()
+        gerar_catalogo(30, 5, 90, seed=7, dias=3)
+        self.assertEqual(self._retrato(), primeiro)
+
+    ## @brief Testa o comando completo: histórico de preços, compras, comentários e notas.
+    def test_comando(self):
+        call_command(
+            "seed_catalog",
+            products=40,
+            stores=6,
+            days=4,
+            users=5,
+            purchases=50,
+            comments=80,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Produto.objects.count(), 40)
+        # 5 lojas por produto (padrão), uma oferta por dia
+        self.assertEqual(Oferta.objects.count(), 40 * 5 * 4)
+        self.assertEqual(Oferta.objects.dates("data_captura", "day").count(), 4)
+        self.assertEqual(ItemComprado.objects.count(), 50)
+        self.assertEqual(Comentario.objects.count(), 80)
+
+        produto = Produto.objects.filter(total_avaliacoes__gt=0).first()
+        notas = list(
+            Comentario.objects.filter(produto=produto, nota__isnull=False).values_list(
+                "nota", flat=True
+            )
+        )
+        self.assertEqual(produto.total_avaliacoes, len(notas))
+        self.assertAlmostEqual(produto.nota_media, sum(notas) / len(notas))
+
+    ## @brief Testa que o comando se recusa a rodar sobre um catálogo existente.
+    def test_banco_nao_vazio(self):
+        Loja.objects.create(nome="Existente")
+        with self.assertRaises(CommandError):
+            call_command("seed_catalog", products=1, stdout=StringIO())
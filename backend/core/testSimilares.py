@@ -0,0 +1,133 @@
+## @file core/testSimilares.py
+#
+# @brief Contém testes de unidade para o índice de produtos similares (`core.similares`).
+#
+# Verifica a tokenização, a normalização dos vetores, a ordem dos similares, a indexação
+# incremental de produtos aprovados e a API usada pela página do produto.
+#
+# @see core.similares
+
+import math
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Categoria, Marca, Produto, TermoProduto, Usuario
+from .similares import produtos_similares, reconstruir_indice, termos_produto
+
+
+## @brief Testes para o índice TF-IDF de produtos similares.
+class SimilaresTest(TestCase):
+    ## @brief Cria um pequeno catálogo de produtos aprovados.
+    def setUp(self):
+        cache.clear()
+        bebidas = Categoria.objects.create(nome="Bebidas")
+        mercearia = Categoria.objects.create(nome="Mercearia")
+        marca = Marca.objects.create(nome="Três Corações")
+        self.cafe = Produto.objects.create(
+            nome="Café Torrado", descricao="Café moído tradicional", categoria=bebidas, marca=marca, aprovado=True
+        )
+        self.cafe_extra = Produto.objects.create(
+            nome="Café Torrado Extra Forte", descricao="Café moído", categoria=bebidas, marca=marca, aprovado=True
+        )
+        self.cha = Produto.objects.create(nome="Chá Mate", categoria=bebidas, aprovado=True)
+        self.arroz = Produto.objects.create(nome="Arroz Branco", categoria=mercearia, aprovado=True)
+
+    ## @brief Testa os termos gerados: acentos removidos, pares do nome, categoria e marca.
+    def test_termos_produto(self):
+        termos = termos_produto(self.cafe)
+        self.assertEqual(termos["cafe"], 3)  # duas vezes pelo nome e uma pela descrição
+        self.assertIn("cafe_torrado", termos)
+        self.assertIn("categoria:bebidas", termos)
+        self.assertIn("marca:tres coracoes", termos)
+
+    ## @brief Testa que os vetores gravados têm norma 1.
+    def test_vetores_normalizados(self):
+        self.assertEqual(reconstruir_indice(), 4)
+        pesos = TermoProduto.objects.filter(produto=self.cafe).values_list("peso", flat=True)
+        self.assertAlmostEqual(math.sqrt(sum(p * p for p in pesos)), 1.0)
+
+    ## @brief Testa a ordem dos similares e a exclusão de produtos sem termos em comum.
+    def test_produtos_similares(self):
+        call_command("reconstruir_similares", stdout=StringIO())
+        similares = produtos_similares(self.cafe.id)
+        self.assertEqual([s["nome"] for s in similares], ["Café Torrado Extra Forte", "Chá Mate"])
+        self.assertGreater(similares[0]["similaridade"], similares[1]["similaridade"])
+        with self.assertNumQueries(0):
+            produtos_similares(self.cafe.id)
+
+    ## @brief Testa a indexação incremental na aprovação e a remoção na rejeição.
+    def test_indexacao_incremental(self):
+        staff = Usuario.objects.create_user(username="s", email="s@example.com", password="s", is_staff=True)
+        pendente = Produto.objects.create(nome="Café Solúvel")
+        self.assertFalse(TermoProduto.objects.filter(produto=pendente).exists())
+
+        client = Client()
+        client.force_login(staff)
+        client.post(reverse("core:ver_aprovar_produtos"), {"produto_id": pendente.id})
+        self.assertTrue(TermoProduto.objects.filter(produto=pendente).exists())
+        self.assertIn("Café Solúvel", [s["nome"] for s in produtos_similares(self.cafe.id)])
+
+        self.cafe_extra.aprovado = False
+        self.cafe_extra.save()
+        self.assertNotIn("Café Torrado Extra Forte", [s["nome"] for s in produtos_similares(self.cafe.id)])
+
+    ## @brief Testa que salvar sem mudar os campos indexados não reindexa o produto.
+    def test_salvar_sem_alterar_indexados(self):
+        produto = Produto.objects.get(pk=self.cha.pk)
+        produto.imagem_url = "https://example.com/cha.png"
+        with self.assertNumQueries(1):
+            produto.save()
+        produto.nota_media = 4
+        with self.assertNumQueries(1):
+            produto.save(update_fields=["nota_media"])
+
+        parcial = Produto.objects.only("id", "nome").get(pk=self.cha.pk)
+        parcial.nome = "Chá Mate Tostado"
+        parcial.save()
+        self.assertTrue(TermoProduto.objects.filter(produto=self.cha, termo="tostado").exists())
+
+    ## @brief Testa que indexar um produto invalida só a lista dele, e que um produto que
+    # sai do índice invalida todas.
+    def test_invalidacao_por_produto(self):
+        reconstruir_indice()
+        self.assertEqual(produtos_similares(self.arroz.id), [])
+        antes = produtos_similares(self.cafe.id)
+        self.cha.nome = "Chá Mate Torrado"
+        self.cha.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(produtos_similares(self.cafe.id), antes)
+        self.assertIn("Café Torrado", [s["nome"] for s in produtos_similares(self.cha.id)])
+
+        self.cafe_extra.aprovado = False
+        self.cafe_extra.save()
+        self.assertNotIn(
+            "Café Torrado Extra Forte", [s["nome"] for s in produtos_similares(self.cafe.id)]
+        )
+
+    ## @brief Testa que só as linhas de maior peso de cada termo são lidas.
+    def test_listas_campeas(self):
+        reconstruir_indice()
+        with self.assertNumQueries(2):
+            completos = produtos_similares(self.cafe.id)
+        self.assertEqual(len(completos), 2)
+        cache.clear()
+        with mock.patch("core.similares.LINHAS_POR_TERMO", 1):
+            termos = TermoProduto.objects.filter(produto=self.cafe).count()
+            with CaptureQueriesContext(connection) as ctx:
+                produtos_similares(self.cafe.id)
+        self.assertIn("LIMIT 1", ctx.captured_queries[1]["sql"])
+        self.assertEqual(ctx.captured_queries[1]["sql"].count("UNION ALL"), termos - 1)
+
+    ## @brief Testa a API de similares.
+    def test_api(self):
+        response = Client().get(reverse("core:produtos_similares", args=[self.cafe.id]))
+        produto = response.json()["produtos"][0]
+        self.assertEqual(produto["id"], self.cafe_extra.id)
+        self.assertEqual(produto["url"], reverse("core:produto", args=[self.cafe_extra.id]))
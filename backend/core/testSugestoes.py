@@ -0,0 +1,118 @@
+## @file core/testSugestoes.py
+#
+# @brief Contém testes de unidade para as sugestões da barra de busca.
+#
+# Verifica a busca por prefixo no índice ordenado, a ordenação pela popularidade, a API
+# `/api/suggest/` e a reconstrução dos índices quando os dados mudam.
+#
+# @see core.sugestoes
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .models import Categoria, Marca, Produto
+from .sugestoes import IndicePrefixos, sugerir
+
+
+## @brief Testes para o índice de prefixos.
+class IndicePrefixosTest(TestCase):
+    ## @brief Testa a busca por prefixo de qualquer palavra e a ordenação pelo peso.
+    def test_buscar(self):
+        indice = IndicePrefixos(
+            [
+                (1, "Refrigerante Cola", "refrigerante cola", 5),
+                (2, "Refrigerante Guaraná", "refrigerante guarana", 9),
+                (3, "Coco Ralado", "coco ralado", 1),
+                (4, "Cola Cola", "cola cola", 0),
+            ]
+        )
+        self.assertEqual([item[0] for item in indice.buscar("ref")], [2, 1])
+        self.assertEqual([item[0] for item in indice.buscar("co")], [1, 3, 4])
+        self.assertEqual([item[0] for item in indice.buscar("cola")], [1, 4])
+        self.assertEqual([item[0] for item in indice.buscar("refrigerante g")], [2])
+        self.assertEqual(indice.buscar("x"), [])
+        self.assertEqual([item[0] for item in indice.buscar("r", limite=1)], [2])
+
+
+## @brief Testes para as sugestões de produtos, marcas e categorias.
+class SugestoesTest(TestCase):
+    ## @brief Cria produtos com popularidades diferentes.
+    def setUp(self):
+        cache.clear()
+        self.bebidas = Categoria.objects.create(nome="Bebidas")
+        self.brahma = Marca.objects.create(nome="Brahma")
+        self.cerveja = Produto.objects.create(
+            nome="Cerveja Pilsen",
+            categoria=self.bebidas,
+            marca=self.brahma,
+            aprovado=True,
+        )
+        self.biscoito = Produto.objects.create(
+            nome="Biscoito Água e Sal", aprovado=True
+        )
+        Produto.objects.create(nome="Bala de Goma")  # pendente: não é sugerido
+        Produto.objects.filter(id=self.cerveja.id).update(visualizacoes=10, cliques=5)
+        cache.clear()
+
+    ## @brief Testa a API: tipos, ordenação pela popularidade e endereços.
+    def test_api(self):
+        dados = Client().get(reverse("core:sugestoes"), {"q": "B"}).json()
+        self.assertEqual(
+            [(s["tipo"], s["nome"]) for s in dados["sugestoes"]],
+            [
+                ("categoria", "Bebidas"),
+                ("marca", "Brahma"),
+                ("produto", "Biscoito Água e Sal"),
+            ],
+        )
+        self.assertEqual(
+            dados["sugestoes"][2]["url"],
+            reverse("core:produto", args=[self.biscoito.id]),
+        )
+        self.assertEqual(
+            dados["sugestoes"][0]["url"],
+            reverse("core:product_catalog_page") + "?categoria=Bebidas",
+        )
+        self.assertEqual(
+            Client().get(reverse("core:sugestoes")).json(), {"sugestoes": []}
+        )
+
+    ## @brief Testa que as sugestões são respondidas da memória e reconstruídas após mudanças.
+    def test_reconstrucao(self):
+        self.assertEqual([s["nome"] for s in sugerir("agua")], ["Biscoito Água e Sal"])
+        with self.assertNumQueries(0):
+            sugerir("agu")
+        Produto.objects.create(nome="Água Mineral", aprovado=True)
+        self.assertEqual(
+            [s["nome"] for s in sugerir("agua")],
+            ["Biscoito Água e Sal", "Água Mineral"],
+        )
+        self.brahma.nome = "Skol"
+        self.brahma.save()
+        self.assertEqual([s["nome"] for s in sugerir("sk")], ["Skol"])
+
+    ## @brief Testa que, fora de uma transação, o índice anterior é servido enquanto a
+    # reconstrução roda em segundo plano.
+    def test_reconstrucao_em_segundo_plano(self):
+        sugerir("agua")
+        Produto.objects.create(nome="Água Mineral", aprovado=True)
+        with mock.patch.object(connection, "in_atomic_block", False), mock.patch(
+            "core.sugestoes.threading.Thread"
+        ) as thread:
+            with self.assertNumQueries(0):
+                nomes = [s["nome"] for s in sugerir("agua")]
+                sugerir("agu")
+        self.assertEqual(nomes, ["Biscoito Água e Sal"])
+        # Uma única reconstrução agendada, só para os produtos
+        thread.assert_called_once()
+        self.assertEqual(thread.call_args.kwargs["args"][0], "produto")
+
+        thread.call_args.kwargs["target"](*thread.call_args.kwargs["args"][:2])
+        self.assertEqual(
+            [s["nome"] for s in sugerir("agua")],
+            ["Biscoito Água e Sal", "Água Mineral"],
+        )
@@ -19,6 +19,7 @@ from .models import Categoria, Marca, Produto, Loja, Oferta, Usuario
 from django.contrib.messages.storage.fallback import FallbackStorage
 import decimal 
 from unittest.mock import patch 
+from django.core.cache import cache
 from .forms import LojaForm, ListaCompra, ItemLista
 
 # Importa as funções do seu arquivo utils.py
@@ -361,8 +362,9 @@ class MergeSessionCartTests(TestCase):
 #
 # Garante que o HTML gerado reflita corretamente o estado da lista de lojas: vazia ou preenchida.
 class RenderLojasHtmlTests(TestCase):
-    ## @brief Configura requisição de teste sem sessão.
+    ## @brief Configura requisição de teste sem sessão e limpa o cache de fragmentos.
     def setUp(self):
+        cache.clear()
         self.factory = RequestFactory()
         self.request = self.factory.get("/")
         self.request.session = {}
@@ -382,4 +384,31 @@ class RenderLojasHtmlTests(TestCase):
         self.assertIn("Loja Exemplo", html)
         self.assertIn("https://exemplo.com", html)
         self.assertIn("Editar", html)
-        self.assertIn("Excluir", html)
\ No newline at end of file
+        self.assertIn("Excluir", html)
+
+    ## @brief Testa que a lista completa é servida do cache sem novas consultas.
+    #
+    # O marcador do token CSRF deve ser trocado pelo token real mesmo no HTML vindo do cache.
+    def test_render_lojas_sem_queryset_usa_cache(self):
+        Loja.objects.create(nome="Loja Cache", url="https://cache.com")
+        primeiro = render_lojas_html(self.request)
+
+        with self.assertNumQueries(0):
+            segundo = render_lojas_html(self.request)
+
+        self.assertIn("Loja Cache", primeiro)
+        self.assertIn("Loja Cache", segundo)
+        self.assertIn('name="csrfmiddlewaretoken" value="', segundo)
+        self.assertNotIn("__csrf_token_placeholder__", segundo)
+
+    ## @brief Testa que salvar ou excluir uma loja invalida o fragmento em cache.
+    def test_render_lojas_cache_invalidado_ao_salvar_e_excluir(self):
+        loja = Loja.objects.create(nome="Antiga", url="https://antiga.com")
+        self.assertIn("Antiga", render_lojas_html(self.request))
+
+        loja.nome = "Renomeada"
+        loja.save()
+        self.assertIn("Renomeada", render_lojas_html(self.request))
+
+        loja.delete()
+        self.assertIn("Nenhuma loja cadastrada ainda", render_lojas_html(self.request))
@@ -25,6 +25,11 @@ from decimal import Decimal
 from django.utils import timezone # Para testar datas em ofertas/compras
 import json # Para JsonResponse
 from django.contrib.messages import get_messages # Para verificar mensagens após redirecionamento
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from core.utils import gravar_visualizacoes, registrar_visualizacao
 
 ## Obtém o modelo de usuário ativo do Django.
 Usuario = get_user_model()
@@ -222,6 +227,7 @@ class ManagementViewsTest(TestCase):
     # Também cria instâncias de modelos (Categoria, Marca, Produto, Loja, Oferta)
     # para uso nos testes de gerenciamento.
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.staff_user = Usuario.objects.create_user(
             username="admin", password="admin123", email="admin@test.com", is_staff=True, first_name="Admin", last_name="User"
@@ -684,4 +690,370 @@ class ManagementViewsTest(TestCase):
             "nome": "", # Nome vazio
         })
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, "Este campo é obrigatório.")
\ No newline at end of file
+        self.assertContains(response, "Este campo é obrigatório.")
+
+## @brief Conjunto de testes para a aprovação e rejeição em lote de produtos.
+#
+# Cobre a ação em lote, o filtro por quem enviou o produto e a paginação da fila.
+class AprovarProdutoViewTest(TestCase):
+    ## @brief Cria um usuário staff logado e produtos pendentes de dois autores.
+    def setUp(self):
+        self.client = Client()
+        self.staff_user = Usuario.objects.create_user(
+            username="admin", password="admin123", email="admin@test.com", is_staff=True
+        )
+        self.autor = Usuario.objects.create_user(username="autor", password="x", email="autor@test.com")
+        self.outro = Usuario.objects.create_user(username="outro", password="x", email="outro@test.com")
+        self.client.login(username="admin", password="admin123")
+        self.url = reverse("core:ver_aprovar_produtos")
+
+        self.p1 = Produto.objects.create(nome="P1", adicionado_por=self.autor)
+        self.p2 = Produto.objects.create(nome="P2", adicionado_por=self.autor)
+        self.p3 = Produto.objects.create(nome="P3", adicionado_por=self.outro)
+
+    ## @brief Testa a aprovação em lote com um único UPDATE para todos os selecionados.
+    def test_aprovar_em_lote(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"acao": "aprovar", "produto_ids": [self.p1.id, self.p2.id]})
+        # Lido antes de assertRedirects, que faz uma nova requisição e zera o log de consultas
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE") and "core_produto" in q["sql"]]
+        self.assertRedirects(response, self.url)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            set(Produto.objects.filter(aprovado=True).values_list("id", flat=True)),
+            {self.p1.id, self.p2.id},
+        )
+
+    ## @brief Testa a rejeição em lote, que remove os produtos da fila sem aprová-los.
+    def test_rejeitar_em_lote(self):
+        self.client.post(self.url, {"acao": "rejeitar", "produto_ids": [self.p1.id, self.p3.id]})
+        self.p1.refresh_from_db()
+        self.assertTrue(self.p1.rejeitado)
+        self.assertFalse(self.p1.aprovado)
+
+        response = self.client.get(self.url)
+        self.assertEqual([p.id for p in response.context["produtos"]], [self.p2.id])
+
+    ## @brief Testa que o botão de uma única linha continua aprovando só aquele produto.
+    def test_aprovar_produto_unico(self):
+        self.client.post(self.url, {"produto_id": self.p3.id})
+        self.assertTrue(Produto.objects.get(id=self.p3.id).aprovado)
+        self.assertFalse(Produto.objects.get(id=self.p1.id).aprovado)
+
+    ## @brief Testa que a aprovação invalida o JSON e o ETag da API do produto.
+    def test_aprovar_atualiza_api_produto(self):
+        url = reverse("core:get_product_data_api", args=[self.p1.id])
+        antes = self.client.get(url)
+        self.client.post(self.url, {"produto_id": self.p1.id})
+        depois = self.client.get(url, HTTP_IF_NONE_MATCH=antes["ETag"])
+        self.assertEqual(depois.status_code, 200)
+        self.assertNotEqual(depois["ETag"], antes["ETag"])
+        self.assertNotEqual(
+            depois.json()["product"]["atualizado_em"], antes.json()["product"]["atualizado_em"]
+        )
+
+    ## @brief Testa o filtro da fila de pendentes por quem enviou o produto.
+    def test_filtrar_por_autor(self):
+        response = self.client.get(self.url, {"adicionado_por": self.outro.id})
+        self.assertEqual([p.id for p in response.context["produtos"]], [self.p3.id])
+
+    ## @brief Testa que a fila é paginada e que o número de consultas não cresce com a página.
+    def test_paginacao_com_consultas_constantes(self):
+        Produto.objects.bulk_create(
+            Produto(nome=f"Extra {i}", adicionado_por=self.autor, categoria=None) for i in range(60)
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context["produtos"]), 50)
+        self.assertEqual(response.context["page_obj"].paginator.count, 63)
+        self.assertLess(len(ctx.captured_queries), 15)
+
+
+## @brief Testes para o histórico de compras paginado por cursor e o resumo de gastos.
+class HistoricoViewTest(TestCase):
+    ## @brief Cria um usuário com compras em dois meses e duas lojas.
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = Usuario.objects.create_user(username="comprador", password="senha")
+        self.client.login(username="comprador", password="senha")
+        self.loja_a = Loja.objects.create(nome="Loja A", url="http://a.com")
+        self.loja_b = Loja.objects.create(nome="Loja B", url="http://b.com")
+        self.produto = Produto.objects.create(nome="Arroz", aprovado=True)
+        ItemComprado.objects.create(usuario=self.user, produto=self.produto, loja=self.loja_a, preco_pago=Decimal("10.00"), data_compra=datetime(2025, 5, 10).date())
+        ItemComprado.objects.create(usuario=self.user, produto=self.produto, loja=self.loja_b, preco_pago=Decimal("5.50"), data_compra=datetime(2025, 5, 20).date())
+        ItemComprado.objects.create(usuario=self.user, produto=self.produto, loja=self.loja_a, preco_pago=Decimal("20.00"), data_compra=datetime(2025, 6, 1).date())
+
+    ## @brief Testa que as páginas seguem o cursor sem repetir nem pular itens.
+    def test_paginacao_por_cursor(self):
+        ItemComprado.objects.bulk_create(
+            ItemComprado(usuario=self.user, produto=self.produto, loja=self.loja_a, preco_pago=Decimal("1.00"), data_compra=datetime(2025, 4, 1).date())
+            for _ in range(60)
+        )
+        primeira = self.client.get(reverse("core:historico"))
+        itens = primeira.context["itens_comprados"]
+        self.assertEqual(len(itens), 50)
+        self.assertEqual(itens[0].data_compra, datetime(2025, 6, 1).date())
+        cursor = primeira.context["proximo_cursor"]
+        self.assertIsNotNone(cursor)
+
+        segunda = self.client.get(reverse("core:historico"), {"cursor": cursor})
+        self.assertEqual(len(segunda.context["itens_comprados"]), 13)
+        self.assertIsNone(segunda.context["proximo_cursor"])
+        ids = {i.id for i in itens} | {i.id for i in segunda.context["itens_comprados"]}
+        self.assertEqual(len(ids), 63)
+
+    ## @brief Testa que um cursor inválido volta para a primeira página.
+    def test_cursor_invalido(self):
+        response = self.client.get(reverse("core:historico"), {"cursor": "lixo"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["itens_comprados"]), 3)
+
+    ## @brief Testa os totais do resumo de gastos calculados pelo banco.
+    def test_resumo_api(self):
+        dados = self.client.get(reverse("core:historico_resumo")).json()
+        self.assertEqual(dados["total_geral"], 35.5)
+        self.assertEqual(
+            [(m["mes"], m["total"], m["itens"]) for m in dados["mensal"]],
+            [("2025-06", 20.0, 1), ("2025-05", 15.5, 2)],
+        )
+        self.assertEqual(dados["por_loja"][0]["loja"], "Loja A")
+        self.assertEqual(dados["por_loja"][0]["total"], 30.0)
+
+    ## @brief Testa que o resumo fica em cache e é invalidado ao finalizar uma compra.
+    def test_resumo_invalidado_na_compra(self):
+        self.client.get(reverse("core:historico_resumo"))
+        with self.assertNumQueries(2):  # Sessão e usuário; o resumo vem do cache
+            self.client.get(reverse("core:historico_resumo"))
+
+        session = self.client.session
+        session["cart"] = {str(self.produto.id): {"quantity": 1}}
+        session.save()
+        self.client.post(reverse("core:finalizar_compra"))
+
+        dados = self.client.get(reverse("core:historico_resumo")).json()
+        self.assertEqual(sum(m["itens"] for m in dados["mensal"]), 4)
+
+
+## @brief Testes para os comentários paginados e a nota média mantida no produto.
+class ComentariosProdutoTest(TestCase):
+    ## @brief Cria um produto e um usuário logado.
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = Usuario.objects.create_user(username="avaliador", password="senha")
+        self.client.login(username="avaliador", password="senha")
+        self.produto = Produto.objects.create(nome="Feijão", aprovado=True)
+
+    ## @brief Testa que criar e excluir comentários atualiza a média e a contagem do produto.
+    def test_nota_media_incremental(self):
+        url = reverse("core:comentar_produto", args=[self.produto.id])
+        self.client.post(url, {"texto": "Bom", "nota": 4})
+        self.client.post(url, {"texto": "Ótimo", "nota": 5})
+        self.client.post(url, {"texto": "Sem nota"})
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.total_avaliacoes, 2)
+        self.assertEqual(self.produto.soma_notas, 9)
+        self.assertAlmostEqual(self.produto.nota_media, 4.5)
+
+        for comentario in Comentario.objects.filter(nota__isnull=False):
+            self.client.get(reverse("core:excluir_comentario", args=[comentario.id]))
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.total_avaliacoes, 0)
+        self.assertIsNone(self.produto.nota_media)
+
+    ## @brief Testa que uma avaliação invalida o JSON e o ETag da API do produto.
+    def test_avaliacao_atualiza_api_produto(self):
+        url = reverse("core:get_product_data_api", args=[self.produto.id])
+        antes = self.client.get(url)
+        self.client.post(
+            reverse("core:comentar_produto", args=[self.produto.id]), {"texto": "Bom", "nota": 4}
+        )
+        depois = self.client.get(url, HTTP_IF_NONE_MATCH=antes["ETag"])
+        self.assertEqual(depois.status_code, 200)
+        self.assertNotEqual(depois["ETag"], antes["ETag"])
+        self.assertNotEqual(
+            depois.json()["product"]["atualizado_em"], antes.json()["product"]["atualizado_em"]
+        )
+
+    ## @brief Testa a paginação por cursor com número de consultas independente do tamanho da página.
+    def test_comentarios_paginados_sem_n_mais_um(self):
+        Comentario.objects.bulk_create(
+            Comentario(usuario=self.user, produto=self.produto, texto=f"Comentário {i}")
+            for i in range(25)
+        )
+        url = reverse("core:produto", args=[self.produto.id])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(len(response.context["comentarios"]), 20)
+        # Apenas a autenticação e a consulta dos comentários (com JOIN) tocam a tabela de usuários
+        self.assertEqual(sum("core_usuario" in q["sql"] for q in ctx.captured_queries), 2)
+
+        segunda = self.client.get(url, {"cursor": response.context["proximo_cursor"]})
+        self.assertEqual(len(segunda.context["comentarios"]), 5)
+        self.assertIsNone(segunda.context["proximo_cursor"])
+
+    ## @brief Testa a ordenação e o filtro do catálogo pela nota média.
+    def test_catalogo_ordenado_por_nota(self):
+        outro = Produto.objects.create(nome="Arroz", aprovado=True)
+        Produto.objects.filter(id=self.produto.id).update(nota_media=3.0, total_avaliacoes=1, soma_notas=3)
+        Produto.objects.filter(id=outro.id).update(nota_media=5.0, total_avaliacoes=1, soma_notas=5)
+        Produto.objects.create(nome="Açúcar", aprovado=True)
+
+        dados = self.client.get(reverse("core:product_catalog"), {"ordenar": "avaliacao"}).json()
+        self.assertEqual([p["nome"] for p in dados["products"]], ["Arroz", "Feijão", "Açúcar"])
+
+        dados = self.client.get(reverse("core:product_catalog"), {"nota_min": "4"}).json()
+        self.assertEqual([p["nome"] for p in dados["products"]], ["Arroz"])
+
+
+## @brief Testes das requisições condicionais (ETag/Last-Modified) das APIs JSON.
+class RequisicoesCondicionaisTest(TestCase):
+    ## @brief Cria um produto com oferta e esvazia o cache das versões.
+    def setUp(self):
+        cache.clear()
+        gravar_visualizacoes()  # Nenhum contador pendente pode vencer durante as medições
+        self.client = Client()
+        self.produto = Produto.objects.create(nome="Sabonete", aprovado=True)
+        self.loja = Loja.objects.create(nome="Loja Teste")
+        self.oferta = Oferta.objects.create(produto=self.produto, loja=self.loja, preco=Decimal("10.00"))
+        self.url_produto = reverse("core:get_product_data_api", args=[self.produto.id])
+
+    ## @brief Testa o 304 da API de produto com If-None-Match, sem consultar o banco.
+    def test_produto_if_none_match(self):
+        response = self.client.get(self.url_produto)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url_produto, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    ## @brief Testa que alterar uma oferta muda o ETag da API de produto.
+    def test_produto_etag_muda_com_oferta(self):
+        etag = self.client.get(self.url_produto)["ETag"]
+        self.oferta.preco = Decimal("8.00")
+        self.oferta.save()
+        response = self.client.get(self.url_produto, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["product"]["ofertas"][0]["preco"], 8.0)
+        self.assertNotEqual(response["ETag"], etag)
+
+    ## @brief Testa o 304 da API de produto com If-Modified-Since.
+    def test_produto_if_modified_since(self):
+        response = self.client.get(self.url_produto)
+        response = self.client.get(self.url_produto, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    ## @brief Testa que o ETag do catálogo depende da busca e da versão do catálogo.
+    def test_catalogo_etag(self):
+        url = reverse("core:product_catalog")
+        etag = self.client.get(url)["ETag"]
+        self.assertNotEqual(self.client.get(url, {"q": "sab"})["ETag"], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Produto.objects.create(nome="Shampoo", aprovado=True)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["products"]), 2)
+
+    ## @brief Testa que o ETag do carrinho muda quando o carrinho muda.
+    def test_carrinho_etag(self):
+        url = reverse("core:get_cart")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        session = self.client.session
+        session["cart"] = {str(self.produto.id): {"quantity": 2}}
+        session.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+
+
+## @brief Testes dos contadores de visualizações e cliques gravados em lote.
+class ContadoresVisualizacaoTest(TestCase):
+    ## @brief Cria dois produtos e descarta os contadores pendentes de outros testes.
+    def setUp(self):
+        cache.clear()
+        gravar_visualizacoes()
+        self.client = Client()
+        self.produto = Produto.objects.create(nome="Sabonete", aprovado=True)
+        self.outro = Produto.objects.create(nome="Arroz", aprovado=True)
+
+    ## @brief Testa que as visualizações só chegam ao banco na gravação em lote.
+    def test_gravacao_em_lote(self):
+        pagina = reverse("core:produto", args=[self.produto.id])
+        self.client.get(pagina)
+        for _ in range(2):
+            self.client.get(pagina, {"origem": "catalogo"})
+        self.client.get(reverse("core:produto", args=[self.outro.id]), {"origem": "catalogo"})
+        # A busca de dados da própria página não conta como clique
+        self.client.get(reverse("core:get_product_data_api", args=[self.produto.id]))
+
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.visualizacoes, 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(gravar_visualizacoes(), 7)
+        # Um UPDATE de produtos por (contador, incremento), dentro de uma transação
+        self.assertEqual(
+            sum(q["sql"].startswith('UPDATE "core_produto"') for q in ctx.captured_queries), 4
+        )
+        self.produto.refresh_from_db()
+        self.outro.refresh_from_db()
+        self.assertEqual((self.produto.visualizacoes, self.produto.cliques), (3, 2))
+        self.assertEqual((self.outro.visualizacoes, self.outro.cliques), (1, 1))
+        self.assertEqual(gravar_visualizacoes(), 0)
+
+    ## @brief Testa a gravação automática quando o intervalo vence.
+    @override_settings(VISUALIZACOES_INTERVALO=0)
+    def test_intervalo_vencido(self):
+        self.client.get(reverse("core:produto", args=[self.produto.id]))
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.visualizacoes, 1)
+
+    ## @brief Testa a ordenação do catálogo por popularidade.
+    def test_catalogo_por_popularidade(self):
+        self.client.get(
+            reverse("core:produto", args=[self.produto.id]), {"origem": "catalogo"}
+        )
+        gravar_visualizacoes()
+        response = self.client.get(reverse("core:product_catalog"), {"ordenar": "popularidade"})
+        nomes = [p["nome"] for p in response.json()["products"]]
+        self.assertEqual(nomes, ["Sabonete", "Arroz"])
+        self.assertEqual(response.json()["products"][0]["cliques"], 1)
+
+    ## @brief Testa que a gravação dos contadores invalida o ETag do catálogo.
+    def test_etag_catalogo_apos_gravacao(self):
+        url = reverse("core:product_catalog")
+        parametros = {"ordenar": "popularidade"}
+        for _ in range(5):
+            registrar_visualizacao(self.produto.id)
+        gravar_visualizacoes()
+        response = self.client.get(url, parametros)
+        etag = response["ETag"]
+        self.assertEqual(response.json()["products"][0]["visualizacoes"], 5)
+        self.assertEqual(
+            self.client.get(url, parametros, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        for _ in range(5):
+            registrar_visualizacao(self.produto.id)
+        gravar_visualizacoes()
+        response = self.client.get(url, parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["products"][0]["visualizacoes"], 10)
+
+        # Sem contadores na resposta nem na ordenação, o ETag não muda com a gravação
+        parametros = {"fields": "id,nome"}
+        etag = self.client.get(url, parametros)["ETag"]
+        registrar_visualizacao(self.produto.id)
+        gravar_visualizacoes()
+        self.assertEqual(
+            self.client.get(url, parametros, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
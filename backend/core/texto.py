@@ -0,0 +1,29 @@
+## @file core/texto.py
+#
+# @brief Normalização de textos para buscas insensíveis a acentos e maiúsculas.
+#
+# `normalizar_nome` produz o conteúdo das colunas `nome_normalizado` de `Produto`,
+# `Marca` e `Categoria`, mantidas pelos modelos a cada `save()` e pelas operações em lote
+# dos seus QuerySets. As buscas normalizam o termo da mesma forma e comparam com essas
+# colunas, que são indexadas para buscas por igualdade e por prefixo.
+
+import unicodedata
+
+
+## @brief Normaliza um texto: minúsculas e sem acentos.
+#
+# @param texto O texto original (pode ser None).
+# @return O texto normalizado.
+def normalizar(texto):
+    decomposto = unicodedata.normalize("NFKD", (texto or "").lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+## @brief Normaliza um nome para as colunas `nome_normalizado`: minúsculas, sem acentos
+#         e com os espaços repetidos reduzidos a um.
+#
+# @param texto O nome original (pode ser None).
+# @return O nome normalizado (ex: "  Açúcar   Refinado" -> "acucar refinado").
+def normalizar_nome(texto):
+    return " ".join(normalizar(texto).split())
+
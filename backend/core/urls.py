@@ -24,6 +24,11 @@ urlpatterns = [
     path("catalogo/", views.product_catalog_page_view, name="product_catalog_page"),
     path("api/products/", views.product_catalog_view, name="product_catalog"),
     path("api/produto-dados/<int:product_id>/", views.get_product_data_api, name="get_product_data_api"),
+    path("api/produto-dados/<int:product_id>/relacionados/", views.produtos_relacionados_api, name="produtos_relacionados"),
+    path("api/produto-dados/<int:product_id>/similares/", views.produtos_similares_api, name="produtos_similares"),
+    path("api/cache/estatisticas/", views.cache_estatisticas_api, name="cache_estatisticas"),
+    path("api/rankings/", views.rankings_api, name="rankings"),
+    path("api/suggest/", views.sugestoes_api, name="sugestoes"),
 
     # --- APIs do Carrinho ---
     path("api/cart/add/", views.add_to_cart_view, name="add_to_cart"),
@@ -35,6 +40,7 @@ urlpatterns = [
     path("conta/perfil/", views.perfil_view, name="perfil"),
     path("conta/lista-compras/", views.lista_de_compras_view, name="lista_de_compras"),
     path("conta/historico-compras/", views.historico_view, name="historico"),
+    path("api/historico/resumo/", views.historico_resumo_api, name="historico_resumo"),
     path("checkout/", views.checkout_view, name="checkout"),
     path("listas/", views.manage_shopping_lists_view, name="manage_shopping_lists"),
     path("lista/<int:item_id>/remover_item/", views.deletar_item_lista, name="deletar_item_lista"),
@@ -49,5 +55,6 @@ urlpatterns = [
     path("manage/categories/", views.manage_categories_view, name="manage_categories"),
     path("manage/brands/", views.manage_brands_view, name="manage_brands"),
     path("manage/approve-products/", views.aprovar_produto_view, name="ver_aprovar_produtos"),
+    path("manage/duplicates/", views.relatorio_duplicados_view, name="relatorio_duplicados"),
     path("manage/product-requests/", views.solicitar_produto_view, name="ver_solicitacao_produtos"),
 ]
@@ -9,59 +9,307 @@
 # @see core.models
 # @see core.forms
 
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
 from .models import Produto, Oferta
-from django.db.models import Q, Min
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.db.models import Q, F, Min, Sum, Count, Case, When, FloatField
+from django.db.models.functions import Cast, TruncMonth
 from django.urls import reverse
+from django.utils import timezone
 from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404
 from django.contrib import messages
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.template.loader import render_to_string
 from .models import Loja
 from .forms import LojaForm
-from .models import Produto, ListaCompra, ItemLista
+from .models import Produto, ListaCompra, ItemLista, Categoria, ItemComprado
+from .models import VisualizacaoHora
+from . import busca_aproximada
+from . import cache as cache_versionado
+from .texto import normalizar_nome
+
+
+## @brief Campos aceitos por `?fields=` na API de detalhes do produto, na ordem da resposta,
+#         com as colunas de `Produto` que cada um lê.
+#
+# "menor_preco", "ofertas" e "atualizado_em" também leem as ofertas do produto.
+CAMPOS_PRODUTO = {
+    "id": [],
+    "nome": ["nome"],
+    "imagem_url": ["imagem_url"],
+    "descricao": ["descricao"],
+    "categoria": ["categoria", "categoria__nome"],
+    "marca": ["marca", "marca__nome"],
+    "ean": ["ean"],
+    "menor_preco": [],
+    "ofertas": [],
+    "atualizado_em": ["atualizado_em"],
+}
 
 
 ## @brief Busca informações detalhadas de um produto por ID, incluindo todas as suas ofertas.
 #
+# Com `campos`, só as colunas e relações usadas por esses campos são lidas do banco
+# (`only()`), e as ofertas só são carregadas se algum campo depender delas.
+#
 # @param product_id O ID do produto a ser buscado.
+# @param campos Conjunto de chaves de `CAMPOS_PRODUTO` a retornar (None para todas).
 # @return Um dicionário contendo os detalhes do produto, seu menor preço e uma lista de ofertas,
 #         ou None se o produto não for encontrado.
-def get_product_info(product_id):
+def get_product_info(product_id, campos=None):
+    campos = CAMPOS_PRODUTO.keys() if campos is None else campos
+    colunas = ["id"] + [coluna for campo in campos for coluna in CAMPOS_PRODUTO[campo]]
+    produtos = Produto.objects.select_related(
+        *(campo for campo in ("categoria", "marca") if campo in campos)
+    ).only(*colunas)
+    # Usar prefetch_related para ofertas é mais eficiente quando há muitos resultados
+    if "ofertas" in campos:
+        produtos = produtos.prefetch_related("ofertas__loja")
+    elif {"menor_preco", "atualizado_em"} & set(campos):
+        produtos = produtos.prefetch_related("ofertas")
     try:
-        # Usar prefetch_related para ofertas é mais eficiente quando há muitos resultados
-        produto = (
-            Produto.objects.select_related("categoria", "marca")
-            .prefetch_related("ofertas__loja")
-            .get(id=product_id)
-        )
+        produto = produtos.get(id=product_id)
     except Produto.DoesNotExist:
         return None
 
-    # Graças ao prefetch_related, esta consulta não fará um novo hit no banco
-    ofertas = sorted(produto.ofertas.all(), key=lambda o: o.preco)
-
-    ofertas_data = []
-    for oferta in ofertas:
-        ofertas_data.append(
+    # Ordenadas uma única vez, e só se algum campo pedido depende delas; graças ao
+    # prefetch_related, esta leitura não fará um novo hit no banco
+    ofertas = []
+    if {"menor_preco", "ofertas", "atualizado_em"} & set(campos):
+        ofertas = sorted(produto.ofertas.all(), key=lambda o: o.preco)
+
+    # Cada campo é calculado só se for pedido: colunas não lidas não são acessadas
+    valores = {
+        "id": lambda: produto.id,
+        "nome": lambda: produto.nome,
+        "imagem_url": lambda: produto.imagem_url,
+        "descricao": lambda: produto.descricao,
+        "categoria": lambda: produto.categoria.nome if produto.categoria else None,
+        "marca": lambda: produto.marca.nome if produto.marca else None,
+        "ean": lambda: produto.ean,
+        # Converte Decimal para float
+        "menor_preco": lambda: float(ofertas[0].preco) if ofertas else None,
+        "ofertas": lambda: [
             {
                 "loja": oferta.loja.nome,
                 "preco": float(f"{oferta.preco:.2f}"),
                 "data_captura": oferta.data_captura.isoformat(),
             }
-        )
-
-    produto_info = {
-        "id": produto.id,
-        "nome": produto.nome,
-        "imagem_url": produto.imagem_url,
-        "descricao": produto.descricao,
-        "categoria": produto.categoria.nome if produto.categoria else None,
-        "marca": produto.marca.nome if produto.marca else None,
-        "menor_preco": (
-            float(ofertas[0].preco) if ofertas else None
-        ),  # Converte Decimal para float
-        "ofertas": ofertas_data,
+            for oferta in ofertas
+        ],
+        "atualizado_em": lambda: max(
+            [produto.atualizado_em] + [oferta.atualizado_em for oferta in ofertas]
+        ).isoformat(),
     }
-    return produto_info
+    return {campo: valor() for campo, valor in valores.items() if campo in campos}
+
+
+## @brief Tamanho padrão do LRU local de respostas JSON de produtos (ver `PRODUTO_JSON_LRU_TAMANHO`).
+PRODUTO_JSON_LRU_TAMANHO = 1024
+
+## @brief Respostas JSON de produtos já serializadas, locais ao processo: id -> (versões, bytes).
+_produtos_json = cache_versionado.CacheLRU(
+    getattr(settings, "PRODUTO_JSON_LRU_TAMANHO", PRODUTO_JSON_LRU_TAMANHO)
+)
+
+## @brief Contadores de acertos e falhas do cache de `obter_produto_json` neste processo.
+#
+# Chaves: "hit_local" (LRU do processo), "hit_compartilhado" (Redis/locmem) e "miss".
+estatisticas_produto_json = Counter()
+
+
+## @brief Retorna o corpo JSON (em bytes) da API de detalhes de um produto, a partir do cache.
+#
+# O corpo `{"product": get_product_info(...)}` é serializado uma única vez e guardado no
+# cache compartilhado e no LRU local. As entradas são validadas por duas versões: a do
+# produto (invalidada quando ele ou suas ofertas mudam) e a geral (invalidada quando
+# lojas, categorias ou marcas mudam), ver `core.signals`.
+#
+# Respostas com só alguns campos (`?fields=`) são guardadas à parte, com as mesmas
+# versões.
+#
+# @param product_id O ID do produto.
+# @param campos Conjunto de chaves de `CAMPOS_PRODUTO` a retornar (None para todas).
+# @return Os bytes do corpo JSON, ou None se o produto não existir.
+def obter_produto_json(product_id, campos=None):
+    versoes = cache_versionado.obter_versoes(
+        "produto_json", f"produto_json:{product_id}"
+    )
+    sufixo = ":" + ",".join(sorted(campos)) if campos is not None else ""
+    chave_local = product_id if campos is None else (product_id, sufixo)
+    local = _produtos_json.get(chave_local)
+    if local is not None and local[0] == versoes:
+        estatisticas_produto_json["hit_local"] += 1
+        return local[1]
+
+    recalculado = []
+
+    def serializar():
+        recalculado.append(True)
+        produto_info = get_product_info(product_id, campos)
+        if produto_info is None:
+            return None
+        return json.dumps({"product": produto_info}, cls=DjangoJSONEncoder).encode()
+
+    # Após uma invalidação, só um worker serializa o produto; os demais esperam por ele
+    chave = f"core:produto_json:{product_id}:v{versoes[0]}.{versoes[1]}{sufixo}"
+    corpo = cache_versionado.obter_coalescido(
+        chave, serializar, cache_versionado.TIMEOUT_VALORES
+    )
+    estatisticas_produto_json["miss" if recalculado else "hit_compartilhado"] += 1
+    if corpo is None:
+        return None
+
+    _produtos_json.set(chave_local, (versoes, corpo))
+    return corpo
+
+
+## @brief Invalida a resposta JSON em cache de um produto.
+#
+# @param product_id O ID do produto.
+def invalidar_produto_json(product_id):
+    cache_versionado.invalidar(f"produto_json:{product_id}")
+
+
+## @brief Calcula os validadores HTTP da API de detalhes de um produto sem consultar o banco.
+#
+# Usa as mesmas versões que validam a resposta em cache (`obter_produto_json`).
+#
+# @param product_id O ID do produto.
+# @return Tupla (etag, last_modified).
+def validadores_produto(product_id):
+    versoes = cache_versionado.obter_versoes(
+        "produto_json", f"produto_json:{product_id}"
+    )
+    return (
+        f"p{versoes[0]}.{versoes[1]}",
+        cache_versionado.versao_para_datetime(max(versoes)),
+    )
+
+
+## @brief Sufixo do ETag de uma resposta com só alguns campos (`?fields=`).
+#
+# Um hash do conjunto validado e ordenado, para que a ordem dos campos não mude o ETag e
+# que o cabeçalho só tenha caracteres válidos.
+#
+# @param campos Conjunto de campos validados (None para a resposta completa).
+# @return O sufixo, vazio para a resposta completa.
+def sufixo_etag_campos(campos):
+    if campos is None:
+        return ""
+    return "-" + hashlib.md5(",".join(sorted(campos)).encode()).hexdigest()[:8]
+
+
+## @brief Nome da versão incrementada a cada gravação dos contadores de visualização.
+VERSAO_CONTADORES = "contadores"
+
+
+## @brief Retorna as versões de que depende um resultado do catálogo.
+#
+# A versão "catalogo" muda a cada alteração de produtos, ofertas, lojas, categorias ou
+# marcas (ver `core.signals`). Os contadores de visualizações e cliques são gravados com
+# `update()`, sem sinais, e têm a versão própria `VERSAO_CONTADORES`, usada só quando o
+# resultado os exibe ou é ordenado por eles.
+#
+# @param ordenar O parâmetro `ordenar` da busca.
+# @param campos Conjunto de campos retornados (None para todos).
+# @return Tupla com as versões.
+def versoes_catalogo(ordenar=None, campos=None):
+    if (
+        ordenar == "popularidade"
+        or campos is None
+        or not set(campos).isdisjoint(CONTADORES_VISUALIZACAO)
+    ):
+        return cache_versionado.obter_versoes("catalogo", VERSAO_CONTADORES)
+    return cache_versionado.obter_versoes("catalogo")
+
+
+## @brief Calcula os validadores HTTP da API do catálogo sem consultar o banco.
+#
+# Usa as versões de `versoes_catalogo`; o ETag também inclui os parâmetros da busca.
+#
+# @param request O objeto HttpRequest do Django.
+# @return Tupla (etag, last_modified).
+def validadores_catalogo(request):
+    campos = request.GET.get("fields")
+    versoes = versoes_catalogo(
+        request.GET.get("ordenar"),
+        None if campos is None else {campo.strip() for campo in campos.split(",")},
+    )
+    parametros = hashlib.md5(request.GET.urlencode().encode()).hexdigest()[:16]
+    return (
+        f"c{'.'.join(map(str, versoes))}-{parametros}",
+        cache_versionado.versao_para_datetime(max(versoes)),
+    )
+
+
+## @brief Calcula o ETag da API do carrinho a partir do conteúdo da sessão e da versão do catálogo.
+#
+# @param request O objeto HttpRequest do Django.
+# @return O ETag do carrinho atual.
+def etag_carrinho(request):
+    versao = cache_versionado.obter_versao("catalogo")
+    carrinho = json.dumps(request.session.get("cart", {}), sort_keys=True)
+    return f"k{versao}-{hashlib.md5(carrinho.encode()).hexdigest()[:16]}"
+
+
+## @brief Retorna a lista de categorias ordenada por nome, a partir do cache versionado.
+#
+# Compartilhada pelo processador de contexto `categorias_disponiveis` e pela `home_view`.
+# A versão é incrementada pelos sinais de `Categoria` em `core.signals`.
+#
+# @return Uma lista de objetos Categoria.
+def obter_categorias():
+    return cache_versionado.obter_versionado(
+        "categorias", lambda: list(Categoria.objects.order_by("nome"))
+    )
+
+
+## @brief Encontra uma categoria pelo nome, sem diferenciar maiúsculas nem acentos.
+#
+# Usa a lista de categorias em cache (`obter_categorias`), sem consultar o banco.
+#
+# @param nome O nome da categoria.
+# @return O objeto Categoria, ou None se não houver categoria com esse nome.
+def encontrar_categoria(nome):
+    nome = normalizar_nome(nome)
+    return next(
+        (categoria for categoria in obter_categorias() if categoria.nome_normalizado == nome),
+        None,
+    )
+
+
+## @brief Conta os produtos aprovados de cada categoria, incluindo os das descendentes.
+#
+# Uma consulta conta os produtos diretos de cada categoria; as contagens são somadas
+# às categorias ancestrais pelo caminho materializado. O resultado fica em cache até a
+# próxima alteração de categorias ou produtos (versão "contagem_categorias").
+#
+# @return Dicionário ID da categoria -> quantidade de produtos na subárvore.
+def contar_produtos_por_categoria():
+    return cache_versionado.obter_versionado(
+        "contagem_categorias", _contar_produtos_por_categoria
+    )
+
+
+def _contar_produtos_por_categoria():
+    contagens = Counter()
+    for caminho, total in Categoria.objects.annotate(
+        total=Count("produto", filter=Q(produto__aprovado=True))
+    ).values_list("caminho", "total"):
+        for pk in caminho.split("/")[:-1]:
+            contagens[int(pk)] += total
+    return dict(contagens)
 
 
 ## @brief Transfere o conteúdo do carrinho da sessão para o carrinho permanente do usuário no banco de dados.
@@ -108,89 +356,388 @@ def merge_session_cart_to_db(request):
         del request.session["cart"]
 
 
+## @brief Quantidade padrão de itens serializados por parte em `json_em_partes`.
+TAMANHO_PARTE_JSON = 500
+
+
+## @brief Ordenações aceitas pelo parâmetro `ordenar` de `search_products`.
+#
+# "popularidade" usa os contadores gravados por `gravar_visualizacoes`, que ficam até
+# um intervalo de gravação atrás das visualizações reais.
+ORDENACOES_CATALOGO = {
+    "avaliacao": [F("nota_media").desc(nulls_last=True), "nome"],
+    "popularidade": [(F("visualizacoes") + F("cliques")).desc(), "nome"],
+}
+
+
 ## @brief Busca produtos com base em um termo de consulta e anota o menor preço para cada um.
 #
-# A busca é realizada nos campos de nome, descrição, nome da categoria e nome da marca.
+# A busca é realizada nos campos de nome, descrição, nome da categoria e nome da marca,
+# sem diferenciar acentos nem maiúsculas nos nomes (colunas `nome_normalizado`). Quando
+# o termo encontra menos de `MIN_RESULTADOS_EXATOS` produtos, os resultados são
+# completados com os produtos de nome aproximado (erros de digitação, ver
+# `core.busca_aproximada`), do mais próximo ao menos, depois dos exatos.
 #
 # @param query O termo de busca (string). Se vazio, retorna todos os produtos.
+# @param ordenar "avaliacao" para ordenar pela nota média ou "popularidade" para ordenar pelas
+#        visualizações e cliques (maiores primeiro); por padrão, pelo nome.
+# @param nota_min Nota média mínima dos produtos retornados (opcional).
+# @param categoria Caminho de uma categoria (`Categoria.caminho`): restringe a busca aos
+#        produtos dela e das descendentes (opcional).
+# @param campos Conjunto de chaves de `CAMPOS_BUSCA` a retornar (None para todas); só as
+#        colunas desses campos são lidas do banco.
 # @return Uma lista de dicionários, onde cada dicionário representa um produto
 #         com suas informações básicas e o menor preço encontrado em suas ofertas.
-def search_products(query=""):
+def search_products(query="", ordenar=None, nota_min=None, categoria=None, campos=None):
+    return list(
+        iterar_produtos(
+            query=query, ordenar=ordenar, nota_min=nota_min, categoria=categoria, campos=campos
+        )
+    )
+
+
+## @brief Versão de `search_products` que produz os resultados um a um.
+#
+# Com `chunk_size`, os produtos são lidos do banco em blocos (`QuerySet.iterator`), sem
+# carregar o resultado inteiro na memória; é a base do modo de streaming da API do
+# catálogo (ver `json_em_partes`).
+#
+# @param query O termo de busca (string).
+# @param ordenar Repassado como em `search_products`.
+# @param nota_min Repassado como em `search_products`.
+# @param categoria Repassado como em `search_products`.
+# @param campos Repassado como em `search_products`.
+# @param chunk_size Quantidade de produtos lidos por bloco (None lê todos de uma vez).
+# @return Um gerador dos mesmos dicionários de `search_products`, na mesma ordem.
+def iterar_produtos(
+    query="", ordenar=None, nota_min=None, categoria=None, campos=None, chunk_size=None
+):
+    campos = CAMPOS_BUSCA.keys() if campos is None else campos
+
     # Começa com todos os produtos
     produtos = Produto.objects.all()
 
-    # Se houver um termo de busca, aplica o filtro
-    if query:
+    # A nota média fica no próprio produto, sem agregar a tabela de comentários
+    if nota_min is not None:
+        produtos = produtos.filter(nota_media__gte=nota_min)
+
+    # A categoria inclui todas as descendentes: um prefixo do caminho materializado
+    if categoria:
+        produtos = produtos.filter(Categoria.filtro_subarvore(categoria, "categoria__caminho"))
+
+    # `base` guarda os filtros de nota e categoria, também aplicados à busca aproximada
+    base = produtos
+
+    # Se houver um termo de busca, aplica o filtro. Nomes são comparados pelas colunas
+    # normalizadas, então "acucar" encontra "Açúcar"
+    termo = normalizar_nome(query)
+    if termo:
         produtos = produtos.filter(
-            Q(nome__icontains=query)
+            Q(nome_normalizado__contains=termo)
             | Q(descricao__icontains=query)
-            | Q(categoria__nome__icontains=query)
-            | Q(marca__nome__icontains=query)
+            | Q(categoria__nome_normalizado__contains=termo)
+            | Q(marca__nome_normalizado__contains=termo)
         ).distinct()
 
-    # Anota o menor preço e otimiza a consulta DEPOIS de filtrar
-    # CORREÇÃO APLICADA AQUI: 'ofertas__preco' (plural)
-    produtos_anotados = (
-        produtos.annotate(menor_preco=Min("ofertas__preco"))
-        .select_related("categoria", "marca")
-        .order_by("nome")
+    # Anota o menor preço e projeta só as colunas da resposta DEPOIS de filtrar
+    consulta = _projetar_busca(produtos, campos).order_by(*ORDENACOES_CATALOGO.get(ordenar, ["nome"]))
+    if chunk_size:
+        consulta = consulta.iterator(chunk_size=chunk_size)
+
+    # Os IDs só importam para excluir os exatos da busca aproximada
+    encontrados = []
+    for linha in consulta:
+        if len(encontrados) < MIN_RESULTADOS_EXATOS:
+            encontrados.append(linha["id"])
+        yield _produto_busca(linha, campos)
+
+    # Poucos resultados exatos: completa com os nomes aproximados, na ordem de proximidade
+    if termo and len(encontrados) < MIN_RESULTADOS_EXATOS:
+        ids = busca_aproximada.buscar_aproximado(
+            termo, produtos=base.exclude(id__in=encontrados)
+        )
+        if ids:
+            posicao = {produto_id: i for i, produto_id in enumerate(ids)}
+            aproximados = _projetar_busca(base.filter(id__in=ids), campos)
+            for linha in sorted(aproximados, key=lambda linha: posicao[linha["id"]]):
+                yield _produto_busca(linha, campos)
+
+
+## @brief Quantidade de resultados exatos abaixo da qual `search_products` completa a
+#         lista com a busca aproximada.
+MIN_RESULTADOS_EXATOS = 3
+
+
+## @brief Campos aceitos por `?fields=` na API do catálogo, na ordem da resposta, com a
+#         coluna projetada por `_projetar_busca` para cada um.
+#
+# As colunas com expressão vêm de outras tabelas; "menor_preco" é anotado antes da
+# projeção.
+CAMPOS_BUSCA = {
+    "id": ("id", None),
+    "nome": ("nome", None),
+    "imagem_url": ("imagem_url", None),
+    "descricao": ("descricao", None),
+    "categoria": ("categoria_nome", F("categoria__nome")),
+    "marca": ("marca_nome", F("marca__nome")),
+    "menor_preco": ("menor_preco", None),
+    "nota_media": ("nota_media", None),
+    "total_avaliacoes": ("total_avaliacoes", None),
+    "visualizacoes": ("visualizacoes", None),
+    "cliques": ("cliques", None),
+}
+
+
+## @brief Projeta as colunas dos campos pedidos, para `_produto_busca`.
+#
+# O ID é sempre lido: a busca aproximada o usa para não repetir os resultados exatos.
+#
+# @param produtos Um QuerySet de produtos já filtrado.
+# @param campos Conjunto de chaves de `CAMPOS_BUSCA`.
+# @return Um QuerySet de dicionários (`values()`), com as categorias e marcas na mesma
+#         consulta.
+def _projetar_busca(produtos, campos):
+    if "menor_preco" in campos:
+        produtos = produtos.annotate(menor_preco=Min("ofertas__preco"))
+    colunas = ["id"]
+    expressoes = {}
+    for campo in campos:
+        coluna, expressao = CAMPOS_BUSCA[campo]
+        if expressao is not None:
+            expressoes[coluna] = expressao
+        elif coluna != "id":
+            colunas.append(coluna)
+    return produtos.values(*colunas, **expressoes)
+
+
+## @brief Monta o dicionário de um produto retornado por `search_products`.
+#
+# @param linha Uma linha de `_projetar_busca`.
+# @param campos Conjunto de chaves de `CAMPOS_BUSCA` projetadas na linha.
+# @return O dicionário com as informações básicas do produto.
+def _produto_busca(linha, campos):
+    produto = {
+        campo: linha[coluna] for campo, (coluna, _) in CAMPOS_BUSCA.items() if campo in campos
+    }
+    if produto.get("menor_preco") is not None:
+        produto["menor_preco"] = float(produto["menor_preco"])
+    return produto
+
+
+## @brief Serializa uma sequência longa como um objeto JSON, em partes.
+#
+# Produz o mesmo texto que `json.dumps({chave: list(itens)}, cls=DjangoJSONEncoder)`,
+# mas a lista nunca fica inteira na memória: os itens são serializados em grupos de
+# `tamanho`, cada grupo uma parte do texto. Usada com `StreamingHttpResponse`.
+#
+# @param chave A chave do objeto JSON que recebe a lista.
+# @param itens Iterável dos itens (por exemplo, `iterar_produtos` com `chunk_size`).
+# @param tamanho Quantidade de itens por parte.
+# @return Um gerador de strings.
+def json_em_partes(chave, itens, tamanho=TAMANHO_PARTE_JSON):
+    yield "{%s: [" % json.dumps(chave)
+    separador = ""
+    parte = []
+    for item in itens:
+        parte.append(json.dumps(item, cls=DjangoJSONEncoder))
+        if len(parte) >= tamanho:
+            yield separador + ", ".join(parte)
+            separador, parte = ", ", []
+    if parte:
+        yield separador + ", ".join(parte)
+    yield "]}"
+
+
+## @brief Tempo padrão (em segundos) em que um resultado de busca é servido do cache (ver `BUSCA_CACHE_TTL`).
+BUSCA_CACHE_TTL = 30
+
+
+## @brief Versão de `search_products` com cache de resultados e recálculo coalescido.
+#
+# A chave inclui as versões de `versoes_catalogo`, invalidadas pelos sinais dos modelos e
+# pela gravação dos contadores; o tempo de vida curto cobre as alterações que não passam
+# por elas. Quando um resultado
+# vence, só uma requisição refaz a busca e as demais recebem o resultado anterior.
+#
+# @param query O termo de busca (string).
+# @param ordenar Repassado para `search_products`.
+# @param nota_min Repassado para `search_products`.
+# @param categoria Repassado para `search_products`.
+# @param campos Repassado para `search_products`.
+# @return A mesma lista de dicionários de `search_products`.
+def buscar_produtos(query="", ordenar=None, nota_min=None, categoria=None, campos=None):
+    versao = ".".join(map(str, versoes_catalogo(ordenar, campos)))
+    parametros = json.dumps(
+        [query, ordenar, nota_min, categoria, sorted(campos) if campos is not None else None]
+    )
+    chave = f"core:busca:v{versao}:{hashlib.md5(parametros.encode()).hexdigest()}"
+    ttl = getattr(settings, "BUSCA_CACHE_TTL", BUSCA_CACHE_TTL)
+    return cache_versionado.obter_coalescido(
+        chave,
+        lambda: search_products(
+            query=query,
+            ordenar=ordenar,
+            nota_min=nota_min,
+            categoria=categoria,
+            campos=campos,
+        ),
+        ttl,
+        janela_obsoleta=ttl,
     )
 
-    # Monta a lista de resultados
-    results = []
-    for produto in produtos_anotados:
-        results.append(
-            {
-                "id": produto.id,
-                "nome": produto.nome,
-                "imagem_url": produto.imagem_url,
-                "descricao": produto.descricao,
-                "categoria": produto.categoria.nome if produto.categoria else None,
-                "marca": produto.marca.nome if produto.marca else None,
-                "menor_preco": (
-                    float(produto.menor_preco)
-                    if produto.menor_preco is not None
-                    else None
-                ),
-            }
+
+## @brief Intervalo padrão (em segundos) entre as gravações dos contadores de visualização.
+VISUALIZACOES_INTERVALO = 30
+
+## @brief Quantidade de produtos pendentes que força a gravação antes do intervalo.
+VISUALIZACOES_MAX_PENDENTES = 1000
+
+## @brief Campos de `Produto` que podem ser incrementados por `registrar_visualizacao`.
+CONTADORES_VISUALIZACAO = ("visualizacoes", "cliques")
+
+## @brief Incrementos ainda não gravados neste processo: (campo, produto_id) -> quantidade.
+_visualizacoes = Counter()
+_visualizacoes_lock = threading.Lock()
+_ultima_gravacao = time.monotonic()
+
+logger = logging.getLogger(__name__)
+
+
+## @brief Registra uma visualização de produto, sem escrever no banco a cada requisição.
+#
+# O incremento fica num contador do processo e é gravado por `gravar_visualizacoes`
+# quando o intervalo `VISUALIZACOES_INTERVALO` vence ou há produtos pendentes demais.
+# Assim, um produto muito acessado recebe um UPDATE por intervalo em cada worker, e não
+# um por requisição. Os incrementos ainda não gravados de um worker que termina são
+# perdidos, o que é aceitável para um sinal de popularidade.
+#
+# @param produto_id O ID do produto.
+# @param campo "visualizacoes" (página do produto) ou "cliques" (página do produto aberta
+#        pelos resultados do catálogo).
+def registrar_visualizacao(produto_id, campo="visualizacoes"):
+    intervalo = getattr(settings, "VISUALIZACOES_INTERVALO", VISUALIZACOES_INTERVALO)
+    with _visualizacoes_lock:
+        _visualizacoes[(campo, produto_id)] += 1
+        vencido = (
+            time.monotonic() - _ultima_gravacao >= intervalo
+            or len(_visualizacoes) >= VISUALIZACOES_MAX_PENDENTES
+        )
+    if vencido:
+        gravar_visualizacoes()
+
+
+## @brief Grava no banco os contadores de visualização acumulados neste processo.
+#
+# Os produtos com o mesmo incremento são atualizados por um único UPDATE com
+# `F()`, então um lote custa poucas consultas mesmo com muitos produtos. Se a gravação
+# falhar, os incrementos voltam para o contador e são tentados na próxima vez. O total
+# de cada produto também é somado à hora atual em `VisualizacaoHora`, de onde saem os
+# rankings de produtos em alta (ver `core.rankings`).
+#
+# @return A quantidade de incrementos gravados.
+def gravar_visualizacoes():
+    global _ultima_gravacao
+    with _visualizacoes_lock:
+        pendentes = dict(_visualizacoes)
+        _visualizacoes.clear()
+        _ultima_gravacao = time.monotonic()
+    if not pendentes:
+        return 0
+
+    lotes = defaultdict(list)
+    por_produto = Counter()
+    for (campo, produto_id), quantidade in pendentes.items():
+        lotes[(campo, quantidade)].append(produto_id)
+        por_produto[produto_id] += quantidade
+    try:
+        with transaction.atomic():
+            for (campo, quantidade), ids in lotes.items():
+                Produto.objects.filter(id__in=ids).update(
+                    **{campo: F(campo) + quantidade}
+                )
+            _gravar_visualizacoes_por_hora(por_produto)
+    except DatabaseError:
+        logger.exception("Falha ao gravar os contadores de visualização")
+        with _visualizacoes_lock:
+            _visualizacoes.update(pendentes)
+        return 0
+    # `update()` não dispara sinais: invalida os resultados do catálogo com os contadores
+    cache_versionado.invalidar(VERSAO_CONTADORES)
+    return sum(pendentes.values())
+
+
+## @brief Soma as visualizações de um lote às linhas da hora atual (`VisualizacaoHora`).
+#
+# As linhas que faltam são criadas com zero (ignorando as que outro worker criou ao
+# mesmo tempo) e depois incrementadas com `F()`, agrupadas pelo incremento.
+#
+# @param por_produto Counter produto_id -> visualizações e cliques do lote.
+def _gravar_visualizacoes_por_hora(por_produto):
+    existentes = set(
+        Produto.objects.filter(id__in=por_produto).values_list("id", flat=True)
+    )
+    hora = timezone.now().replace(minute=0, second=0, microsecond=0)
+    VisualizacaoHora.objects.bulk_create(
+        [VisualizacaoHora(produto_id=pk, hora=hora) for pk in existentes],
+        ignore_conflicts=True,
+    )
+    lotes = defaultdict(list)
+    for produto_id in existentes:
+        lotes[por_produto[produto_id]].append(produto_id)
+    for quantidade, ids in lotes.items():
+        VisualizacaoHora.objects.filter(hora=hora, produto_id__in=ids).update(
+            quantidade=F("quantidade") + quantidade
         )
-    return results
+
+
+## @brief Tempo máximo (em segundos) que o resumo de gastos de um usuário fica em cache.
+#
+# A invalidação normal acontece na finalização da compra; o prazo cobre alterações
+# feitas por outros caminhos, como o admin.
+RESUMO_GASTOS_TIMEOUT = 60 * 60
+
+## @brief Chave de cache do fragmento HTML com a lista completa de lojas.
+#
+# Invalidada pelos sinais de `Loja` em `core.signals`.
+LOJAS_HTML_CACHE_KEY = "core:lojas_html"
+
+## @brief Marcador que ocupa o lugar do token CSRF no fragmento cacheado.
+#
+# O token é individual por sessão, então o fragmento é armazenado com este marcador
+# e o token real é inserido a cada requisição.
+_CSRF_PLACEHOLDER = "__csrf_token_placeholder__"
 
 
 ## @brief Gera o HTML para exibir uma lista de lojas, com botões de editar e excluir.
 #
 # Esta função é utilizada em views de gerenciamento para renderizar dinamicamente
-# a lista de lojas existentes.
+# a lista de lojas existentes. O HTML vem do template `core/partials/lista_lojas.html`;
+# a URL de ação e o token CSRF são calculados uma única vez, fora do laço.
+# Sem `lojas_queryset`, renderiza todas as lojas por nome e guarda o fragmento
+# em cache até que alguma `Loja` seja salva ou excluída.
 #
 # @param request O objeto HttpRequest do Django, necessário para obter o token CSRF.
-# @param lojas_queryset Um QuerySet de objetos Loja a serem renderizados.
+# @param lojas_queryset Um QuerySet de objetos Loja a serem renderizados (opcional).
 # @return Uma string HTML representando a lista de lojas.
-def render_lojas_html(request, lojas_queryset):
-    if not lojas_queryset.exists():
-        return "<p>Nenhuma loja cadastrada ainda.</p>"
-
-    html = ""
-    for loja in lojas_queryset:
-        html += f"""
-        <div class="d-flex justify-content-between align-items-center mb-2 p-2 border-bottom">
-            <span>{loja.nome} (<a href="{loja.url}" target="_blank">{loja.url}</a>)</span>
-            <div>
-                <form method="post" action="{reverse('core:manage_stores')}" style="display:inline;">
-                    <input type="hidden" name="csrfmiddlewaretoken" value="{get_token(request)}">
-                    <input type="hidden" name="action" value="edit_store"> 
-                    <input type="hidden" name="store_id" value="{loja.id}">
-                    <button type="submit" class="btn btn-warning btn-sm me-2">Editar</button>
-                </form>
-                <form method="post" action="{reverse('core:manage_stores')}" style="display:inline;">
-                    <input type="hidden" name="csrfmiddlewaretoken" value="{get_token(request)}">
-                    <input type="hidden" name="action" value="delete_store">
-                    <input type="hidden" name="store_id" value="{loja.id}">
-                    <button type="submit" class="btn btn-danger btn-sm">Excluir</button>
-                </form>
-            </div>
-        </div>
-        """
-    return html
+def render_lojas_html(request, lojas_queryset=None):
+    usar_cache = lojas_queryset is None
+    html = cache.get(LOJAS_HTML_CACHE_KEY) if usar_cache else None
+
+    if html is None:
+        if usar_cache:
+            lojas_queryset = Loja.objects.order_by("nome")
+        html = render_to_string(
+            "core/partials/lista_lojas.html",
+            {
+                "lojas": lojas_queryset.only("id", "nome", "url"),
+                "action_url": reverse("core:manage_stores"),
+                "csrf_token": _CSRF_PLACEHOLDER,
+            },
+        )
+        if usar_cache:
+            cache.set(LOJAS_HTML_CACHE_KEY, html, None)
+
+    return html.replace(_CSRF_PLACEHOLDER, get_token(request))
 
 
 ## @brief Processa o envio de um formulário de Loja (adição ou edição).
@@ -282,27 +829,158 @@ def _get_base_html_context(
     if form_obj and form_obj.instance and form_obj.instance.pk:
         # Se form_obj existe, tem uma instância e ela tem uma PK, é uma edição
         form_header_text = f"Editar {item_type}"
-    # Não precisamos de um 'else' explícito aqui, pois 'form_header_text' já tem um valor padrão.
-
-    return {
-        "content": (
-            f"""<div style="font-family: sans-serif; text-align: center; margin-top: 50px; max-width: 800px; margin-left: auto; margin-right: auto; padding: 20px; box-shadow: 0 0 10px rgba(0,0,0,0.1); border-radius: 8px;">"""
-            f"""<h2>{title}</h2>"""
-            f"""{_get_messages_html(request)}"""
-            f"""{additional_info_html}"""
-            f"""<h3>{form_header_text}</h3>"""  # Usa a variável que agora está garantida
-            f"""<form method="post" action="">"""
-            f"""<input type="hidden" name="csrfmiddlewaretoken" value="{get_token(request)}">"""
-            f"""<input type="hidden" name="action" value="{_get_action_value_for_form(title)}">"""  # Chamada para função auxiliar de action_value
-            f"""{form_obj.as_p() if form_obj else ''}"""
-            f"""<button type="submit" style="padding: 10px 20px; background-color: #007bff; color: white; border: none; border-radius: 5px; cursor: pointer;">Salvar</button>"""
-            f"""</form>"""
-            f"""<h3 style="margin-top: 40px;">{title.replace('Gerenciar', 'Listar')} Existentes</h3>"""
-            f"""<div style="text-align: left; margin-top: 20px;">"""
-            f"""{existing_items_html}"""
-            f"""</div>"""
-            f"""<br><br>"""
-            f"""<a href="/" style="color: #007bff; text-decoration: none;">Voltar para a Home</a>"""
-            f"""</div>"""
-        )
+
+    # O template é compilado uma vez e reaproveitado pelo loader com cache do Django.
+    content = render_to_string(
+        "core/partials/manage_base.html",
+        {
+            "title": title,
+            "list_title": title.replace("Gerenciar", "Listar"),
+            "messages_html": _get_messages_html(request),
+            "additional_info_html": additional_info_html,
+            "form_header_text": form_header_text,
+            "csrf_token": get_token(request),
+            "action_value": _get_action_value_for_form(title),
+            "form_obj": form_obj,
+            "existing_items_html": existing_items_html,
+        },
+    )
+    return {"content": content}
+
+
+## @brief Pagina um QuerySet por cursor (keyset), em ordem decrescente de `campo` e `id`.
+#
+# Em vez de OFFSET, a página seguinte começa logo após o último item da anterior,
+# de modo que o custo de cada página não cresce com a quantidade de itens já vistos.
+# O cursor tem o formato "<valor do campo>_<id>".
+#
+# @param queryset O QuerySet a ser paginado (já filtrado).
+# @param campo Nome do campo de ordenação (ex: "data_compra").
+# @param cursor Cursor recebido da página anterior, ou None para a primeira página.
+# @param tamanho Quantidade máxima de itens por página.
+# @return Uma tupla (itens, proximo_cursor); proximo_cursor é None na última página.
+def paginar_por_cursor(queryset, campo, cursor, tamanho):
+    queryset = queryset.order_by(f"-{campo}", "-id")
+
+    if cursor:
+        valor, _, pk = cursor.rpartition("_")
+        try:
+            valor = queryset.model._meta.get_field(campo).to_python(valor)
+            pk = int(pk)
+        except (ValidationError, ValueError):
+            valor = None  # Cursor inválido: volta para a primeira página
+        if valor is not None:
+            queryset = queryset.filter(
+                Q(**{f"{campo}__lt": valor}) | Q(**{campo: valor, "id__lt": pk})
+            )
+
+    # Busca um item a mais só para saber se existe uma próxima página
+    itens = list(queryset[: tamanho + 1])
+    if len(itens) <= tamanho:
+        return itens, None
+
+    itens = itens[:tamanho]
+    ultimo = itens[-1]
+    return itens, f"{getattr(ultimo, campo).isoformat()}_{ultimo.id}"
+
+
+## @brief Monta a chave de cache do resumo de gastos de um usuário.
+#
+# @param usuario_id O ID do usuário.
+# @return A chave usada no cache.
+def _chave_resumo_gastos(usuario_id):
+    return f"core:resumo_gastos:{usuario_id}"
+
+
+## @brief Calcula os gastos de um usuário agrupados por mês e por loja.
+#
+# Os totais são agregados pelo banco (GROUP BY) e o resultado fica em cache por usuário
+# até a próxima compra (ver `invalidar_resumo_gastos`).
+#
+# @param usuario_id O ID do usuário.
+# @return Um dicionário com as listas "mensal" e "por_loja" e o "total_geral".
+def resumo_gastos(usuario_id):
+    chave = _chave_resumo_gastos(usuario_id)
+    resumo = cache.get(chave)
+    if resumo is not None:
+        return resumo
+
+    itens = ItemComprado.objects.filter(usuario_id=usuario_id)
+    mensal = (
+        itens.annotate(mes=TruncMonth("data_compra"))
+        .values("mes")
+        .annotate(total=Sum("preco_pago"), itens=Count("id"))
+        .order_by("-mes")
+    )
+    por_loja = (
+        itens.values("loja_id", "loja__nome")
+        .annotate(total=Sum("preco_pago"), itens=Count("id"))
+        .order_by("-total")
+    )
+
+    resumo = {
+        "mensal": [
+            {
+                "mes": linha["mes"].strftime("%Y-%m"),
+                "total": float(linha["total"]),
+                "itens": linha["itens"],
+            }
+            for linha in mensal
+        ],
+        "por_loja": [
+            {
+                "loja_id": linha["loja_id"],
+                "loja": linha["loja__nome"],
+                "total": float(linha["total"]),
+                "itens": linha["itens"],
+            }
+            for linha in por_loja
+        ],
     }
+    resumo["total_geral"] = round(sum(m["total"] for m in resumo["mensal"]), 2)
+
+    cache.set(chave, resumo, RESUMO_GASTOS_TIMEOUT)
+    return resumo
+
+
+## @brief Descarta o resumo de gastos em cache de um usuário.
+#
+# Chamada ao finalizar uma compra.
+#
+# @param usuario_id O ID do usuário.
+def invalidar_resumo_gastos(usuario_id):
+    cache.delete(_chave_resumo_gastos(usuario_id))
+
+
+## @brief Atualiza incrementalmente os agregados de nota de um produto.
+#
+# Chamada ao criar (`delta=1`) ou excluir (`delta=-1`) um comentário com nota. Os contadores
+# são atualizados no próprio banco, sem ler os comentários, e a média é recalculada a partir deles.
+#
+# @param produto_id O ID do produto avaliado.
+# @param nota A nota do comentário (comentários sem nota são ignorados).
+# @param delta 1 para um novo comentário, -1 para um comentário excluído.
+def registrar_avaliacao(produto_id, nota, delta):
+    if produto_id is None or nota is None:
+        return
+    with transaction.atomic():
+        produtos = Produto.objects.filter(id=produto_id)
+        produtos.update(
+            soma_notas=F("soma_notas") + delta * nota,
+            total_avaliacoes=F("total_avaliacoes") + delta,
+            atualizado_em=timezone.now(),
+        )
+        produtos.update(
+            nota_media=Case(
+                When(
+                    total_avaliacoes__gt=0,
+                    then=Cast("soma_notas", FloatField()) / F("total_avaliacoes"),
+                ),
+                default=None,
+                output_field=FloatField(),
+            )
+        )
+    # A nota média aparece no catálogo e no JSON do produto, e `update()` não dispara os
+    # sinais
+    cache_versionado.invalidar("catalogo")
+    invalidar_produto_json(produto_id)
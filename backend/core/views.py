@@ -12,23 +12,42 @@
 # @see core.forms
 # @see core.utils
 
+import os
+from functools import wraps
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, get_user_model
 from django.utils import timezone
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from datetime import date
 from django.urls import reverse
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Min, OuterRef, Subquery
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from .utils import render_lojas_html, process_loja_form, _get_base_html_context
 from django.http import JsonResponse
 from .models import Produto
 
 
 # Funções e modelos do seu projeto
-from .utils import get_product_info, search_products, merge_session_cart_to_db
+from .utils import merge_session_cart_to_db, obter_categorias
+from .utils import paginar_por_cursor, resumo_gastos, invalidar_resumo_gastos, registrar_avaliacao
+from .utils import obter_produto_json, estatisticas_produto_json, _produtos_json, invalidar_produto_json
+from .utils import validadores_produto, validadores_catalogo, etag_carrinho, buscar_produtos
+from .utils import registrar_visualizacao, encontrar_categoria, contar_produtos_por_categoria
+from .utils import iterar_produtos, json_em_partes, sufixo_etag_campos, CAMPOS_BUSCA, CAMPOS_PRODUTO
+from .rankings import obter_rankings
+from .recomendacoes import produtos_relacionados
+from .similares import indexar_produtos, produtos_similares
+from .duplicados import agrupar_duplicatas, encontrar_duplicatas, mesclar_produtos
+from . import cache as cache_versionado, duplicados, sugestoes
 from .models import Produto, Oferta, Categoria, Marca, Loja, ItemComprado, ListaCompra, ItemLista, Comentario
+from .models import ProdutoIndicado, RankingProduto
 from .forms import (
     CustomUserCreationForm,
     CustomAuthenticationForm,
@@ -61,34 +80,40 @@ def get_cart_data(request):
     cart_items = []
     total_geral = 0
 
-    for product_id, item_data in cart.items():
-        try:
-            produto = Produto.objects.get(id=product_id)
-            oferta = produto.ofertas.order_by("preco").first()
+    # Uma única consulta para todos os produtos do carrinho, já com o menor preço
+    ids = [product_id for product_id in cart if str(product_id).isdigit()]
+    produtos = {
+        str(produto.id): produto
+        for produto in Produto.objects.filter(id__in=ids)
+        .annotate(menor_preco=Min("ofertas__preco"))
+        .only("id", "nome", "imagem_url")
+    }
 
-            # Protege contra produto sem oferta
-            if oferta:
-                preco_unitario = float(oferta.preco)
-            else:
-                preco_unitario = 0.0
-
-            total_item = item_data["quantity"] * preco_unitario
-
-            cart_items.append(
-                {
-                    "id": produto.id,
-                    "nome": produto.nome,
-                    "quantity": item_data["quantity"],
-                    "preco": f"{preco_unitario:.2f}",
-                    "total_item": f"{total_item:.2f}",
-                    "imagem_url": produto.imagem_url,
-                }
-            )
+    for product_id, item_data in cart.items():
+        produto = produtos.get(str(product_id))
+        if produto is None:
+            continue  # Ignora produtos deletados
 
-            total_geral += total_item
+        # Protege contra produto sem oferta
+        if produto.menor_preco is not None:
+            preco_unitario = float(produto.menor_preco)
+        else:
+            preco_unitario = 0.0
+
+        total_item = item_data["quantity"] * preco_unitario
+
+        cart_items.append(
+            {
+                "id": produto.id,
+                "nome": produto.nome,
+                "quantity": item_data["quantity"],
+                "preco": f"{preco_unitario:.2f}",
+                "total_item": f"{total_item:.2f}",
+                "imagem_url": produto.imagem_url,
+            }
+        )
 
-        except Produto.DoesNotExist:
-            continue  # Ignora produtos deletados
+        total_geral += total_item
 
     return {
         "items": cart_items,
@@ -177,23 +202,30 @@ def finalizar_compra_view(request):
             messages.warning(request, "Seu carrinho está vazio.")
             return redirect("core:product_catalog_page")
 
-        for product_id, item_data in cart.items():
-            try:
-                produto = Produto.objects.get(id=product_id)
-                oferta = produto.ofertas.order_by("preco").first()
-
-                ItemComprado.objects.create(
-                    usuario=request.user,
-                    produto=produto,
-                    loja=oferta.loja if oferta else None,
-                    preco_pago=oferta.preco if oferta else 0,
-                    data_compra=timezone.now().date(),
-                )
-            except Produto.DoesNotExist:
-                continue  # Ignora se o produto foi deletado
+        # A oferta mais barata de cada produto vem na mesma consulta dos produtos
+        mais_barata = Oferta.objects.filter(produto=OuterRef("pk")).order_by("preco", "id")
+        produtos = Produto.objects.filter(
+            id__in=[product_id for product_id in cart if str(product_id).isdigit()]
+        ).annotate(
+            oferta_loja_id=Subquery(mais_barata.values("loja_id")[:1]),
+            oferta_preco=Subquery(mais_barata.values("preco")[:1]),
+        )
+        hoje = timezone.now().date()
+        # Produtos deletados não aparecem na consulta e são ignorados
+        ItemComprado.objects.bulk_create(
+            ItemComprado(
+                usuario=request.user,
+                produto=produto,
+                loja_id=produto.oferta_loja_id,
+                preco_pago=produto.oferta_preco if produto.oferta_preco is not None else 0,
+                data_compra=hoje,
+            )
+            for produto in produtos
+        )
 
-        # Limpa o carrinho da sessão
+        # Limpa o carrinho da sessão e o resumo de gastos, que mudou com a compra
         request.session["cart"] = {}
+        invalidar_resumo_gastos(request.user.id)
         messages.success(request, "Compra finalizada com sucesso!")
         return redirect("core:home")
 
@@ -273,8 +305,8 @@ def manage_shopping_lists_view(request):
             lista = get_object_or_404(ListaCompra, id=lista_id, usuario=request.user)
             session_cart = request.session.get("cart", {})
 
-            for item in lista.itens.all():
-                product_id = str(item.produto.id)
+            for produto_id in lista.itens.values_list("produto_id", flat=True):
+                product_id = str(produto_id)
                 if product_id not in session_cart:
                     session_cart[product_id] = {
                         "quantity": 1,
@@ -304,28 +336,28 @@ def manage_shopping_lists_view(request):
 #
 # @param request O objeto HttpRequest do Django.
 # @param item_id O ID do item da lista a ser deletado.
-# @return Redireciona para a página de edição da lista após a exclusão.
+# @return Redireciona para a página das listas de compras após a exclusão.
 def deletar_item_lista(request, item_id):
     item = get_object_or_404(ItemLista, id=item_id)
     
     if item.lista.usuario == request.user:
         item.delete()
     
-    return redirect("core:editar_lista", lista_id=item.lista.id)
+    return redirect("core:manage_shopping_lists")
 
 
 ## @brief Popula o carrinho da sessão do usuário com os itens de uma lista de compras.
 #
 # @param request O objeto HttpRequest do Django.
 # @param lista_id O ID da lista de compras a ser usada para popular o carrinho.
-# @return Redireciona para a página de visualização do carrinho.
+# @return Redireciona para a página de checkout com o carrinho populado.
 def usar_lista_como_carrinho(request, lista_id):
     lista = get_object_or_404(ListaCompra, id=lista_id, usuario=request.user)
     
     cart = request.session.get("cart", {})
 
-    for item in lista.itens.all():
-        produto_id = str(item.produto.id)
+    for produto_id in lista.itens.values_list("produto_id", flat=True):
+        produto_id = str(produto_id)
         if produto_id in cart:
             cart[produto_id]["quantity"] += 1  # ou += item.quantidade se tiver
         else:
@@ -334,32 +366,74 @@ def usar_lista_como_carrinho(request, lista_id):
     request.session["cart"] = cart
     request.session.modified = True
 
-    return redirect("core:ver_carrinho") 
+    return redirect("core:checkout")
 
 ## @brief Marca uma lista de compras como finalizada.
 #
 # @param request O objeto HttpRequest do Django.
 # @param lista_id O ID da lista de compras a ser finalizada.
-# @return Redireciona para a página de visualização das listas.
+# @return Redireciona para a página das listas de compras.
 def finalizar_lista(request, lista_id):
     lista = get_object_or_404(ListaCompra, id=lista_id, usuario=request.user)
     lista.finalizada = True
     lista.save()
-    return redirect("core:ver_listas")
+    return redirect("core:manage_shopping_lists")
 
 ## @brief Renderiza a página inicial.
 #
-# Busca todas as categorias do banco de dados e as passa para o template.
+# Usa a mesma lista de categorias em cache do processador de contexto, as contagens de
+# produtos por categoria e os rankings pré-calculados (`core.rankings`), também em cache.
+# Só as categorias de primeiro nível são exibidas, com os produtos das subcategorias.
 #
 # @param request O objeto HttpRequest do Django.
-# @return Renderiza o template 'home.html' com a lista de categorias.
+# @return Renderiza o template 'home.html' com a lista de categorias e os rankings.
 def home_view(request):
     """
     Renderiza a página inicial, passando todas as categorias do banco de dados.
     """
-    # Busca TODAS as categorias do banco de dados
-    categorias = Categoria.objects.all().order_by("nome")  # ordena por nome
-    return render(request, "core/home.html", {"categorias": categorias})
+    rankings = obter_rankings()
+    categorias = obter_categorias()
+    contagens = contar_produtos_por_categoria()
+    return render(
+        request,
+        "core/home.html",
+        {
+            "categorias": categorias,
+            "categorias_raiz": [
+                (categoria, contagens.get(categoria.id, 0))
+                for categoria in categorias
+                if categoria.pai_id is None
+            ],
+            "rankings": [
+                (titulo, rankings[tipo]) for tipo, titulo in RankingProduto.TIPOS
+            ],
+        },
+    )
+
+
+## @brief API: Retorna os rankings pré-calculados de produtos em alta e mais vendidos.
+#
+# Os rankings são recalculados periodicamente pelo comando `calcular_rankings`.
+#
+# @param request O objeto HttpRequest do Django.
+# @return JsonResponse com as chaves "em_alta_24h", "em_alta_7d" e "mais_vendidos".
+@cache_control(public=True, max_age=60)
+def rankings_api(request):
+    """API: Retorna os rankings de produtos em alta e mais vendidos."""
+    return JsonResponse(obter_rankings())
+
+
+## @brief API: Retorna sugestões de produtos, marcas e categorias para a barra de busca.
+#
+# Respondida a partir dos índices em memória de `core.sugestoes`, sem consultas ao banco
+# enquanto os índices estiverem atualizados.
+#
+# @param request O objeto HttpRequest do Django (espera o parâmetro GET 'q').
+# @return JsonResponse com a chave "sugestoes": lista de dicionários com tipo, id, nome e url.
+@cache_control(public=True, max_age=60)
+def sugestoes_api(request):
+    """API: Retorna sugestões de busca para o prefixo digitado."""
+    return JsonResponse({"sugestoes": sugestoes.sugerir(request.GET.get("q", ""))})
 
 
 ## @brief Faz o logout do usuário e o redireciona para a página inicial.
@@ -449,60 +523,178 @@ def login_view(request):
 #
 # @param request O objeto HttpRequest do Django.
 # @return JsonResponse com os dados do carrinho.
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=lambda request: etag_carrinho(request))
 def get_cart_view(request):
     """API para buscar os dados atuais do carrinho na sessão."""
     cart_data = get_cart_data(request)  # Reutiliza a função que já criamos
     return JsonResponse(cart_data)
 
 
+## @brief Quantidade de produtos lidos do banco por bloco no modo de streaming do catálogo.
+TAMANHO_BLOCO_STREAMING = 2000
+
+
+## @brief Lê o parâmetro `fields` (campos separados por vírgula) de uma API.
+#
+# @param request O objeto HttpRequest do Django.
+# @param validos Os campos aceitos pela API.
+# @return O conjunto de campos pedidos, ou None se o parâmetro não foi informado.
+# @exception ValueError Se algum campo não estiver entre os aceitos.
+def _campos_solicitados(request, validos):
+    if "fields" not in request.GET:
+        return None
+    campos = {campo.strip() for campo in request.GET["fields"].split(",") if campo.strip()}
+    desconhecidos = campos - set(validos)
+    if desconhecidos:
+        raise ValueError(f"Campos desconhecidos: {', '.join(sorted(desconhecidos))}")
+    return campos
+
+
+## @brief Decorador que valida o parâmetro `fields` de uma API antes dos validadores HTTP.
+#
+# Fica acima de `condition`, para que campos desconhecidos recebam 400 mesmo quando o
+# cliente envia um `If-None-Match` que casaria. Os campos validados ficam em
+# `request.campos` (None se o parâmetro não foi informado).
+#
+# @param validos Os campos aceitos pela API.
+def _validar_campos(validos):
+    def decorador(view):
+        @wraps(view)
+        def envolvida(request, *args, **kwargs):
+            try:
+                request.campos = _campos_solicitados(request, validos)
+            except ValueError as erro:
+                return JsonResponse({"error": str(erro)}, status=400)
+            return view(request, *args, **kwargs)
+
+        return envolvida
+
+    return decorador
+
+
 ## @brief API: Retorna os dados do catálogo de produtos em formato JSON.
 #
-# Realiza uma busca de produtos baseada em um termo de consulta ou nome de categoria.
+# Realiza uma busca de produtos baseada em um termo de consulta e/ou nome de categoria.
+# A categoria inclui os produtos das subcategorias; um nome que não corresponde a
+# nenhuma categoria é usado como termo de busca.
+#
+# Com `stream=1`, a resposta é gerada em partes enquanto os produtos são lidos do banco
+# em blocos (`StreamingHttpResponse`), sem montar a lista inteira nem passar pelo cache
+# de buscas; o conteúdo é o mesmo. Serve a clientes que exportam o catálogo inteiro.
+# O parâmetro `fields` (ex: "id,nome,menor_preco") restringe cada produto a esses campos,
+# e só as colunas deles são lidas do banco.
 #
-# @param request O objeto HttpRequest do Django (espera parâmetro GET 'q' ou 'categoria').
-# @return JsonResponse contendo uma lista de produtos.
+# @param request O objeto HttpRequest do Django (espera parâmetro GET 'q' ou 'categoria',
+#        e opcionalmente 'ordenar' ('avaliacao' ou 'popularidade'), 'nota_min', 'fields'
+#        e 'stream').
+# @return JsonResponse (ou StreamingHttpResponse) contendo uma lista de produtos, ou um
+#         erro 400 se `fields` tiver campos desconhecidos.
+@cache_control(no_cache=True)
+@_validar_campos(CAMPOS_BUSCA)
+@condition(
+    etag_func=lambda request: validadores_catalogo(request)[0],
+    last_modified_func=lambda request: validadores_catalogo(request)[1],
+)
 def product_catalog_view(request):
     """API: Retorna os dados do catálogo de produtos em formato JSON."""
     query = request.GET.get("q", "")
     categoria_nome = request.GET.get("categoria")
+    categoria = encontrar_categoria(categoria_nome) if categoria_nome else None
+
+    if categoria_nome and categoria is None:
+        query = categoria_nome  # Categoria desconhecida: busca pelo nome informado
+
+    try:
+        nota_min = float(request.GET["nota_min"])
+    except (KeyError, ValueError):
+        nota_min = None
+
+    parametros = {
+        "query": query,
+        "ordenar": request.GET.get("ordenar"),
+        "nota_min": nota_min,
+        "categoria": categoria.caminho if categoria else None,
+        "campos": request.campos,
+    }
+
+    if request.GET.get("stream") == "1":
+        produtos = iterar_produtos(chunk_size=TAMANHO_BLOCO_STREAMING, **parametros)
+        return StreamingHttpResponse(
+            json_em_partes("products", produtos), content_type="application/json"
+        )
+    return JsonResponse({"products": buscar_produtos(**parametros)})
+
+
+## @brief Quantidade de comentários exibidos por página nos detalhes de um produto.
+COMENTARIOS_POR_PAGINA = 20
+
+
+## @brief Salva um comentário de um produto e atualiza a nota média do produto.
+#
+# @param form O `ComentarioForm` já validado.
+# @param usuario O usuário autor do comentário.
+# @param produto O produto comentado.
+# @return O comentário criado.
+def _salvar_comentario(form, usuario, produto):
+    with transaction.atomic():
+        comentario = form.save(commit=False)
+        comentario.usuario = usuario
+        comentario.produto = produto
+        comentario.save()
+        registrar_avaliacao(produto.id, comentario.nota, 1)
+    return comentario
 
-    if categoria_nome:
-        query = categoria_nome  # Força a busca pelo nome da categoria
 
-    produtos = search_products(query=query)
-    return JsonResponse({"products": produtos})
+## @brief Valor do parâmetro `origem` com que os resultados do catálogo abrem a página do
+#         produto; só essas aberturas são contadas como cliques.
+ORIGEM_CLIQUE = "catalogo"
 
 
 ## @brief Exibe a página de detalhes de um produto específico.
 #
 # Permite a visualização de informações do produto, comentários e o envio de novos comentários.
+# Os comentários são paginados por cursor em (data, id), já com os dados do autor.
 #
-# @param request O objeto HttpRequest do Django.
+# @param request O objeto HttpRequest do Django (aceita os parâmetros GET 'cursor' e
+#        'origem').
 # @param product_id O ID do produto a ser exibido.
 # @return Renderiza o template 'produto.html' com os detalhes do produto e formulário de comentário.
 def produto_view(request, product_id):
     produto = get_object_or_404(Produto, id=product_id)
-    comentarios = Comentario.objects.filter(produto=produto)
+
+    if request.method == "GET":
+        registrar_visualizacao(produto.id)
+        # Só os links dos resultados do catálogo contam como clique (ver `ORIGEM_CLIQUE`)
+        if request.GET.get("origem") == ORIGEM_CLIQUE:
+            registrar_visualizacao(produto.id, "cliques")
 
     if request.method == "POST" and request.POST.get("action") == "add_comentario":
         form = ComentarioForm(request.POST)
         if form.is_valid():
-            comentario = form.save(commit=False)
-            comentario.usuario = request.user
-            comentario.produto = produto
-            comentario.save()
+            _salvar_comentario(form, request.user, produto)
             messages.success(request, "Comentário enviado com sucesso!")
             return redirect("core:produto", product_id=product_id)
     else:
         form = ComentarioForm()
 
+    comentarios, proximo_cursor = paginar_por_cursor(
+        Comentario.objects.filter(produto=produto).select_related("usuario"),
+        "data",
+        request.GET.get("cursor"),
+        COMENTARIOS_POR_PAGINA,
+    )
+
     endpoint_url = reverse("core:get_product_data_api", args=[product_id])
 
     return render(request, "core/produto.html", {
         "product_id": product_id,
+        "produto": produto,
         "endpoint_url": endpoint_url,
         "comentarios": comentarios,
+        "proximo_cursor": proximo_cursor,
         "comentario_form": form,
+        "relacionados": produtos_relacionados(produto.id),
     })
 
 ## @brief Adiciona um novo comentário a um produto.
@@ -518,10 +710,7 @@ def adicionar_comentario_view(request, product_id):
     if request.method == "POST":
         form = ComentarioForm(request.POST)
         if form.is_valid():
-            comentario = form.save(commit=False)
-            comentario.usuario = request.user
-            comentario.produto = produto
-            comentario.save()
+            _salvar_comentario(form, request.user, produto)
             messages.success(request, "Comentário enviado com sucesso!")
         else:
             messages.error(request, "Erro ao enviar comentário.")
@@ -529,29 +718,99 @@ def adicionar_comentario_view(request, product_id):
 
 ## @brief Exclui um comentário existente.
 #
+# Desconta a nota do comentário da média do produto.
+#
 # @param request O objeto HttpRequest do Django.
 # @param comentario_id O ID do comentário a ser excluído.
 # @return Redireciona de volta para a página do produto associado ao comentário.
 def excluir_comentario_view(request, comentario_id):
     comentario = get_object_or_404(Comentario, id=comentario_id)
-    produto_id = comentario.produto.id if comentario.produto else None
-    comentario.delete()
+    produto_id = comentario.produto_id
+    with transaction.atomic():
+        comentario.delete()
+        registrar_avaliacao(produto_id, comentario.nota, -1)
     messages.success(request, "Comentário excluído com sucesso.")
     return redirect("core:produto", product_id=produto_id)
 
 ## @brief API: Retorna os detalhes de um produto específico em formato JSON.
 #
-# Utiliza a função `get_product_info` para obter os dados detalhados do produto.
+# O corpo é a saída de `get_product_info` já serializada e mantida em cache por
+# `obter_produto_json`, invalidada pelos sinais dos modelos envolvidos. O parâmetro
+# `fields` (ex: "nome,menor_preco") restringe a resposta a esses campos.
 #
 # @param request O objeto HttpRequest do Django.
 # @param product_id O ID do produto a ser buscado.
-# @return JsonResponse com os detalhes do produto ou um erro 404 se não encontrado.
+# @return JsonResponse com os detalhes do produto, um erro 404 se não encontrado ou um
+#         erro 400 se `fields` tiver campos desconhecidos.
+@cache_control(no_cache=True)
+@_validar_campos(CAMPOS_PRODUTO)
+@condition(
+    etag_func=lambda request, product_id: (
+        validadores_produto(product_id)[0] + sufixo_etag_campos(request.campos)
+    ),
+    last_modified_func=lambda request, product_id: validadores_produto(product_id)[1],
+)
 def get_product_data_api(request, product_id):
     """API: Retorna os detalhes de um produto específico em formato JSON."""
-    product_data = get_product_info(product_id)
-    if not product_data:
+    corpo = obter_produto_json(product_id, request.campos)
+    if corpo is None:
         return JsonResponse({"error": "Produto não encontrado"}, status=404)
-    return JsonResponse({"product": product_data})
+    return HttpResponse(corpo, content_type="application/json")
+
+
+## @brief API: Retorna os produtos frequentemente comprados junto com um produto.
+#
+# Lê o índice de coocorrências mantido por `core.recomendacoes`.
+#
+# @param request O objeto HttpRequest do Django.
+# @param product_id O ID do produto.
+# @return JsonResponse com a lista "produtos", do mais frequente ao menos frequente.
+def produtos_relacionados_api(request, product_id):
+    """API: Retorna os produtos frequentemente comprados junto com um produto."""
+    return JsonResponse({"produtos": produtos_relacionados(product_id)})
+
+
+## @brief API: Retorna os produtos mais similares a um produto pelo conteúdo.
+#
+# Lê o índice TF-IDF mantido por `core.similares`; a página do produto carrega esta
+# lista depois dos detalhes.
+#
+# @param request O objeto HttpRequest do Django.
+# @param product_id O ID do produto.
+# @return JsonResponse com a lista "produtos" (com a URL da página de cada um).
+def produtos_similares_api(request, product_id):
+    """API: Retorna os produtos mais similares a um produto pelo conteúdo."""
+    produtos = [
+        {**similar, "url": reverse("core:produto", args=[similar["id"]])}
+        for similar in produtos_similares(product_id)
+    ]
+    return JsonResponse({"produtos": produtos})
+
+
+## @brief API: Retorna os contadores de acerto e falha dos caches deste processo (apenas staff).
+#
+# Os contadores são locais a cada worker; o PID identifica qual worker respondeu.
+#
+# @param request O objeto HttpRequest do Django.
+# @return JsonResponse com os contadores do cache de produtos e o tamanho do LRU local.
+@staff_member_required
+def cache_estatisticas_api(request):
+    """API: Retorna os contadores de acerto e falha dos caches deste processo."""
+    return JsonResponse(
+        {
+            "pid": os.getpid(),
+            "produto_json": {
+                **{"hit_local": 0, "hit_compartilhado": 0, "miss": 0},
+                **estatisticas_produto_json,
+                "lru_itens": len(_produtos_json),
+                "lru_tamanho_maximo": _produtos_json.tamanho_maximo,
+            },
+            "coalescido": {
+                **{"fresco": 0, "obsoleto": 0, "espera": 0, "recalculo": 0},
+                **cache_versionado.estatisticas_coalescidas,
+            },
+        }
+    )
 
 
 # ================================================================= #
@@ -573,6 +832,10 @@ def solicitar_produto_view(request):
     """
     Renderiza o formulário de solicitação de produto e processa o envio.
     Apenas usuários autenticados podem acessar esta view.
+
+    Se já houver produtos com nome parecido, a solicitação é registrada como
+    ProdutoIndicado (com `produto_existente` preenchido) e o formulário é exibido de
+    novo com os candidatos; o produto só é criado se o usuário confirmar que é novo.
     """
     categorias = Categoria.objects.all()
     marcas = Marca.objects.all()
@@ -594,6 +857,29 @@ def solicitar_produto_view(request):
         categoria = get_object_or_404(Categoria, id=categoria_id)
         marca = get_object_or_404(Marca, id=marca_id)
 
+        duplicatas = encontrar_duplicatas(nome)
+        if duplicatas and not request.POST.get("confirmar_novo"):
+            ProdutoIndicado.objects.update_or_create(
+                usuario=request.user,
+                nome_produto=nome,
+                status="pendente",
+                defaults={
+                    "descricao_produto": descricao or "",
+                    "url_imagem": imagem_url or "",
+                    "produto_existente": duplicatas[0][0],
+                },
+            )
+            messages.warning(
+                request,
+                "Encontramos produtos parecidos no catálogo. Confira se o seu já não está entre eles.",
+            )
+            return render(request, "core/solicitar_produto.html", {
+                "categorias": categorias,
+                "marcas": marcas,
+                "duplicatas": duplicatas,
+                "valores": request.POST,
+            })
+
         Produto.objects.create(
             nome=nome,
             descricao=descricao,
@@ -612,10 +898,15 @@ def solicitar_produto_view(request):
     })
 
 
+## @brief Quantidade de produtos pendentes exibidos por página na tela de aprovação.
+PRODUTOS_PENDENTES_POR_PAGINA = 50
+
+
 ## @brief Permite que apenas usuários com status de staff (administradores) aprovem produtos.
 #
-# Lida com a exibição da lista de produtos pendentes (GET) e o processamento
-# da aprovação via POST.
+# Lida com a exibição paginada da lista de produtos pendentes (GET), opcionalmente
+# filtrada por quem enviou o produto, e com a aprovação ou rejeição em lote via POST.
+# Cada lote é aplicado com um único UPDATE, independentemente do número de produtos.
 #
 # @param request O objeto HttpRequest do Django.
 # @return Renderiza o template 'aprovar_produto.html' ou redireciona
@@ -627,19 +918,77 @@ def aprovar_produto_view(request):
     """
     Permite que apenas usuários com status de staff (administradores) aprovem produtos.
     """
+    pendentes = Produto.objects.filter(aprovado=False, rejeitado=False)
+
     if request.method == "POST":
+        # O botão de uma linha envia 'produto_id'; a seleção múltipla envia 'produto_ids'
         produto_id = request.POST.get("produto_id")
-        produto = get_object_or_404(Produto, id=produto_id)
-
-        produto.aprovado = True
-        produto.save()
-
-        messages.success(request, f"Produto '{produto.nome}' aprovado com sucesso!")
-        return redirect("core:ver_aprovar_produtos")
+        ids = [produto_id] if produto_id else request.POST.getlist("produto_ids")
+        ids = [pk for pk in ids if pk.isdigit()]
+        acao = request.POST.get("acao", "aprovar")
+
+        if not ids:
+            messages.warning(request, "Selecione ao menos um produto.")
+        elif acao == "rejeitar":
+            total = pendentes.filter(id__in=ids).update(
+                rejeitado=True, atualizado_em=timezone.now()
+            )
+            messages.success(request, f"{total} produto(s) rejeitado(s).")
+            # Produtos rejeitados deixam de ser candidatos a duplicata
+            duplicados.indexar_produtos(ids)
+        else:
+            total = pendentes.filter(id__in=ids).update(
+                aprovado=True, atualizado_em=timezone.now()
+            )
+            messages.success(request, f"{total} produto(s) aprovado(s) com sucesso!")
+            # `update()` não dispara os sinais que indexam os produtos aprovados
+            indexar_produtos(ids)
+            cache_versionado.invalidar("contagem_categorias")
+            # Os produtos aprovados passam a aparecer nas sugestões da busca
+            cache_versionado.invalidar(sugestoes.VERSOES["produto"])
+        if ids:
+            # `update()` não dispara os sinais que invalidam os validadores do catálogo e
+            # os JSONs dos produtos; um lote maior que uma página invalida todos os JSONs
+            cache_versionado.invalidar("catalogo")
+            if len(ids) > PRODUTOS_PENDENTES_POR_PAGINA:
+                cache_versionado.invalidar("produto_json")
+            else:
+                for pk in ids:
+                    invalidar_produto_json(pk)
+
+        # Mantém o filtro e a página atuais depois de processar o lote
+        destino = reverse("core:ver_aprovar_produtos")
+        if request.GET:
+            destino = f"{destino}?{request.GET.urlencode()}"
+        return redirect(destino)
+
+    autor_id = request.GET.get("adicionado_por", "")
+    if autor_id.isdigit():
+        pendentes = pendentes.filter(adicionado_por_id=autor_id)
+
+    pagina = Paginator(
+        pendentes.select_related("categoria", "marca", "adicionado_por").order_by(
+            "data_adicao", "id"
+        ),
+        PRODUTOS_PENDENTES_POR_PAGINA,
+    ).get_page(request.GET.get("page"))
+
+    autores = (
+        Usuario.objects.filter(produto__aprovado=False, produto__rejeitado=False)
+        .distinct()
+        .order_by("username")
+        .only("id", "username")
+    )
 
-    produtos_pendentes = Produto.objects.filter(aprovado=False)
     return render(
-        request, "core/aprovar_produto.html", {"produtos": produtos_pendentes}
+        request,
+        "core/aprovar_produto.html",
+        {
+            "produtos": pagina.object_list,
+            "page_obj": pagina,
+            "autores": autores,
+            "autor_id": autor_id,
+        },
     )
 
 ## @brief View de placeholder para resultados de busca.
@@ -656,6 +1005,37 @@ def buscar_produtos_view(request):
     return render(request, "core/placeholder.html", {"title": "Resultado da Busca"})
 
 
+## @brief View para a equipe revisar e mesclar grupos de prováveis produtos duplicados.
+#
+# GET lista os grupos encontrados por `agrupar_duplicatas`. POST com `manter` (o ID do
+# produto mantido) e `duplicados` (os IDs a mesclar nele) move ofertas, itens de listas,
+# compras e comentários para o produto mantido e exclui os demais.
+#
+# @param request O objeto HttpRequest do Django.
+# @return Renderiza o template 'relatorio_duplicados.html' ou redireciona após a mesclagem.
+@staff_member_required(login_url="/admin/login/")
+def relatorio_duplicados_view(request):
+    if request.method == "POST":
+        manter = get_object_or_404(Produto, id=request.POST.get("manter"))
+        ids = [
+            int(pk) for pk in request.POST.getlist("duplicados") if pk.isdigit()
+        ]
+        total = mesclar_produtos(manter, ids)
+        if total:
+            messages.success(
+                request, f"{total} produto(s) mesclado(s) em '{manter.nome}'."
+            )
+        else:
+            messages.warning(request, "Selecione ao menos um produto para mesclar.")
+        return redirect("core:relatorio_duplicados")
+
+    return render(
+        request,
+        "core/relatorio_duplicados.html",
+        {"grupos": agrupar_duplicatas()},
+    )
+
+
 ## @brief Apenas renderiza a PÁGINA do catálogo. O JavaScript faz o resto.
 #
 # Esta view serve o template HTML base para o catálogo de produtos.
@@ -702,30 +1082,56 @@ def perfil_view(request):
 def lista_de_compras_view(request):
     return render(request, "core/placeholder.html", {"title": "Minha Lista de Compras"})
 
+## @brief Quantidade de itens exibidos por página no histórico de compras.
+HISTORICO_POR_PAGINA = 50
+
+
 ## @brief Exibe o histórico de compras do usuário autenticado.
 #
-# Busca todos os itens comprados pelo usuário logado e os exibe em ordem cronológica inversa.
+# Busca os itens comprados pelo usuário logado em ordem cronológica inversa, paginados
+# por cursor em (data_compra, id), junto com o resumo de gastos em cache.
 # Requer que o usuário esteja logado.
 #
-# @param request O objeto HttpRequest do Django.
-# @return Renderiza o template 'historico.html' com a lista de itens comprados.
+# @param request O objeto HttpRequest do Django (aceita o parâmetro GET 'cursor').
+# @return Renderiza o template 'historico.html' com a página de itens comprados.
 @login_required
 def historico_view(request):
     """
     Exibe o histórico de compras do usuário autenticado.
     """
-    itens_comprados = (
-        ItemComprado.objects.filter(usuario=request.user)
-        .select_related("produto", "loja")
-        .order_by("-data_compra")
+    itens_comprados, proximo_cursor = paginar_por_cursor(
+        ItemComprado.objects.filter(usuario=request.user).select_related(
+            "produto", "loja"
+        ),
+        "data_compra",
+        request.GET.get("cursor"),
+        HISTORICO_POR_PAGINA,
     )
     return render(
         request,
         "core/historico.html",
-        {"itens_comprados": itens_comprados, "title": "Histórico de Compras"},
+        {
+            "itens_comprados": itens_comprados,
+            "proximo_cursor": proximo_cursor,
+            "primeira_pagina": not request.GET.get("cursor"),
+            "resumo": resumo_gastos(request.user.id),
+            "title": "Histórico de Compras",
+        },
     )
 
 
+## @brief API: Retorna o resumo de gastos do usuário autenticado em formato JSON.
+#
+# Totais por mês e por loja calculados pelo banco e mantidos em cache até a próxima compra.
+#
+# @param request O objeto HttpRequest do Django.
+# @return JsonResponse com as chaves "mensal", "por_loja" e "total_geral".
+@login_required
+def historico_resumo_api(request):
+    """API: Retorna o resumo de gastos do usuário autenticado em formato JSON."""
+    return JsonResponse(resumo_gastos(request.user.id))
+
+
 # ================================================================= #
 #          VIEWS DE GERENCIAMENTO (LÓGICA ADAPTADA)                 #
 # ================================================================= #
@@ -768,8 +1174,8 @@ def manage_stores_view(request):
                 form = LojaForm(instance=loja)
                 additional_info = f"<p>Editando loja: <strong>{loja.nome}</strong></p>"
 
-    lojas = Loja.objects.all().order_by("nome")
-    lojas_html = render_lojas_html(request, lojas)
+    # Sem queryset explícito a lista de lojas vem do fragmento em cache
+    lojas_html = render_lojas_html(request)
 
     return render(
         request,
@@ -45,6 +45,9 @@ ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "127.0.0.1,localhost").sp
 # Define nosso modelo de usuário customizado como o padrão para o projeto
 AUTH_USER_MODEL = "core.Usuario"
 
+# Login por nome de usuário ou e-mail com uma única consulta e verificação de senha
+AUTHENTICATION_BACKENDS = ["core.backends.EmailOuUsernameBackend"]
+
 
 # ==============================================================================
 # DEFINIÇÃO DAS APLICAÇÕES (APPS)
@@ -71,6 +74,9 @@ INSTALLED_APPS = [
 # ==============================================================================
 
 MIDDLEWARE = [
+    # Mede as consultas SQL de cada requisição (cabeçalho Server-Timing e log "core.sql").
+    # Fica no topo para incluir as consultas feitas pelos demais middlewares (sessão, usuário)
+    "core.middleware.InstrumentacaoSQLMiddleware",
     "django.middleware.security.SecurityMiddleware",
     # WhiteNoise para servir arquivos estáticos em produção de forma eficiente
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -85,6 +91,9 @@ MIDDLEWARE = [
     "django.middleware.locale.LocaleMiddleware",
 ]
 
+# Requisições em que uma mesma consulta SQL roda mais vezes que isto são sinalizadas como N+1
+SQL_LIMITE_REPETICOES = int(os.environ.get("SQL_LIMITE_REPETICOES", "5"))
+
 # Aponta para o arquivo de URLs principal do projeto
 ROOT_URLCONF = "meuprojeto.urls"
 
@@ -137,6 +146,62 @@ else:
     }
 
 
+# ==============================================================================
+# CACHE
+# ==============================================================================
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    # Em produção os workers do gunicorn compartilham o mesmo cache, de modo que a
+    # invalidação feita por um deles vale para todos
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    # Desenvolvimento local: cache em memória do próprio processo
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "foodmart",
+        }
+    }
+
+# Quantidade máxima de respostas JSON de produtos mantidas na memória de cada worker
+PRODUTO_JSON_LRU_TAMANHO = int(os.environ.get("PRODUTO_JSON_LRU_TAMANHO", "1024"))
+
+# Tempo (em segundos) em que um resultado de busca do catálogo é servido do cache
+BUSCA_CACHE_TTL = int(os.environ.get("BUSCA_CACHE_TTL", "30"))
+
+# Intervalo (em segundos) entre as gravações em lote dos contadores de visualização de produtos
+VISUALIZACOES_INTERVALO = int(os.environ.get("VISUALIZACOES_INTERVALO", "30"))
+
+
+# ==============================================================================
+# LOGGING
+# ==============================================================================
+
+# O logger "core.sql" registra as métricas de SQL de cada requisição. Por padrão só os
+# avisos de N+1 são exibidos; use SQL_LOG_LEVEL=INFO para uma linha por requisição
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.sql": {
+            "handlers": ["console"],
+            "level": os.environ.get("SQL_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
+
 # ==============================================================================
 # VALIDAÇÃO DE SENHAS
 # ==============================================================================